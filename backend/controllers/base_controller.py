@@ -1,8 +1,11 @@
 from datetime import datetime
-from typing import List, Optional, TypeVar, Generic, Dict, Any
+from typing import List, Optional, TypeVar, Generic, Dict, Any, Tuple
 from fastapi import HTTPException
+from pydantic import ValidationError
 from backend.models.view_models import ProductoVistaBase, ProductoVistaNoPreparado, ProductoVistaPreparado
-from backend.services.base_service import DuplicateKeyError
+from backend.services.base_service import BulkWriteError, ConstraintViolationError, DuplicateKeyError
+from backend.utilities.pagination import encode_cursor, decode_cursor
+from database.executor import async_method
 
 T = TypeVar('T')  # Modelo Pydantic
 
@@ -25,6 +28,51 @@ class BaseController(Generic[T]):
         """
         return self.service.get_all()
 
+    def list_page(
+        self,
+        key_fields: List[str],
+        limit: Optional[int] = 100,
+        after: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Tuple[List[Any], Optional[str]]:
+        """
+        Obtiene una página de registros paginada por cursor.
+        :param key_fields: Campos de la clave primaria.
+        :param limit: Cantidad máxima de registros (None devuelve todos).
+        :param after: Cursor devuelto por la página anterior.
+        :param fields: Campos a devolver (proyección).
+        :param filters: Filtros de igualdad campo -> valor.
+        :return: Registros y cursor de la siguiente página (None si no hay más).
+        :raises HTTPException: 400 si el cursor o algún campo es inválido.
+        """
+        try:
+            after_values = decode_cursor(after, len(key_fields)) if after else None
+            items, siguiente = self.service.list_page(
+                key_fields=key_fields,
+                limit=limit,
+                after=after_values,
+                fields=fields,
+                filters=filters
+            )
+        except ValidationError:
+            raise  # Datos inválidos en la base de datos, no en la petición
+        except ValueError as ve:
+            raise HTTPException(status_code=400, detail=str(ve))
+        return items, encode_cursor(siguiente) if siguiente else None
+
+    def export_rows(self, fields: Optional[List[str]] = None):
+        """
+        Prepara la exportación en bloques de todos los registros de la entidad.
+        :param fields: Campos a exportar (por defecto todos).
+        :return: Nombres de columnas e iterador de bloques de filas.
+        :raises HTTPException: 400 si algún campo es inválido.
+        """
+        try:
+            return self.service.export_rows(fields=fields)
+        except ValueError as ve:
+            raise HTTPException(status_code=400, detail=str(ve))
+
     def get_by_id(self, id_field: str, id_value) -> Optional[T]:
         """
         Obtiene un registro por su campo clave primaria.
@@ -46,7 +94,7 @@ class BaseController(Generic[T]):
         """
         Crea un nuevo registro en la entidad.
         :param obj_in: Instancia del modelo a crear.
-        :raises HTTPException: 409 si hay duplicados, 400 para otros errores.
+        :raises HTTPException: 409 si hay duplicados, 400 si viola otra restricción de la tabla.
         """
         try:
             return self.service.create(obj_in)
@@ -61,6 +109,15 @@ class BaseController(Generic[T]):
                     "code": "DUPLICATE_KEY"
                 }
             )
+        except ConstraintViolationError as e:
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "message": e.message,
+                    "detail": e.detail,
+                    "code": "CONSTRAINT_VIOLATION"
+                }
+            )
         # except Exception as e:
         #     raise HTTPException(
         #         status_code=400,
@@ -70,6 +127,42 @@ class BaseController(Generic[T]):
         #         }
         #     )
 
+    def bulk_create(self, objs: List[T], atomic: bool = True) -> List[Dict[str, Any]]:
+        """
+        Crea varios registros de la entidad en una sola transacción.
+        :param objs: Instancias del modelo a crear.
+        :param atomic: Si True, un registro con error cancela toda la carga.
+        :return: Resultado por registro.
+        :raises HTTPException: 409 si la carga atómica tiene registros con error.
+        """
+        try:
+            return self.service.bulk_create(objs, atomic=atomic)
+        except BulkWriteError as e:
+            raise HTTPException(status_code=409, detail={
+                "message": e.message,
+                "errores": e.errores,
+                "code": "BULK_ABORTED"
+            })
+
+    def bulk_upsert(self, objs: List[T], atomic: bool = True) -> List[Dict[str, Any]]:
+        """
+        Crea o actualiza (por clave primaria) varios registros de la entidad en una sola transacción.
+        :param objs: Instancias del modelo a guardar.
+        :param atomic: Si True, un registro con error cancela toda la carga.
+        :return: Resultado por registro.
+        :raises HTTPException: 409 si la carga atómica tiene registros con error, 400 si la tabla no tiene clave primaria.
+        """
+        try:
+            return self.service.bulk_upsert(objs, atomic=atomic)
+        except BulkWriteError as e:
+            raise HTTPException(status_code=409, detail={
+                "message": e.message,
+                "errores": e.errores,
+                "code": "BULK_ABORTED"
+            })
+        except ValueError as ve:
+            raise HTTPException(status_code=400, detail=str(ve))
+
     def update(self, id_field: str, id_value, obj_in: T) -> bool:
         """
         Actualiza un registro existente.
@@ -110,18 +203,24 @@ class BaseController(Generic[T]):
         """
         Crea un nuevo registro con archivo adjunto.
         :param obj_in: Instancia del modelo con archivo
-        :raises HTTPException: 409 si hay duplicados, 400 para otros errores
+        :raises HTTPException: 409 si hay duplicados, 400 si viola otra restricción de la tabla
         """
         try:
             if hasattr(self.service, 'create_with_file'):
                 return await self.service.create_with_file(obj_in)
-            return self.service.create(obj_in)
+            return await self.service.acreate(obj_in)
         except DuplicateKeyError as e:
             raise HTTPException(status_code=409, detail={
                 "message": e.message,
                 "field": e.field,
                 "value": e.value
             })
+        except ConstraintViolationError as e:
+            raise HTTPException(status_code=400, detail={
+                "message": e.message,
+                "detail": e.detail,
+                "code": "CONSTRAINT_VIOLATION"
+            })
 
     def get_producto_completo(self) -> List[ProductoVistaBase]:
         productos_data = self.service.get_productos_completos()
@@ -163,4 +262,21 @@ class BaseController(Generic[T]):
             raise HTTPException(
                 status_code=500,
                 detail=f"Error al obtener lista: {str(e)}"
-            )
\ No newline at end of file
+            )
+
+    # Versiones asíncronas para los endpoints async: ejecutan el método síncrono (servicio
+    # y manejo de errores incluidos) en el executor de base de datos.
+    aget_all = async_method(get_all)
+    alist_page = async_method(list_page)
+    aget_by_id = async_method(get_by_id)
+    aget_by_keys = async_method(get_by_keys)
+    acreate = async_method(create)
+    abulk_create = async_method(bulk_create)
+    abulk_upsert = async_method(bulk_upsert)
+    aupdate = async_method(update)
+    aupdate_by_keys = async_method(update_by_keys)
+    adelete = async_method(delete)
+    adelete_by_keys = async_method(delete_by_keys)
+    aget_producto_completo = async_method(get_producto_completo)
+    aget_last_record = async_method(get_last_record)
+    aget_list_from_date = async_method(get_list_from_date)
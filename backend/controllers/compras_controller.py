@@ -2,6 +2,7 @@ from fastapi import HTTPException, status
 from typing import Optional, List
 from datetime import date
 from backend.models.view_models import DetalleCompra, ResumenCompra
+from database.executor import async_method
 
 class VistaComprasController:
     def __init__(self, service):
@@ -40,4 +41,8 @@ class VistaComprasController:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=str(e)
-            )
\ No newline at end of file
+            )
+
+    # Versiones asíncronas (se ejecutan en el executor de base de datos)
+    aobtener_detalle_compra = async_method(obtener_detalle_compra)
+    alistar_compras = async_method(listar_compras)
@@ -4,13 +4,17 @@ from backend.models.models import *
 from .base_controller import BaseController
 from backend.models.view_models import ProductoVista
 from backend.controllers.compras_controller import VistaComprasController
+from backend.controllers.tasaCambio_controller import TasaCambioController
+from backend.controllers.producto_controller import ProductoController
+from backend.controllers.inventario_controller import InventarioController
+from backend.controllers.reportes_controller import ReportesController
 
 
 clientes_controller = BaseController[Cliente](cliente_service)
 proveedores_controller = BaseController[Proveedor](proveedor_service)
-productos_controller = BaseController[Producto](producto_service)
+productos_controller = ProductoController(producto_service)
 ventas_controller = BaseController[Venta](venta_service)
-tasasCambio_controller = BaseController[TasaCambio](tasaCambio_service)
+tasasCambio_controller = TasaCambioController(tasaCambio_service)
 categoria_productos_controller = BaseController[CategoriaProducto](categoria_producto_service)
 compras_controller = BaseController[Compra](compra_service)
 creditos_controller = BaseController[Credito](credito_service)
@@ -22,4 +26,6 @@ productos_noPreparados_controller = BaseController[ProductoNoPreparado](producto
 
 vistaProductosController = BaseController[ProductoVista](vistaProductos_service)
 vistaComprasController = VistaComprasController(vistaCompras_service)
-vistaVentasController = VistaVentasController(vistaVentas_services)
\ No newline at end of file
+vistaVentasController = VistaVentasController(vistaVentas_services)
+inventarioController = InventarioController(inventario_service)
+reportesController = ReportesController(reportes_service)
@@ -0,0 +1,16 @@
+from fastapi import HTTPException, status
+from typing import List
+from backend.models.view_models import AlertaStock
+
+class InventarioController:
+    def __init__(self, service):
+        self.service = service
+
+    def obtener_alertas_stock(self) -> List[AlertaStock]:
+        try:
+            return self.service.obtener_alertas_stock()
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
@@ -0,0 +1,41 @@
+from typing import Any, Dict, List
+from backend.controllers.base_controller import BaseController
+from backend.models.models import Producto
+from backend.services.services import precios_service
+
+
+class ProductoController(BaseController[Producto]):
+    """
+    Controlador de productos que invalida el mapa de precios del motor de precios
+    cada vez que se escriben productos.
+    """
+
+    def create(self, obj_in: Producto) -> Any:
+        result = super().create(obj_in)
+        precios_service.invalidar()
+        return result
+
+    async def create_with_file(self, obj_in) -> Any:
+        result = await super().create_with_file(obj_in)
+        precios_service.invalidar()
+        return result
+
+    def update(self, id_field: str, id_value, obj_in: Producto) -> bool:
+        result = super().update(id_field, id_value, obj_in)
+        precios_service.invalidar()
+        return result
+
+    def delete(self, id_field: str, id_value) -> bool:
+        result = super().delete(id_field, id_value)
+        precios_service.invalidar()
+        return result
+
+    def bulk_create(self, objs: List[Producto], atomic: bool = True) -> List[Dict[str, Any]]:
+        result = super().bulk_create(objs, atomic=atomic)
+        precios_service.invalidar()
+        return result
+
+    def bulk_upsert(self, objs: List[Producto], atomic: bool = True) -> List[Dict[str, Any]]:
+        result = super().bulk_upsert(objs, atomic=atomic)
+        precios_service.invalidar()
+        return result
@@ -0,0 +1,46 @@
+from fastapi import HTTPException, status
+from typing import List, Optional
+from backend.models.view_models import ResumenVentasPeriodo
+from backend.controllers.ventas_controller import rango_fechas_iso
+
+class ReportesController:
+    def __init__(self, service):
+        self.service = service
+
+    def obtener_resumen_ventas(
+        self,
+        periodo: str,
+        fecha_inicio: Optional[str] = None,
+        fecha_fin: Optional[str] = None,
+        metodo_pago: Optional[str] = None,
+        tipo_venta: Optional[str] = None,
+        id_categoria: Optional[int] = None
+    ) -> List[ResumenVentasPeriodo]:
+        """
+        Obtiene los totales de ventas por día o por mes en el rango indicado (DD/MM/YYYY).
+        """
+        try:
+            fecha_desde, fecha_hasta = rango_fechas_iso(fecha_inicio, fecha_fin)
+            return self.service.obtener_resumen_ventas(
+                periodo=periodo,
+                fecha_desde=fecha_desde,
+                fecha_hasta=fecha_hasta,
+                metodo_pago=metodo_pago,
+                tipo_venta=tipo_venta,
+                id_categoria=id_categoria
+            )
+        except ValueError as e:
+            if "time data" in str(e):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Formato de fecha inválido. Use DD/MM/YYYY"
+                )
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e)
+            )
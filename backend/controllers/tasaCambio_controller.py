@@ -0,0 +1,40 @@
+from typing import Any, Dict, List
+from backend.controllers.base_controller import BaseController
+from backend.models.models import TasaCambio
+from backend.services.tasaCambio_cache import tasa_cache, ULTIMA_TASA
+
+
+class TasaCambioController(BaseController[TasaCambio]):
+    """
+    Controlador de tasas de cambio que sirve la última tasa desde la caché en memoria
+    y la invalida cada vez que se escribe una tasa.
+    """
+
+    def get_last_record(self, id_field: str = "id_tasa") -> Any:
+        """Obtiene la última tasa registrada (desde caché si está vigente)."""
+        return tasa_cache.get_or_load(ULTIMA_TASA, lambda: self.service.get_last_record(id_field))
+
+    def create(self, obj_in: TasaCambio) -> Any:
+        result = super().create(obj_in)
+        tasa_cache.invalidate(ULTIMA_TASA)
+        return result
+
+    def update(self, id_field: str, id_value, obj_in: TasaCambio) -> bool:
+        result = super().update(id_field, id_value, obj_in)
+        tasa_cache.invalidate(ULTIMA_TASA)
+        return result
+
+    def delete(self, id_field: str, id_value) -> bool:
+        result = super().delete(id_field, id_value)
+        tasa_cache.invalidate(ULTIMA_TASA)
+        return result
+
+    def bulk_create(self, objs: List[TasaCambio], atomic: bool = True) -> List[Dict[str, Any]]:
+        result = super().bulk_create(objs, atomic=atomic)
+        tasa_cache.invalidate(ULTIMA_TASA)
+        return result
+
+    def bulk_upsert(self, objs: List[TasaCambio], atomic: bool = True) -> List[Dict[str, Any]]:
+        result = super().bulk_upsert(objs, atomic=atomic)
+        tasa_cache.invalidate(ULTIMA_TASA)
+        return result
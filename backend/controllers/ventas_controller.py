@@ -1,7 +1,25 @@
 from fastapi import HTTPException, status
-from typing import Optional, List
-from datetime import datetime
+from typing import Optional, List, Tuple
+from datetime import datetime, timedelta
 from backend.models.view_models import DetalleVentaCompleto, ResumenVenta, DetalleProductoVenta
+from backend.utilities.pagination import encode_cursor, decode_cursor
+from database.executor import async_method
+
+
+def rango_fechas_iso(fecha_inicio: Optional[str], fecha_fin: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Convierte fechas DD/MM/YYYY en límites ISO sobre Ventas.fecha_hora.
+    El inicio es inclusivo (YYYY-MM-DD) y el fin exclusivo (día siguiente a fecha_fin),
+    de modo que se incluyen todas las horas del último día.
+    :raises ValueError: Si alguna fecha no tiene el formato DD/MM/YYYY.
+    """
+    desde = hasta = None
+    if fecha_inicio:
+        desde = datetime.strptime(fecha_inicio, "%d/%m/%Y").date().isoformat()
+    if fecha_fin:
+        hasta = (datetime.strptime(fecha_fin, "%d/%m/%Y").date() + timedelta(days=1)).isoformat()
+    return desde, hasta
+
 
 class VistaVentasController:
     def __init__(self, service):
@@ -37,26 +55,27 @@ class VistaVentasController:
         ci_cliente: Optional[str] = None,
         tipo_venta: Optional[str] = None,
         metodo_pago: Optional[str] = None,
-        limit: int = 100
-    ) -> List[ResumenVenta]:
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[ResumenVenta], Optional[str]]:
         """
-        Lista resúmenes de ventas con filtros opcionales
+        Lista resúmenes de ventas con filtros opcionales.
+        Devuelve la página y el cursor para pedir la siguiente (None si no hay más).
         """
         try:
-            # Validar formatos de fecha si se proporcionan
-            if fecha_inicio:
-                datetime.strptime(fecha_inicio, "%d/%m/%Y")
-            if fecha_fin:
-                datetime.strptime(fecha_fin, "%d/%m/%Y")
+            fecha_desde, fecha_hasta = rango_fechas_iso(fecha_inicio, fecha_fin)
+            despues_de = tuple(decode_cursor(cursor, 2)) if cursor else None
             
-            return self.service.obtener_resumenes_ventas(
-                fecha_inicio=fecha_inicio,
-                fecha_fin=fecha_fin,
+            resumenes, siguiente = self.service.obtener_resumenes_ventas(
+                fecha_desde=fecha_desde,
+                fecha_hasta=fecha_hasta,
                 ci_cliente=ci_cliente,
                 tipo_venta=tipo_venta,
                 metodo_pago=metodo_pago,
-                limit=limit
+                limit=limit,
+                despues_de=despues_de
             )
+            return resumenes, encode_cursor(list(siguiente)) if siguiente else None
         except ValueError as e:
             if "time data" in str(e):
                 raise HTTPException(
@@ -84,16 +103,12 @@ class VistaVentasController:
         Obtiene todas las ventas donde aparece un producto específico
         """
         try:
-            # Validar formatos de fecha si se proporcionan
-            if fecha_inicio:
-                datetime.strptime(fecha_inicio, "%d/%m/%Y")
-            if fecha_fin:
-                datetime.strptime(fecha_fin, "%d/%m/%Y")
+            fecha_desde, fecha_hasta = rango_fechas_iso(fecha_inicio, fecha_fin)
             
             ventas = self.service.obtener_ventas_por_producto(
                 cod_producto=cod_producto,
-                fecha_inicio=fecha_inicio,
-                fecha_fin=fecha_fin,
+                fecha_desde=fecha_desde,
+                fecha_hasta=fecha_hasta,
                 limit=limit
             )
             
@@ -120,4 +135,9 @@ class VistaVentasController:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error al obtener ventas por producto: {str(e)}"
-            )
\ No newline at end of file
+            )
+
+    # Versiones asíncronas (se ejecutan en el executor de base de datos)
+    aobtener_detalle_venta = async_method(obtener_detalle_venta)
+    alistar_ventas = async_method(listar_ventas)
+    aobtener_ventas_por_producto = async_method(obtener_ventas_por_producto)
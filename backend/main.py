@@ -1,9 +1,20 @@
 import json
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from backend.routes.pydolarve_routers import api_utils_router
+from backend.services.pydolarve_service import PyDolarVE
 from backend.routes.view_routers import router as vista_router
+from backend.routes.metricas_routers import router as metricas_router
+from backend.routes.export_routers import router as export_router
+from backend.routes.inventario_routers import router as inventario_router
+from backend.routes.reportes_routers import router as reportes_router
+from database.pool import close_all_pools
+from database.executor import db_executor, ExecutorBusyError
+from database.writer import close_all_writers, WriterTimeoutError
+from database.bootstrap import bootstrap_database
+from database.database import db_path
 
 import backend.utilities.apscheduler as scheduler_config
 from contextlib import asynccontextmanager
@@ -15,13 +26,22 @@ with open("tags_metadata.json") as f:
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    bootstrap_database(db_path)
+    db_executor.startup()
+    await PyDolarVE.startup()
     if not scheduler_config.scheduler.running:
         scheduler_config.scheduler.start()
         print("Scheduler iniciado exitosamente.")
+        # Si el backend estaba apagado a la hora del job y no hay tasa de hoy, se busca ahora
+        await scheduler_config.recuperar_ejecucion_perdida()
     yield
     if scheduler_config.scheduler.running:
         scheduler_config.scheduler.shutdown()
         print("Scheduler apagado.")
+    await PyDolarVE.shutdown()
+    db_executor.shutdown()
+    close_all_writers()
+    close_all_pools()
 
 app = FastAPI(
     title="2MS API", 
@@ -39,6 +59,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.exception_handler(ExecutorBusyError)
+async def executor_busy_handler(request: Request, exc: ExecutorBusyError):
+    # Cola del executor de base de datos llena: el cliente puede reintentar
+    return JSONResponse(status_code=503, content={"detail": exc.message}, headers={"Retry-After": "1"})
+
+@app.exception_handler(WriterTimeoutError)
+async def writer_timeout_handler(request: Request, exc: WriterTimeoutError):
+    # La escritura no obtuvo turno en el escritor único: el cliente puede reintentar
+    return JSONResponse(status_code=503, content={"detail": exc.message}, headers={"Retry-After": "1"})
+
 app.mount("/public", StaticFiles(directory="public"), name="public")            #para servir la imagenes
 
 
@@ -59,3 +90,7 @@ app.include_router(productos_noPreparados_router)
 
 app.include_router(api_utils_router)
 app.include_router(vista_router)
+app.include_router(inventario_router)
+app.include_router(reportes_router)
+app.include_router(metricas_router)
+app.include_router(export_router)
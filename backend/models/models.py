@@ -300,19 +300,63 @@ class DetalleVenta(BaseModel, DetalleVentaValidators):
     def __repr__(self) -> str:
         return f"DetalleVenta(ID: {self.id_detalle}, Venta ID: {self.id_venta}, Producto: {self.cod_producto}, Cant: {self.cantidad_producto})"
 
+# Modelos de entrada de los endpoints de registro de ventas: los montos y precios los calcula
+# el motor de precios (PreciosService), así que la caja sólo necesita enviar códigos y cantidades.
+# Los montos de la venta y los precios, si se envían, se ignoran; el monto del pago de contado y
+# el del crédito, si se envían, sólo se comparan al céntimo con los totales del servidor.
+class VentaRegistro(Venta):
+    """
+    Venta recibida por los endpoints de registro (montos opcionales)
+    """
+    monto_total_bs: Optional[float] = Field(None, description="Lo calcula el servidor; se ignora si se envía")
+    monto_total_usd: Optional[float] = Field(None, description="Lo calcula el servidor; se ignora si se envía")
+
+    @field_validator('monto_total_bs')
+    @classmethod
+    def validate_monto(cls, v):
+        return v
+
+class DetalleVentaRegistro(DetalleVenta):
+    """
+    Detalle recibido por los endpoints de registro (precio opcional)
+    """
+    precio_unitario: Optional[float] = Field(None, description="Lo calcula el servidor; se ignora si se envía")
+
+    @field_validator('cantidad_producto', 'precio_unitario')
+    @classmethod
+    def validate_detalle(cls, v, info):
+        return v if v is None else validate_positive_number(v, info.field_name)
+
+class PagoRegistro(Pago):
+    """
+    Pago de contado recibido por los endpoints de registro (monto opcional: por defecto el total de la venta)
+    """
+    monto: Optional[float] = Field(None, description="Si se envía debe coincidir al céntimo con el total en Bs; se registra el total del servidor")
+
+    @field_validator('monto')
+    @classmethod
+    def validate_monto(cls, v):
+        return v if v is None else validate_positive_number(v, "Monto")
+
+class CreditoRegistro(Credito):
+    """
+    Crédito recibido por los endpoints de registro (monto total opcional: por defecto el total en USD de la venta)
+    """
+    monto_total: Optional[float] = Field(None, description="Si se envía debe coincidir al céntimo con el total en USD; se registra el total del servidor")
+
 class VentaTransaccionPayload(BaseModel):
-    venta: Venta
-    detalles: List[DetalleVenta]
-    pago: Pago
+    venta: VentaRegistro
+    detalles: List[DetalleVentaRegistro]
+    pago: PagoRegistro
     
 #modelos especiales pare credito
 class VentaCreditoTransaccionPayload(BaseModel):
     """
     Payload para ventas a crédito que incluye venta, detalles, crédito y pago inicial opcional
     """
-    venta: Venta
-    detalles: List[DetalleVenta]
-    credito: Credito
+    venta: VentaRegistro
+    detalles: List[DetalleVentaRegistro]
+    credito: CreditoRegistro
     pago_inicial: Optional[Pago] = None
     
     # @validator('venta')
@@ -353,10 +397,10 @@ class VentaUnificadaPayload(BaseModel):
     """
     Payload unificado que puede manejar tanto ventas de contado como a crédito
     """
-    venta: Venta
-    detalles: List[DetalleVenta]
-    pago: Optional[Pago] = None
-    credito: Optional[Credito] = None
+    venta: VentaRegistro
+    detalles: List[DetalleVentaRegistro]
+    pago: Optional[PagoRegistro] = None
+    credito: Optional[CreditoRegistro] = None
     tipo_transaccion: str = Field(..., description="Tipo de transacción: 'de_contado' o 'credito'")
     
     # @validator('tipo_transaccion')
@@ -400,4 +444,48 @@ class EstadisticasCredito(BaseModel):
     total_creditos_activos: int
     monto_total_pendiente: float
     creditos_vencidos: int
-    promedio_dias_pago: Optional[float] = None
\ No newline at end of file
+    promedio_dias_pago: Optional[float] = None
+
+# Modelos para el registro de compras
+class LineaCompra(BaseModel):
+    """
+    Línea de una compra: producto no preparado recibido, cantidad y costo unitario
+    """
+    cod_producto: str = Field(..., description="Código del producto no preparado recibido")
+    cantidad: int = Field(..., gt=0, description="Cantidad recibida")
+    costo_unitario: float = Field(..., ge=0, description="Costo unitario de compra")
+
+class CompraTransaccionPayload(BaseModel):
+    """
+    Payload para registrar una compra completa: cabecera y líneas recibidas
+    """
+    compra: Compra
+    detalles: List[LineaCompra] = Field(..., min_length=1)
+
+
+# Modelos del motor de precios
+class CotizacionPayload(BaseModel):
+    """
+    Productos y cantidades a cotizar
+    """
+    detalles: List[DetalleVentaRegistro] = Field(..., min_length=1)
+
+class LineaCotizada(BaseModel):
+    """
+    Línea de una venta con el precio vigente del producto
+    """
+    cod_producto: str
+    cantidad_producto: int
+    precio_unitario: float = Field(..., description="Precio unitario en USD")
+    subtotal_usd: float
+    subtotal_bs: float
+
+class CotizacionVenta(BaseModel):
+    """
+    Totales de una venta calculados con los precios vigentes y la tasa de cambio actual
+    """
+    lineas: List[LineaCotizada]
+    monto_total_usd: float
+    monto_total_bs: float
+    id_tasa: Optional[int]
+    valor_usd_bs: float
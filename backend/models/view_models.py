@@ -70,4 +70,26 @@ class ResumenVenta(BaseModel):
     pago: Pago
     fecha_formateada: str = Field(..., description="Fecha formateada como DD/MM/YYYY")
     hora_formateada: str = Field(..., description="Hora formateada como HH:MM")
- 
\ No newline at end of file
+ 
+# MODELO DE VISTA PARA ALERTAS DE INVENTARIO
+class AlertaStock(BaseModel):
+    """Producto no preparado cuyo stock actual está por debajo del mínimo"""
+    cod_producto: str = Field(..., description="Código del producto")
+    nombre: str = Field(..., description="Nombre del producto")
+    cant_actual: int = Field(..., description="Cantidad actual en inventario")
+    cant_min: int = Field(..., description="Cantidad mínima en inventario")
+    faltante: int = Field(..., description="Unidades que faltan para llegar al mínimo")
+    unidad_medida: Optional[str] = Field(None, description="Unidad de medida")
+
+# MODELO DE VISTA PARA REPORTES DE VENTAS
+class ResumenVentasPeriodo(BaseModel):
+    """Totales de ventas de un período (día o mes) por método de pago, tipo de venta y categoría"""
+    periodo: str = Field(..., description="Día (YYYY-MM-DD) o mes (YYYY-MM)")
+    metodo_pago: str = Field(..., description="Método del pago inicial ('sin_pago' si la venta no tuvo pago)")
+    tipo_venta: str = Field(..., description="Tipo de venta ('credito' o 'de_contado')")
+    id_categoria: int = Field(..., description="ID de categoría (0 = sin categoría)")
+    categoria_descr: Optional[str] = Field(None, description="Descripción de la categoría")
+    num_ventas: int = Field(..., description="Cantidad de ventas con productos de la categoría")
+    unidades: int = Field(..., description="Unidades vendidas")
+    monto_bs: float = Field(..., description="Monto en Bolívares (repartido por categoría)")
+    monto_usd: float = Field(..., description="Monto en Dólares (repartido por categoría)")
@@ -1,9 +1,83 @@
 import inspect
-from fastapi import APIRouter, HTTPException, Form, File, UploadFile, Depends
+from fastapi import APIRouter, Body, HTTPException, Form, File, UploadFile, Depends, Query, Request, Response
 from typing import Any, Dict, Type, List, Optional
+from pydantic import TypeAdapter
 
 from backend.utilities.get_data import get_form_data_as_dict
 
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 1000
+MAX_BULK_SIZE = 1000        # registros por carga masiva
+# Parámetros de consulta reservados por el listado; el resto se interpreta como filtro de igualdad
+LIST_RESERVED_PARAMS = {'limit', 'after', 'fields'}
+# Serializador de los listados con proyección (`fields`), que devuelven diccionarios
+ROWS_ADAPTER = TypeAdapter(List[Dict[str, Any]])
+
+
+def _json_response(content: bytes, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Respuesta con el JSON ya serializado (FastAPI no vuelve a validar ni a codificar)."""
+    return Response(content=content, media_type="application/json", headers=headers)
+
+async def _list_page(controller, key_fields: List[str], request: Request, list_adapter: TypeAdapter,
+                     limit: Optional[int], after: Optional[str], fields: Optional[str]) -> Response:
+    """
+    Resuelve un listado paginado común a los routers CRUD simples y compuestos.
+    Sin limit ni after se devuelven todos los registros, como antes de la paginación
+    (los clientes que no siguen X-Next-Cursor no pierden registros).
+    Los modelos leídos de la base de datos se serializan directamente con el TypeAdapter del router.
+    """
+    if limit is None and after is not None:
+        limit = DEFAULT_PAGE_SIZE
+    filtros = {k: v for k, v in request.query_params.items() if k not in LIST_RESERVED_PARAMS}
+    campos = [f.strip() for f in fields.split(',') if f.strip()] if fields else None
+    items, siguiente = await controller.alist_page(
+        key_fields=key_fields,
+        limit=limit,
+        after=after,
+        fields=campos,
+        filters=filtros
+    )
+    adapter = ROWS_ADAPTER if campos else list_adapter
+    return _json_response(adapter.dump_json(items), {"X-Next-Cursor": siguiente} if siguiente else None)
+
+def _bulk_routes(router: APIRouter, controller, entity_name: str, model: Type) -> None:
+    """
+    Registra POST /bulk y PUT /bulk, comunes a los routers CRUD simples y compuestos.
+    Se registran antes que las rutas con la clave en el path, para que "bulk" no se tome como una clave.
+    """
+    descripcion = "Si es true, un registro con error cancela toda la carga; si es false, se guardan los válidos"
+
+    @router.post("/bulk", response_model=None)
+    async def bulk_create(
+        objs: List[model] = Body(..., min_length=1, max_length=MAX_BULK_SIZE),
+        atomic: bool = Query(True, description=descripcion)
+    ):
+        """Crea varios registros de la entidad en una sola transacción, con el resultado de cada uno."""
+        resultados = await controller.abulk_create(objs, atomic=atomic)
+        return _bulk_summary(entity_name, resultados)
+
+    @router.put("/bulk", response_model=None)
+    async def bulk_upsert(
+        objs: List[model] = Body(..., min_length=1, max_length=MAX_BULK_SIZE),
+        atomic: bool = Query(True, description=descripcion)
+    ):
+        """Crea o actualiza (por clave primaria) varios registros de la entidad en una sola transacción."""
+        resultados = await controller.abulk_upsert(objs, atomic=atomic)
+        return _bulk_summary(entity_name, resultados)
+
+def _bulk_summary(entity_name: str, resultados: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Cuerpo de respuesta de una carga masiva: totales por estado y resultado de cada registro."""
+    totales = {"creado": 0, "actualizado": 0, "duplicado": 0, "error": 0}
+    for resultado in resultados:
+        totales[resultado["estado"]] += 1
+    return {
+        "mensaje": f"Carga masiva de {entity_name} procesada",
+        "creados": totales["creado"],
+        "actualizados": totales["actualizado"],
+        "fallidos": totales["duplicado"] + totales["error"],
+        "resultados": resultados
+    }
+
 def create_crud_router(
     entity_name: str,
     controller,
@@ -30,23 +104,39 @@ def create_crud_router(
     """
     router = APIRouter(prefix=f"/{entity_name}", tags=[tag or entity_name.capitalize()])
 
-    @router.get("/", response_model=List[model])
-    def getAll():
-        """Obtiene todos los registros de la entidad."""
-        return controller.get_all()
+    # Serializadores construidos una vez por router. Las lecturas devuelven el JSON ya generado
+    # (se documentan con `responses` en lugar de response_model, que volvería a validar cada modelo).
+    list_adapter = TypeAdapter(List[model])
+    item_adapter = TypeAdapter(model)
 
-    @router.get("/{item_id}", response_model=model)
-    def get(item_id: str):
+    @router.get("/", response_model=None, responses={200: {"model": List[model]}})
+    async def getAll(
+        request: Request,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE,
+                                     description="Registros por página (sin limit ni after se devuelven todos)"),
+        after: Optional[str] = Query(None, description="Cursor de la página anterior (cabecera X-Next-Cursor)"),
+        fields: Optional[str] = Query(None, description="Campos a devolver separados por coma")
+    ):
+        """
+        Obtiene los registros de la entidad paginados por clave primaria.
+        Cualquier otro parámetro de consulta con nombre de campo se aplica como filtro de igualdad.
+        """
+        return await _list_page(controller, [id_field], request, list_adapter, limit, after, fields)
+
+    _bulk_routes(router, controller, entity_name, model)
+
+    @router.get("/{item_id}", response_model=None, responses={200: {"model": model}})
+    async def get(item_id: str):
         """Obtiene un registro por su clave primaria."""
-        obj = controller.get_by_id(id_field, item_id)
+        obj = await controller.aget_by_id(id_field, item_id)
         if not obj:
             raise HTTPException(status_code=404, detail=f"{entity_name.capitalize()} no encontrado")
-        return obj
+        return _json_response(item_adapter.dump_json(obj))
 
     @router.post("/", response_model=None, status_code=201)
-    def create(obj_in: model):
+    async def create(obj_in: model):
         """Crea un nuevo registro de la entidad."""
-        controller.create(obj_in)
+        await controller.acreate(obj_in)
         return {"mensaje": f"{entity_name.capitalize()} creado exitosamente"}
     
 
@@ -102,24 +192,24 @@ def create_crud_router(
             if hasattr(controller, 'create_with_file'):
                 result = await controller.create_with_file(obj_in)
             else:
-                result = controller.create(obj_in)
+                result = await controller.acreate(obj_in)
                 
             return {"mensaje": f"{entity_name.capitalize()} creado con archivo", "data": result}
 
         return router
 
     @router.put("/{item_id}", response_model=None)
-    def update(item_id: str, obj_in: model):
+    async def update(item_id: str, obj_in: model):
         """Actualiza un registro existente de la entidad."""
-        actualizado = controller.update(id_field, item_id, obj_in)
+        actualizado = await controller.aupdate(id_field, item_id, obj_in)
         if not actualizado:
             raise HTTPException(status_code=404, detail=f"{entity_name.capitalize()} no encontrado")
         return {"mensaje": f"{entity_name.capitalize()} actualizado exitosamente"}
 
     @router.delete("/{item_id}", response_model=None)
-    def delete(item_id: str):
+    async def delete(item_id: str):
         """Elimina un registro de la entidad por su clave primaria."""
-        eliminado = controller.delete(id_field, item_id)
+        eliminado = await controller.adelete(id_field, item_id)
         if not eliminado:
             raise HTTPException(status_code=404, detail=f"{entity_name.capitalize()} no encontrado")
         return {"mensaje": f"{entity_name.capitalize()} eliminado exitosamente"}
@@ -144,41 +234,54 @@ def create_composite_crud_router(
     :return: APIRouter listo para incluir en la app.
     """
     router = APIRouter(prefix=f"/{entity_name}", tags=[tag or entity_name.capitalize()])
+    list_adapter = TypeAdapter(List[model])
+    item_adapter = TypeAdapter(model)
 
     # Crear la ruta con múltiples parámetros
     route_params = "/".join([f"{{{field}}}" for field in key_fields])
     
-    @router.get("/", response_model=List[model])
-    def getAll():
-        """Obtiene todos los registros de la entidad."""
-        return controller.get_all()
+    @router.get("/", response_model=None, responses={200: {"model": List[model]}})
+    async def getAll(
+        request: Request,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE,
+                                     description="Registros por página (sin limit ni after se devuelven todos)"),
+        after: Optional[str] = Query(None, description="Cursor de la página anterior (cabecera X-Next-Cursor)"),
+        fields: Optional[str] = Query(None, description="Campos a devolver separados por coma")
+    ):
+        """
+        Obtiene los registros de la entidad paginados por clave primaria compuesta.
+        Cualquier otro parámetro de consulta con nombre de campo se aplica como filtro de igualdad.
+        """
+        return await _list_page(controller, key_fields, request, list_adapter, limit, after, fields)
+
+    _bulk_routes(router, controller, entity_name, model)
 
-    @router.get(f"/{route_params}", response_model=model)
-    def get(**kwargs):
+    @router.get(f"/{route_params}", response_model=None, responses={200: {"model": model}})
+    async def get(**kwargs):
         """Obtiene un registro por sus campos clave primaria compuesta."""
-        obj = controller.get_by_keys(kwargs)
+        obj = await controller.aget_by_keys(kwargs)
         if not obj:
             raise HTTPException(status_code=404, detail=f"{entity_name.capitalize()} no encontrado")
-        return obj
+        return _json_response(item_adapter.dump_json(obj))
 
     @router.post("/", response_model=None, status_code=201)
-    def create(obj_in: model):
+    async def create(obj_in: model):
         """Crea un nuevo registro de la entidad."""
-        controller.create(obj_in)
+        await controller.acreate(obj_in)
         return {"mensaje": f"{entity_name.capitalize()} creado exitosamente"}
 
     @router.put(f"/{route_params}", response_model=None)
-    def update(obj_in: model, **kwargs):
+    async def update(obj_in: model, **kwargs):
         """Actualiza un registro existente de la entidad usando clave primaria compuesta."""
-        actualizado = controller.update_by_keys(kwargs, obj_in)
+        actualizado = await controller.aupdate_by_keys(kwargs, obj_in)
         if not actualizado:
             raise HTTPException(status_code=404, detail=f"{entity_name.capitalize()} no encontrado")
         return {"mensaje": f"{entity_name.capitalize()} actualizado exitosamente"}
 
     @router.delete(f"/{route_params}", response_model=None)
-    def delete(**kwargs):
+    async def delete(**kwargs):
         """Elimina un registro de la entidad usando clave primaria compuesta."""
-        eliminado = controller.delete_by_keys(kwargs)
+        eliminado = await controller.adelete_by_keys(kwargs)
         if not eliminado:
             raise HTTPException(status_code=404, detail=f"{entity_name.capitalize()} no encontrado")
         return {"mensaje": f"{entity_name.capitalize()} eliminado exitosamente"}
@@ -0,0 +1,83 @@
+# Endpoints de exportación masiva en streaming (NDJSON / CSV)
+import csv
+import io
+import json
+from typing import Iterator, List, Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from backend.controllers.controller import *
+
+router = APIRouter(
+    prefix="/export",
+    tags=["Exportar"]
+)
+
+# Entidades exportables (mismo nombre que el prefijo de su router CRUD)
+EXPORT_CONTROLLERS = {
+    "clientes": clientes_controller,
+    "proveedores": proveedores_controller,
+    "productos": productos_controller,
+    "ventas": ventas_controller,
+    "tasas_cambio": tasasCambio_controller,
+    "categoria_productos": categoria_productos_controller,
+    "compras": compras_controller,
+    "creditos": creditos_controller,
+    "pagos": pagos_controller,
+    "movimientos": movimientos_controller,
+    "detalle_venta": detalle_venta_controller,
+    "productos_preparados": productos_preparados_controller,
+    "productos_noPreparados": productos_noPreparados_controller,
+}
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _ndjson(columns: List[str], chunks: Iterator[List[tuple]]) -> Iterator[str]:
+    """Serializa cada bloque como líneas JSON (una por fila)."""
+    for rows in chunks:
+        yield ''.join(
+            json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=str) + '\n'
+            for row in rows
+        )
+
+
+def _csv(columns: List[str], chunks: Iterator[List[tuple]]) -> Iterator[str]:
+    """Serializa la cabecera y luego cada bloque como filas CSV."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+    for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue()
+
+
+@router.get("/{entity}", summary="Exportar todos los registros de una entidad en streaming")
+def export_entity(
+    entity: str,
+    formato: str = Query("ndjson", description="Formato de salida: ndjson o csv"),
+    fields: Optional[str] = Query(None, description="Campos a exportar separados por coma")
+):
+    """
+    Exporta la tabla completa leyendo por bloques desde un cursor,
+    sin cargar todos los registros en memoria.
+    """
+    controller = EXPORT_CONTROLLERS.get(entity)
+    if controller is None:
+        raise HTTPException(status_code=404, detail=f"Entidad {entity} no exportable")
+    if formato not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Formato inválido: {formato}. Use ndjson o csv")
+
+    campos = [f.strip() for f in fields.split(',') if f.strip()] if fields else None
+    columns, chunks = controller.export_rows(fields=campos)
+    serializer = _ndjson if formato == "ndjson" else _csv
+    return StreamingResponse(
+        serializer(columns, chunks),
+        media_type=MEDIA_TYPES[formato],
+        headers={"Content-Disposition": f'attachment; filename="{entity}.{formato}"'}
+    )
@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from typing import List
+from backend.models.view_models import AlertaStock
+from backend.controllers.controller import inventarioController
+
+router = APIRouter(
+    prefix="/inventario",
+    tags=["Inventario"]
+)
+
+@router.get("/alertas", response_model=List[AlertaStock], summary="Productos con stock bajo")
+def get_alertas_stock():
+    """
+    Obtiene los productos no preparados cuyo stock actual está por debajo del mínimo,
+    ordenados por las unidades que les faltan.
+    """
+    return inventarioController.obtener_alertas_stock()
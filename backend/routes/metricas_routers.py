@@ -0,0 +1,69 @@
+# Endpoints de métricas internas del backend (pool de conexiones, etc.)
+from fastapi import APIRouter
+from database.pool import all_pool_stats
+from database.executor import db_executor
+from database.writer import all_writer_stats
+from backend.services.tasaCambio_cache import tasa_cache
+from backend.services.precios_service import precios_cache
+from backend.services.pydolarve_service import PyDolarVE
+import backend.utilities.apscheduler as scheduler_config
+
+router = APIRouter(
+    prefix="/metricas",
+    tags=["Metricas"]
+)
+
+@router.get("/pool", summary="Métricas del pool de conexiones SQLite")
+def get_pool_metrics():
+    """
+    Devuelve, por cada base de datos, el tamaño del pool, conexiones en uso,
+    préstamos realizados, tiempos de espera y fallos de verificación.
+    """
+    return {"pools": all_pool_stats()}
+
+
+@router.get("/db-executor", summary="Métricas del executor de base de datos")
+def get_db_executor_metrics():
+    """
+    Devuelve hilos, operaciones pendientes, completadas, fallidas y rechazadas por cola llena,
+    y latencias p50 / p95 / p99 (espera + ejecución) de las operaciones recientes.
+    """
+    return db_executor.stats()
+
+
+@router.get("/writer", summary="Métricas del escritor único de SQLite")
+def get_writer_metrics():
+    """
+    Devuelve, por cada base de datos, la profundidad de la cola de escrituras, los lotes
+    confirmados, su tamaño y las latencias p50 / p95 / p99 de los COMMIT.
+    """
+    return {"writers": all_writer_stats()}
+
+
+@router.get("/cache", summary="Métricas de las cachés de tasas de cambio y de precios")
+def get_cache_metrics():
+    """
+    Devuelve aciertos, fallos e invalidaciones de la caché de tasas de cambio y del mapa de precios.
+    """
+    return {"tasas_cambio": tasa_cache.stats(), "precios": precios_cache.stats()}
+
+
+@router.get("/pydolarve", summary="Estado del circuito hacia PyDolarVE")
+def get_pydolarve_metrics():
+    """
+    Devuelve el estado del circuito (cerrado / abierto / semiabierto) y los fallos consecutivos.
+    """
+    return PyDolarVE.stats()
+
+
+@router.get("/scheduler", summary="Métricas del job automático de la tasa BCV")
+def get_scheduler_metrics():
+    """
+    Devuelve ejecuciones, éxitos, fallos, duración de la última ejecución y próxima ejecución del job.
+    """
+    job = scheduler_config.scheduler.get_job(scheduler_config.JOB_ID)
+    return {
+        "running": scheduler_config.scheduler.running,
+        "proxima_ejecucion": job.next_run_time.isoformat() if job and job.next_run_time else None,
+        **scheduler_config.job_metrics,
+    }
@@ -3,6 +3,7 @@ from fastapi import APIRouter, HTTPException
 from backend.controllers.controller import tasasCambio_controller
 from backend.models.models import TasaCambio
 from backend.services.pydolarve_service import PyDolarVE
+from backend.services.tasaCambio_cache import tasa_cache, DOLAR_API
 
 api_utils_router = APIRouter()
 
@@ -10,7 +11,7 @@ api_utils_router = APIRouter()
 async def obtener_precio_dolar():
     service = PyDolarVE()
     try:
-        tasa = await service.get_precio_dolar()
+        tasa = await service.get_precio_dolar_cache()
         return tasa
     except Exception as e:
         raise HTTPException(status_code=502, detail=str(e))
@@ -19,8 +20,9 @@ async def obtener_precio_dolar():
 async def guardar_precio_dolar():
     dolar_service = PyDolarVE()
     try:
-        tasa = await dolar_service.get_precio_dolar()
-        tasaG = tasasCambio_controller.create(tasa)
+        tasa = await dolar_service.get_precio_dolar(fallback=False)
+        tasa_cache.set(DOLAR_API, tasa)
+        tasaG = await tasasCambio_controller.acreate(tasa)
         print(tasaG)
         if tasaG is None:
             raise HTTPException(status_code=500, detail="No se pudo guardar la tasa de cambio")            
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Query
+from typing import List, Optional
+from backend.models.view_models import ResumenVentasPeriodo
+from backend.controllers.controller import reportesController
+
+router = APIRouter(
+    prefix="/reportes",
+    tags=["Reportes"]
+)
+
+@router.get("/ventas/diarias", response_model=List[ResumenVentasPeriodo], summary="Totales de ventas por día")
+def get_ventas_diarias(
+    fecha_inicio: Optional[str] = Query(None, description="Fecha inicial DD/MM/YYYY (inclusiva)"),
+    fecha_fin: Optional[str] = Query(None, description="Fecha final DD/MM/YYYY (inclusiva)"),
+    metodo_pago: Optional[str] = Query(None, description="Filtrar por método de pago ('sin_pago' para créditos sin pago inicial)"),
+    tipo_venta: Optional[str] = Query(None, description="Filtrar por tipo de venta"),
+    id_categoria: Optional[int] = Query(None, description="Filtrar por categoría (0 = sin categoría)")
+):
+    """
+    Obtiene los totales de ventas por día, método de pago, tipo de venta y categoría,
+    leídos del resumen diario que mantienen los triggers de ventas, detalles y pagos.
+    """
+    return reportesController.obtener_resumen_ventas('dia', fecha_inicio, fecha_fin, metodo_pago, tipo_venta, id_categoria)
+
+
+@router.get("/ventas/mensuales", response_model=List[ResumenVentasPeriodo], summary="Totales de ventas por mes")
+def get_ventas_mensuales(
+    fecha_inicio: Optional[str] = Query(None, description="Fecha inicial DD/MM/YYYY (inclusiva)"),
+    fecha_fin: Optional[str] = Query(None, description="Fecha final DD/MM/YYYY (inclusiva)"),
+    metodo_pago: Optional[str] = Query(None, description="Filtrar por método de pago ('sin_pago' para créditos sin pago inicial)"),
+    tipo_venta: Optional[str] = Query(None, description="Filtrar por tipo de venta"),
+    id_categoria: Optional[int] = Query(None, description="Filtrar por categoría (0 = sin categoría)")
+):
+    """
+    Obtiene los totales de ventas por mes, método de pago, tipo de venta y categoría.
+    """
+    return reportesController.obtener_resumen_ventas('mes', fecha_inicio, fecha_fin, metodo_pago, tipo_venta, id_categoria)
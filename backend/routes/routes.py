@@ -1,19 +1,26 @@
 # Aquí se crean los controladores y routers para cada entidad usando la fábrica genérica
 
-from fastapi import HTTPException, Query
+from fastapi import Header, HTTPException, Query, Response
 from fastapi.params import Depends
 from backend.models.models import *
 from backend.controllers.controller import *
 from backend.models.view_models import DetalleProductoVenta, DetalleVentaCompleto, ResumenVenta
 from backend.services.transactions.ventaCredito_transaction import registrar_venta_completa, registrar_venta_credito_completa
 from backend.services.transactions.venta_transactions import registrar_venta_con_detalles_y_pago
+from backend.services.transactions.compra_transactions import registrar_compra_completa
+from backend.services.transactions.idempotencia_transactions import ClaveIdempotencia
 from .crud_factory import create_crud_router
 
+# Cabecera opcional de los endpoints de registro de ventas: un reintento con la misma clave
+# devuelve la respuesta guardada en lugar de registrar la venta otra vez
+IdempotencyKey = Header(None, alias="Idempotency-Key", max_length=255,
+                        description="Clave única de la petición para reintentos seguros")
+
 # Creación de routers CRUD genéricos para cada entidad
 clientes_router = create_crud_router("clientes", clientes_controller, "ci_cliente", Cliente)
 proveedores_router = create_crud_router("proveedores", proveedores_controller, "Rif", Proveedor)
 productos_router = create_crud_router("productos", productos_controller, "cod_producto", Producto, with_file_upload=True, file_field='img', create_model=ProductoCreate)
-ventas_router = create_crud_router("ventas", ventas_controller, "id_ventas", Venta)
+ventas_router = create_crud_router("ventas", ventas_controller, "id_venta", Venta)
 tasasCambio_router = create_crud_router("tasas_cambio", tasasCambio_controller, "id_tasa", TasaCambio)
 categoria_productos_router = create_crud_router("categoria_productos", categoria_productos_controller, "id_categoria", CategoriaProducto)
 compras_router = create_crud_router("compras", compras_controller, "id_compra", Compra)
@@ -34,15 +41,35 @@ def update(cod_producto: str, producto: Producto):
         raise HTTPException(status_code=404, detail="Producto no encontrado")
     return updated
 
+#endpoint para calcular los totales de una venta sin registrarla
+@ventas_router.post("/cotizar", response_model=CotizacionVenta)
+async def cotizar_venta(payload: CotizacionPayload):
+    """
+    Calcula el precio de cada línea y los totales en USD y Bs con los precios vigentes y la tasa actual
+    (los mismos que aplican los endpoints de registro)
+    """
+    try:
+        return await precios_service.acotizar(payload.detalles)
+    except ValueError as ve:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "success": False,
+                "error": "Error de validación",
+                "message": str(ve)
+            }
+        )
+
 #endpoint para registrar una venta
 @ventas_router.post("/registrar")
-def registrar_venta(payload: VentaTransaccionPayload):
+def registrar_venta(payload: VentaTransaccionPayload, idempotency_key: Optional[str] = IdempotencyKey):
     try:
         result = registrar_venta_con_detalles_y_pago(
             venta_data=payload.venta,
             detalles_data=payload.detalles,
             pago_data=payload.pago,
-            db_path=db_path
+            db_path=db_path,
+            idempotencia=ClaveIdempotencia.desde_peticion(idempotency_key, "/ventas/registrar", payload)
         )
         return result
     except HTTPException as he:
@@ -58,7 +85,7 @@ def registrar_venta(payload: VentaTransaccionPayload):
         )
         
 @ventas_router.post("/registrar_credito", response_model=VentaCreditoResponse)
-def registrar_venta_credito(payload: VentaCreditoTransaccionPayload):
+def registrar_venta_credito(payload: VentaCreditoTransaccionPayload, idempotency_key: Optional[str] = IdempotencyKey):
     """
     Endpoint específico para registrar ventas a crédito con pago inicial opcional
     """
@@ -68,7 +95,8 @@ def registrar_venta_credito(payload: VentaCreditoTransaccionPayload):
             detalles_data=payload.detalles,
             credito_data=payload.credito,
             pago_inicial=payload.pago_inicial,
-            db_path=db_path
+            db_path=db_path,
+            idempotencia=ClaveIdempotencia.desde_peticion(idempotency_key, "/ventas/registrar_credito", payload)
         )
         return result
     except HTTPException as he:
@@ -85,7 +113,7 @@ def registrar_venta_credito(payload: VentaCreditoTransaccionPayload):
 
 # Endpoint unificado que maneja ambos tipos de venta
 @ventas_router.post("/registrar_completa")
-def registrar_venta_unificada(payload: VentaUnificadaPayload):
+def registrar_venta_unificada(payload: VentaUnificadaPayload, idempotency_key: Optional[str] = IdempotencyKey):
     """
     Endpoint unificado que puede manejar tanto ventas de contado como a crédito
     basándose en el tipo_transaccion especificado
@@ -96,7 +124,8 @@ def registrar_venta_unificada(payload: VentaUnificadaPayload):
             detalles_data=payload.detalles,
             pago_data=payload.pago,
             credito_data=payload.credito,
-            db_path=db_path
+            db_path=db_path,
+            idempotencia=ClaveIdempotencia.desde_peticion(idempotency_key, "/ventas/registrar_completa", payload)
         )
         return result
     except HTTPException as he:
@@ -111,6 +140,19 @@ def registrar_venta_unificada(payload: VentaUnificadaPayload):
             }
         )
 
+#endpoint para registrar una compra con todas sus líneas
+@compras_router.post("/registrar")
+def registrar_compra(payload: CompraTransaccionPayload):
+    """
+    Registra la compra, los movimientos de entrada de sus líneas y los nuevos costos en una sola transacción
+    """
+    # registrar_compra_completa ya traduce los errores a HTTPException (y deja pasar WriterTimeoutError → 503)
+    return registrar_compra_completa(
+        compra_data=payload.compra,
+        detalles_data=payload.detalles,
+        db_path=db_path
+    )
+
 # Endpoint para obtener estadísticas de créditos
 @ventas_router.get("/creditos/estadisticas")
 def obtener_estadisticas_creditos():
@@ -172,15 +214,15 @@ def obtener_estadisticas_creditos():
 
 
 @tasasCambio_router.get("/ultima_tasa/", response_model=Any)
-def get_last_record():
+async def get_last_record():
     print("Obteniendo última tasa actualizada:")
-    ultima_tasa = tasasCambio_controller.get_last_record("id_tasa")
+    ultima_tasa = await tasasCambio_controller.aget_last_record("id_tasa")
     if not ultima_tasa:
         raise HTTPException(status_code=404, detail="Tasa de cambio no encontrada")
     return ultima_tasa
 
 @tasasCambio_router.get("/listar/", response_model=List[TasaCambio])
-def list_tasas_cambio(
+async def list_tasas_cambio(
     fecha_inicio: Optional[str] = None,
     fecha_fin: Optional[str] = None,
     field_key: str = Query('fecha', description="Campo por el que filtrar fechas"),
@@ -188,7 +230,7 @@ def list_tasas_cambio(
     order_direction: str = Query('DESC', description="Dirección de ordenación (ASC/DESC)")
 ):
     try:
-        return tasasCambio_controller.get_list_from_date(
+        return await tasasCambio_controller.aget_list_from_date(
             fecha_inicio=fecha_inicio,
             fecha_fin=fecha_fin,
             field_key=field_key,
@@ -205,9 +247,9 @@ def list_tasas_cambio(
 
 
 @ventas_router.get("/detalle/{id_venta}", response_model=DetalleVentaCompleto)
-def get_sale_detail(id_venta: int):
+async def get_sale_detail(id_venta: int):
     try:
-        detalle = vistaVentasController.obtener_detalle_venta(id_venta)
+        detalle = await vistaVentasController.aobtener_detalle_venta(id_venta)
         return detalle
     except HTTPException as he:
         raise he
@@ -218,23 +260,29 @@ def get_sale_detail(id_venta: int):
         )
 
 @ventas_router.get("/listar/", response_model=List[ResumenVenta])
-def list_ventas(
-    fecha_inicio: Optional[str] = None,
-    fecha_fin: Optional[str] = None,
+async def list_ventas(
+    response: Response,
+    fecha_inicio: Optional[str] = Query(None, description="Fecha inicial DD/MM/YYYY (inclusiva)"),
+    fecha_fin: Optional[str] = Query(None, description="Fecha final DD/MM/YYYY (inclusiva)"),
     ci_cliente: Optional[str] = None,
     tipo_venta: Optional[str] = None,
     metodo_pago: Optional[str] = None,
-    limit: int = 100
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor de la página anterior (cabecera X-Next-Cursor)")
 ):
     try:
-        return vistaVentasController.listar_ventas(
+        resumenes, siguiente = await vistaVentasController.alistar_ventas(
             fecha_inicio=fecha_inicio,
             fecha_fin=fecha_fin,
             ci_cliente=ci_cliente,
             tipo_venta=tipo_venta,
             metodo_pago=metodo_pago,
-            limit=limit
+            limit=limit,
+            cursor=cursor
         )
+        if siguiente:
+            response.headers["X-Next-Cursor"] = siguiente
+        return resumenes
     except HTTPException as he:
         raise he
     except Exception as e:
@@ -9,11 +9,11 @@ router = APIRouter(
 )
 
 @router.get("/productos-completos", response_model=List[ProductoVista])
-def get_productos_completos():
+async def get_productos_completos():
     """
     Obtiene todos los productos con información completa combinada
     """
-    return vistaProductosController.get_producto_completo()
+    return await vistaProductosController.aget_producto_completo()
 
 
 @router.get( "/{id_compra}/detalle", response_model=DetalleCompra,
@@ -28,5 +28,5 @@ def get_productos_completos():
         404: {"description": "Compra no encontrada"}
     }
 )
-def get_detalle_compra(id_compra: int):
-    return vistaComprasController.obtener_detalle_compra(id_compra)
+async def get_detalle_compra(id_compra: int):
+    return await vistaComprasController.aobtener_detalle_compra(id_compra)
@@ -1,52 +1,15 @@
 from datetime import datetime
 import os
 import sqlite3
-from typing import Type, List, Optional, Any, Dict
+from typing import Type, List, Optional, Any, Callable, Dict, Iterator, Tuple
 import uuid
 
-async def create_with_file(self, obj_in, file_field: str = 'img', upload_dir: str = 'public/uploads') -> Any:
-    """
-    Crea un registro con un archivo adjunto.
-    :param obj_in: Datos del objeto
-    :param file_field: Nombre del campo del archivo
-    :param upload_dir: Directorio donde guardar los archivos
-    :return: Datos del objeto creado
-    """
-    data = obj_in.model_dump(exclude={file_field})
-    file = getattr(obj_in, file_field, None)
-    
-    self._check_unique_constraints(data)        # Verificar restricciones de unicidad
-    
-    if file:                                        # Guardar archivo si existe
-        os.makedirs(upload_dir, exist_ok=True)
-        file_ext = os.path.splitext(file.filename)[1]
-        filename = f"{uuid.uuid4()}{file_ext}"
-        file_path = os.path.join(upload_dir, filename)
-        
-        with open(file_path, 'wb') as buffer:                                   # Guardar el archivo
-            buffer.write(await file.read())
-        
-        data[file_field] = f"/{upload_dir}/{filename}"
-    
-    fields = ', '.join(data.keys())                                         # Insertar en la base de datos
-    placeholders = ', '.join(['?'] * len(data))
-    values = tuple(data.values())
-    
-    try:
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                f"INSERT INTO {self.table_name} ({fields}) VALUES ({placeholders})",
-                values
-            )
-            conn.commit()
-            return data
-    except sqlite3.IntegrityError as e:
-        # Limpiar archivo subido si hubo error
-        if file and os.path.exists(file_path):
-            os.remove(file_path)
-        raise DuplicateKeyError("unknown", "unknown", str(e))
+from database.pool import get_pool
+from database.executor import async_method, run_in_db
+from database.writer import write_method
 
+EXPORT_CHUNK_SIZE = 1000
+BULK_QUERY_PARAMS = 500     # parámetros por consulta al buscar las claves existentes de una carga masiva
 
 class DuplicateKeyError(Exception):
     """Excepción personalizada para claves duplicadas."""
@@ -57,6 +20,26 @@ class DuplicateKeyError(Exception):
         super().__init__(self.message)
 
 
+class ConstraintViolationError(ValueError):
+    """
+    Excepción lanzada cuando un registro viola una restricción que no es de unicidad
+    (CHECK, NOT NULL, claves foráneas o un trigger). Es un error de validación del registro.
+    """
+    def __init__(self, detail: str, message: str = None):
+        self.detail = detail
+        self.message = message or f"El registro viola una restricción de la base de datos: {detail}"
+        super().__init__(self.message)
+
+
+class BulkWriteError(Exception):
+    """Excepción lanzada cuando una carga masiva atómica tiene filas con error (no se guarda ninguna)."""
+    def __init__(self, errores: List[Dict[str, Any]], total: int, message: str = None):
+        self.errores = errores
+        self.total = total
+        self.message = message or f"{len(errores)} de {total} registros con error, no se guardó ninguno"
+        super().__init__(self.message)
+
+
 class BaseService:
     """
     Plantilla reusable para interactuar con cualquier tabla de tu base de datos,
@@ -73,24 +56,179 @@ class BaseService:
         :param model: Clase del modelo Pydantic.
         :param table_name: Nombre de la tabla en la base de datos.
         :param db_path: Ruta al archivo de la base de datos.
+        :param unique_fields: Campos que deben ser únicos en la tabla. La unicidad la garantizan
+            los índices UNIQUE / PRIMARY KEY declarados en el esquema; estos campos sólo documentan
+            la intención y tienen prioridad al identificar el campo de un duplicado.
         """
         self.model = model
         self.table_name = table_name
         self.db_path = db_path
+        self.pool = get_pool(db_path)     # Pool compartido por todos los servicios de la misma base de datos
         self.unique_fields = unique_fields or []
 
+        # Columnas y sentencias compiladas una sola vez a partir de los campos del modelo:
+        # las lecturas seleccionan siempre estas columnas, en este orden, así cada fila
+        # (tupla) se convierte en modelo sin mirar cursor.description.
+        self.columns: Tuple[str, ...] = tuple(model.model_fields)
+        self._select_sql = f"SELECT {', '.join(self.columns)} FROM {table_name}"
+        self._statements: Dict[tuple, str] = {}
+        self._insert_statement(self.columns)
+        self._unique_keys: Optional[List[Tuple[str, ...]]] = None     # columnas de cada índice único
+        self._primary_key: Tuple[str, ...] = ()
+
+    def _statement(self, key: tuple, build: Callable[[], str]) -> str:
+        """
+        Devuelve la sentencia SQL compilada para key, construyéndola sólo la primera vez.
+        :param key: Tipo de sentencia y columnas que la determinan.
+        :param build: Función que construye el SQL.
+        """
+        sql = self._statements.get(key)
+        if sql is None:
+            sql = self._statements[key] = build()
+        return sql
+
+    def _insert_statement(self, keys: Tuple[str, ...]) -> str:
+        """
+        INSERT para un conjunto de columnas (el del modelo se compila en el constructor).
+        Un choque con cualquier índice único no inserta nada ni devuelve fila (ON CONFLICT DO NOTHING),
+        así la inserción y la detección del duplicado son una sola sentencia.
+        """
+        return self._statement(
+            ('insert', keys),
+            lambda: (
+                f"INSERT INTO {self.table_name} ({', '.join(keys)}) VALUES ({', '.join(['?'] * len(keys))}) "
+                f"ON CONFLICT DO NOTHING RETURNING {', '.join(self.columns)}"
+            )
+        )
+
+    def _from_row(self, row: tuple) -> Any:
+        """Convierte una fila leída con las columnas del modelo en una instancia del modelo."""
+        return self.model.from_dict(dict(zip(self.columns, row)))
 
     def get_all(self) -> List[Any]:
         """
         Obtiene todos los registros de la tabla.
         :return: Lista de instancias del modelo.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(f"SELECT * FROM {self.table_name}")
-            rows = cursor.fetchall()
-            return [self.model.from_dict(dict(zip([col[0] for col in cursor.description], row))) for row in rows]
+        with self.pool.connection() as conn:
+            rows = conn.execute(self._select_sql).fetchall()
+        return list(map(self._from_row, rows))
+
 
+    def _validate_columns(self, names, context: str) -> None:
+        """
+        Verifica que los nombres de columna pertenezcan al modelo (evita inyección en SQL dinámico).
+        :raises ValueError: Si algún campo no existe en el modelo.
+        """
+        invalidos = [n for n in names if n not in self.model.model_fields]
+        if invalidos:
+            raise ValueError(f"Campos inválidos en {context}: {', '.join(invalidos)}")
+
+    def list_page(
+        self,
+        key_fields: List[str],
+        limit: Optional[int] = 100,
+        after: Optional[List[Any]] = None,
+        fields: Optional[List[str]] = None,
+        filters: Optional[Dict[str, Any]] = None
+    ) -> Tuple[List[Any], Optional[List[Any]]]:
+        """
+        Obtiene una página de registros ordenada por la clave primaria (paginación keyset).
+        El filtrado, la proyección y el límite se resuelven en SQL.
+        :param key_fields: Campos de la clave primaria usados para ordenar y paginar.
+        :param limit: Cantidad máxima de registros (None devuelve todos los registros en una sola página).
+        :param after: Valores de la clave del último registro de la página anterior.
+        :param fields: Campos a devolver; si se indica, se devuelven diccionarios en lugar de modelos.
+        :param filters: Filtros de igualdad campo -> valor.
+        :return: Registros de la página y la clave para pedir la siguiente (None si no hay más).
+        :raises ValueError: Si algún campo no pertenece al modelo.
+        """
+        filters = filters or {}
+        key_fields = tuple(key_fields)
+        filter_keys = tuple(filters.keys())
+        self._validate_columns(key_fields, "la clave")
+        self._validate_columns(filter_keys, "los filtros")
+        if fields:
+            self._validate_columns(fields, "fields")
+            # La clave siempre se incluye para poder construir el cursor
+            columns = tuple(dict.fromkeys(key_fields + tuple(fields)))
+        else:
+            columns = self.columns
+        if after is not None and len(after) != len(key_fields):
+            raise ValueError("El cursor no corresponde a la clave de la entidad")
+
+        def build() -> str:
+            conditions = [f"{k} = ?" for k in filter_keys]
+            if after is not None:
+                if len(key_fields) == 1:
+                    conditions.append(f"{key_fields[0]} > ?")
+                else:
+                    conditions.append(f"({', '.join(key_fields)}) > ({', '.join(['?'] * len(key_fields))})")
+            query = f"SELECT {', '.join(columns)} FROM {self.table_name}"
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            query += f" ORDER BY {', '.join(key_fields)}"
+            return query + " LIMIT ?" if limit is not None else query
+
+        query = self._statement(
+            ('list_page', key_fields, columns, filter_keys, after is not None, limit is not None), build
+        )
+        params = list(filters.values())
+        if after is not None:
+            params.extend(after)
+        if limit is not None:
+            # Se pide un registro extra: sólo si existe hay una página siguiente
+            params.append(limit + 1)
+
+        with self.pool.connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        siguiente = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            posiciones = [columns.index(k) for k in key_fields]
+            siguiente = [rows[-1][i] for i in posiciones]
+        if fields:
+            return [dict(zip(columns, row)) for row in rows], siguiente
+        return list(map(self._from_row, rows)), siguiente
+
+    def export_rows(
+        self,
+        fields: Optional[List[str]] = None,
+        chunk_size: int = EXPORT_CHUNK_SIZE
+    ) -> Tuple[List[str], Iterator[List[tuple]]]:
+        """
+        Prepara la exportación de la tabla completa leyendo con fetchmany,
+        de modo que en memoria sólo hay un bloque de filas a la vez.
+        Usa una conexión dedicada que se cierra al agotar (o cerrar) el iterador.
+        :param fields: Campos a exportar (por defecto todos).
+        :param chunk_size: Filas por bloque.
+        :return: Nombres de columnas e iterador de bloques de filas (tuplas).
+        :raises ValueError: Si algún campo no pertenece al modelo.
+        """
+        if fields:
+            self._validate_columns(fields, "fields")
+        select = ', '.join(fields) if fields else '*'
+
+        conn = self.pool.dedicated_connection()
+        try:
+            cursor = conn.execute(f"SELECT {select} FROM {self.table_name}")
+        except Exception:
+            conn.close()
+            raise
+        columns = [col[0] for col in cursor.description]
+
+        def chunks() -> Iterator[List[tuple]]:
+            try:
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                conn.close()
+
+        return columns, chunks()
 
     def get_by_id(self, id_field: str, id_value: Any) -> Optional[Any]:
         """
@@ -99,13 +237,10 @@ class BaseService:
         :param id_value: Valor del campo clave primaria.
         :return: Instancia del modelo o None si no existe.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(f"SELECT * FROM {self.table_name} WHERE {id_field} = ?", (id_value,))
-            row = cursor.fetchone()
-            if row:
-                return self.model.from_dict(dict(zip([col[0] for col in cursor.description], row)))
-            return None
+        query = self._statement(('get_by_id', id_field), lambda: f"{self._select_sql} WHERE {id_field} = ?")
+        with self.pool.connection() as conn:
+            row = conn.execute(query, (id_value,)).fetchone()
+        return self._from_row(row) if row else None
 
     def get_by_keys(self, keys: Dict[str, Any]) -> Optional[Any]:
         """
@@ -113,83 +248,276 @@ class BaseService:
         :param keys: Diccionario con los campos clave y sus valores.
         :return: Instancia del modelo o None si no existe.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            where_clause = " AND ".join([f"{k} = ?" for k in keys.keys()])
-            values = tuple(keys.values())
-            cursor.execute(f"SELECT * FROM {self.table_name} WHERE {where_clause}", values)
-            row = cursor.fetchone()
-            if row:
-                return self.model.from_dict(dict(zip([col[0] for col in cursor.description], row)))
-            return None
-
-    def _check_unique_constraints(self, obj_data: Dict[str, Any], exclude_id: Any = None) -> None:
-        """
-        Verifica las restricciones de unicidad antes de crear/actualizar.
-        :param obj_data: Datos del objeto a verificar.
-        :param exclude_id: ID a excluir en la verificación (para updates).
-        :raises DuplicateKeyError: Si encuentra un duplicado.
-        """
-        for field in self.unique_fields:
-            if field in obj_data:
-                value = obj_data[field]
-                with sqlite3.connect(self.db_path) as conn:
-                    cursor = conn.cursor()
-                    
-                    # Query base para verificar duplicados
-                    query = f"SELECT COUNT(*) FROM {self.table_name} WHERE {field} = ?"
-                    params = [value]
-                    
-                    # Si es un update, excluir el registro actual
-                    if exclude_id is not None:
-                        # Asumimos que el primer campo único es la primary key
-                        pk_field = self.unique_fields[0] if self.unique_fields else field
-                        query += f" AND {pk_field} != ?"
-                        params.append(exclude_id)
-                    
-                    cursor.execute(query, params)
-                    count = cursor.fetchone()[0]
-                    
-                    if count > 0:
-                        raise DuplicateKeyError(field, value)
+        key_names = tuple(keys.keys())
+        query = self._statement(
+            ('get_by_keys', key_names),
+            lambda: f"{self._select_sql} WHERE {' AND '.join(f'{k} = ?' for k in key_names)}"
+        )
+        with self.pool.connection() as conn:
+            row = conn.execute(query, tuple(keys.values())).fetchone()
+        return self._from_row(row) if row else None
+
+    def _load_unique_keys(self, conn: sqlite3.Connection) -> List[Tuple[str, ...]]:
+        """
+        Lee una vez las columnas de cada índice único de la tabla (PRIMARY KEY incluida),
+        con los campos de unique_fields primero.
+        """
+        if self._unique_keys is None:
+            keys = []
+            for _, name, unique, *_ in conn.execute(f"PRAGMA index_list({self.table_name})"):
+                if unique:
+                    keys.append(tuple(col[2] for col in conn.execute(f"PRAGMA index_info({name})")))
+            # Una INTEGER PRIMARY KEY es el rowid y no aparece como índice
+            pk = tuple(col[1] for col in sorted(
+                (c for c in conn.execute(f"PRAGMA table_info({self.table_name})") if c[5]), key=lambda c: c[5]
+            ))
+            if pk and pk not in keys:
+                keys.append(pk)
+            self._primary_key = pk
+            prioridad = set(self.unique_fields)
+            self._unique_keys = sorted(keys, key=lambda cols: not prioridad.intersection(cols))
+        return self._unique_keys
+
+    def _duplicate_error(self, conn: sqlite3.Connection, data: Dict[str, Any]) -> DuplicateKeyError:
+        """
+        Identifica, con una sola consulta, qué índice único chocó en un INSERT descartado por
+        ON CONFLICT y construye el DuplicateKeyError con su campo y valor.
+        """
+        candidatos = [
+            cols for cols in self._load_unique_keys(conn)
+            if all(data.get(c) is not None for c in cols)
+        ]
+        if candidatos:
+            query = " UNION ALL ".join(
+                f"SELECT {i} FROM {self.table_name} WHERE {' AND '.join(f'{c} = ?' for c in cols)}"
+                for i, cols in enumerate(candidatos)
+            ) + " LIMIT 1"
+            params = [data[c] for cols in candidatos for c in cols]
+            row = conn.execute(query, params).fetchone()
+            if row is not None:
+                cols = candidatos[row[0]]
+                if len(cols) == 1:
+                    return DuplicateKeyError(cols[0], data[cols[0]])
+                return DuplicateKeyError(', '.join(cols), tuple(data[c] for c in cols))
+        return DuplicateKeyError("unknown", "unknown", "Error de integridad: registro duplicado")
 
     def create(self, obj_in) -> Any:
         """
         Inserta un nuevo registro en la tabla.
         :param obj_in: Instancia del modelo a insertar.
         :raises DuplicateKeyError: Si viola restricciones de unicidad.
+        :raises ConstraintViolationError: Si viola otra restricción (CHECK, NOT NULL, claves foráneas).
         """
-        data = obj_in.to_dict()
-        
-        # Verificar restricciones de unicidad
-        self._check_unique_constraints(data)
-        
-        fields = ', '.join(data.keys())
-        placeholders = ', '.join(['?'] * len(data))
-        values = tuple(data.values())
-        
+        return self._insert(obj_in.to_dict())
+
+    @write_method
+    def _insert(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Inserta un registro en el escritor único. La unicidad la verifica el propio INSERT
+        contra los índices únicos de la tabla.
+        :return: Registro insertado (con la clave generada, si la hay).
+        :raises DuplicateKeyError: Si viola restricciones de unicidad.
+        :raises ConstraintViolationError: Si viola otra restricción (CHECK, NOT NULL, claves foráneas).
+        """
+        query = self._insert_statement(tuple(data.keys()))
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    f"INSERT INTO {self.table_name} ({fields}) VALUES ({placeholders})",
-                    values
-                )
-                conn.commit()
+            with self.pool.connection() as conn:
+                rows = conn.execute(query, tuple(data.values())).fetchall()
+                if not rows:
+                    raise self._duplicate_error(conn, data)
         except sqlite3.IntegrityError as e:
-            # Manejar errores de integridad de SQLite
-            error_msg = str(e).lower()
-            
-            # Intentar identificar qué campo causó el error
-            for field in self.unique_fields:
-                if field.lower() in error_msg:
-                    raise DuplicateKeyError(field, data.get(field))
-            
-            # Si no podemos identificar el campo específico
-            raise DuplicateKeyError("unknown", "unknown", "Error de integridad: registro duplicado")
-        
-        return data
+            # Los duplicados los absorbe ON CONFLICT DO NOTHING: aquí llegan las demás restricciones
+            raise ConstraintViolationError(str(e))
+
+        return dict(zip(self.columns, rows[0]))
+
+    def bulk_create(self, objs: List[Any], atomic: bool = True) -> List[Dict[str, Any]]:
+        """
+        Inserta varios registros en una sola transacción (executemany en el escritor único).
+        :param objs: Instancias del modelo a insertar.
+        :param atomic: Si True, un registro con error cancela toda la carga; si False, se guardan
+            los registros válidos y se informan los demás.
+        :return: Resultado por registro: {"indice", "estado" ("creado" | "duplicado" | "error"), "detalle"}.
+        :raises BulkWriteError: Si atomic y algún registro falló.
+        """
+        return self._bulk_write([obj.to_dict() for obj in objs], False, atomic)
+
+    def bulk_upsert(self, objs: List[Any], atomic: bool = True) -> List[Dict[str, Any]]:
+        """
+        Inserta o actualiza (por clave primaria) varios registros en una sola transacción,
+        con INSERT ... ON CONFLICT DO UPDATE.
+        :param objs: Instancias del modelo a guardar.
+        :param atomic: Si True, un registro con error cancela toda la carga; si False, se guardan
+            los registros válidos y se informan los demás.
+        :return: Resultado por registro: {"indice", "estado" ("creado" | "actualizado" | "error"), "detalle"}.
+        :raises BulkWriteError: Si atomic y algún registro falló.
+        """
+        return self._bulk_write([obj.to_dict() for obj in objs], True, atomic)
+
+    def _bulk_statement(self, keys: Tuple[str, ...], upsert: bool) -> str:
+        """
+        INSERT de las cargas masivas para un conjunto de columnas. Sin ON CONFLICT DO NOTHING
+        (los duplicados ya se descartaron antes), o con ON CONFLICT (clave primaria) DO UPDATE si es upsert.
+        """
+        def build() -> str:
+            query = f"INSERT INTO {self.table_name} ({', '.join(keys)}) VALUES ({', '.join(['?'] * len(keys))})"
+            if not upsert:
+                return query
+            pk = self._primary_key
+            set_fields = [k for k in keys if k not in pk]
+            accion = (
+                f"DO UPDATE SET {', '.join(f'{k} = excluded.{k}' for k in set_fields)}" if set_fields else "DO NOTHING"
+            )
+            return f"{query} ON CONFLICT ({', '.join(pk)}) {accion}"
+        return self._statement(('bulk_upsert' if upsert else 'bulk_insert', keys), build)
+
+    def _existing_keys(
+        self, conn: sqlite3.Connection, cols: Tuple[str, ...], values: List[tuple]
+    ) -> set:
+        """
+        Busca, por bloques de BULK_QUERY_PARAMS parámetros, cuáles de los valores de clave ya existen en la tabla.
+        :param cols: Columnas de un índice único.
+        :param values: Tuplas de valores para esas columnas.
+        :return: Conjunto de tuplas existentes.
+        """
+        existentes = set()
+        por_consulta = max(1, BULK_QUERY_PARAMS // len(cols))
+        for inicio in range(0, len(values), por_consulta):
+            bloque = values[inicio:inicio + por_consulta]
+            if len(cols) == 1:
+                condicion = f"{cols[0]} IN ({', '.join(['?'] * len(bloque))})"
+            else:
+                fila = f"({', '.join(['?'] * len(cols))})"
+                condicion = f"({', '.join(cols)}) IN (VALUES {', '.join([fila] * len(bloque))})"
+            params = [v for valor in bloque for v in valor]
+            existentes.update(
+                conn.execute(f"SELECT {', '.join(cols)} FROM {self.table_name} WHERE {condicion}", params)
+            )
+        return existentes
+
+    @write_method
+    def _bulk_write(self, rows: List[Dict[str, Any]], upsert: bool, atomic: bool) -> List[Dict[str, Any]]:
+        """
+        Guarda una carga masiva en el escritor único.
+        Los duplicados se detectan antes de escribir con una consulta por índice único para todo
+        el lote; las filas restantes se escriben con executemany. Si éste falla (CHECK, claves
+        foráneas, triggers) se repite fila por fila, cada una en su SAVEPOINT, para saber cuáles fallan.
+        """
+        resultados = [{"indice": i, "estado": None, "detalle": None} for i in range(len(rows))]
+        with self.pool.connection() as conn:
+            unique_keys = self._load_unique_keys(conn)
+            if upsert and not self._primary_key:
+                raise ValueError(f"La tabla {self.table_name} no tiene clave primaria para hacer upsert")
+            # En un upsert la clave primaria decide entre crear y actualizar; en un create cualquier índice único es duplicado
+            claves = [self._primary_key] if upsert else unique_keys
+            for cols in claves:
+                con_clave = [
+                    (i, tuple(row[c] for c in cols)) for i, row in enumerate(rows)
+                    if resultados[i]["estado"] is None and all(row.get(c) is not None for c in cols)
+                ]
+                if not con_clave:
+                    continue
+                existentes = self._existing_keys(conn, cols, list({valor for _, valor in con_clave}))
+                vistos = set()
+                for i, valor in con_clave:
+                    if upsert:
+                        resultados[i]["estado"] = "actualizado" if valor in existentes or valor in vistos else "creado"
+                    elif valor in existentes or valor in vistos:
+                        error = DuplicateKeyError(cols[0], valor[0]) if len(cols) == 1 \
+                            else DuplicateKeyError(', '.join(cols), valor)
+                        resultados[i].update(estado="duplicado", detalle=error.message)
+                        continue
+                    vistos.add(valor)
+            for resultado in resultados:
+                if resultado["estado"] is None:
+                    resultado["estado"] = "creado"
+
+            if atomic and any(r["detalle"] for r in resultados):
+                raise BulkWriteError([r for r in resultados if r["detalle"]], len(rows))
+
+            pendientes = [i for i, r in enumerate(resultados) if r["detalle"] is None]
+            grupos: Dict[Tuple[str, ...], List[int]] = {}
+            for i in pendientes:
+                grupos.setdefault(tuple(rows[i].keys()), []).append(i)
 
+            conn.execute("SAVEPOINT carga_masiva")
+            try:
+                for keys, indices in grupos.items():
+                    conn.executemany(self._bulk_statement(keys, upsert), [tuple(rows[i].values()) for i in indices])
+            except sqlite3.Error:
+                conn.execute("ROLLBACK TO carga_masiva")
+                conn.execute("RELEASE carga_masiva")
+                self._bulk_write_rows(conn, rows, pendientes, resultados, upsert)
+                if atomic and any(r["detalle"] for r in resultados):
+                    raise BulkWriteError([r for r in resultados if r["detalle"]], len(rows))
+            else:
+                conn.execute("RELEASE carga_masiva")
+        return resultados
+
+    def _bulk_write_rows(
+        self,
+        conn: sqlite3.Connection,
+        rows: List[Dict[str, Any]],
+        indices: List[int],
+        resultados: List[Dict[str, Any]],
+        upsert: bool
+    ) -> None:
+        """Escribe las filas de una carga masiva una a una, registrando el error de las que fallan."""
+        for i in indices:
+            conn.execute("SAVEPOINT fila")
+            try:
+                conn.execute(self._bulk_statement(tuple(rows[i].keys()), upsert), tuple(rows[i].values()))
+            except sqlite3.Error as e:
+                conn.execute("ROLLBACK TO fila")
+                resultados[i].update(estado="error", detalle=str(e))
+            conn.execute("RELEASE fila")
+
+    async def create_with_file(self, obj_in, file_field: str = 'img', upload_dir: str = 'public/uploads') -> Any:
+        """
+        Crea un registro con un archivo adjunto.
+        El archivo se lee de forma asíncrona; la escritura en disco y el INSERT se hacen
+        en el executor de base de datos para no bloquear el event loop.
+        :param obj_in: Datos del objeto
+        :param file_field: Nombre del campo del archivo
+        :param upload_dir: Directorio donde guardar los archivos
+        :return: Datos del objeto creado
+        """
+        data = obj_in.model_dump(exclude={file_field})
+        file = getattr(obj_in, file_field, None)
+        contenido = await file.read() if file else None
+        nombre = file.filename if file else None
+        return await run_in_db(self._create_with_file, data, file_field, nombre, contenido, upload_dir)
+
+    def _create_with_file(
+        self,
+        data: Dict[str, Any],
+        file_field: str,
+        filename: Optional[str],
+        contenido: Optional[bytes],
+        upload_dir: str
+    ) -> Dict[str, Any]:
+        """Parte síncrona de create_with_file: guarda el archivo e inserta el registro."""
+        file_path = None
+        if contenido is not None:                       # Guardar archivo si existe
+            os.makedirs(upload_dir, exist_ok=True)
+            file_ext = os.path.splitext(filename or '')[1]
+            nombre_archivo = f"{uuid.uuid4()}{file_ext}"
+            file_path = os.path.join(upload_dir, nombre_archivo)
+
+            with open(file_path, 'wb') as buffer:                               # Guardar el archivo
+                buffer.write(contenido)
+
+            data[file_field] = f"/{upload_dir}/{nombre_archivo}"
+
+        try:
+            return self._insert(data)                                           # Insertar en la base de datos
+        except Exception:
+            # Limpiar archivo subido si hubo error
+            if file_path and os.path.exists(file_path):
+                os.remove(file_path)
+            raise
+
+    @write_method
     def update(self, id_field: str, id_value: Any, obj_in) -> bool:
         """
         Actualiza un registro existente en la tabla.
@@ -199,17 +527,16 @@ class BaseService:
         :return: True si se actualizó, False si no existe.
         """
         data = obj_in.to_dict()
-        fields = ', '.join([f"{k} = ?" for k in data.keys() if k != id_field])
-        values = tuple([v for k, v in data.items() if k != id_field]) + (id_value,)
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                f"UPDATE {self.table_name} SET {fields} WHERE {id_field} = ?",
-                values
-            )
-            conn.commit()
-            return cursor.rowcount > 0
+        set_fields = tuple(k for k in data.keys() if k != id_field)
+        query = self._statement(
+            ('update', set_fields, id_field),
+            lambda: f"UPDATE {self.table_name} SET {', '.join(f'{k} = ?' for k in set_fields)} WHERE {id_field} = ?"
+        )
+        values = tuple(data[k] for k in set_fields) + (id_value,)
+        with self.pool.connection() as conn:
+            return conn.execute(query, values).rowcount > 0
 
+    @write_method
     def update_by_keys(self, keys: Dict[str, Any], obj_in) -> bool:
         """
         Actualiza un registro existente usando múltiples campos clave.
@@ -219,23 +546,20 @@ class BaseService:
         """
         data = obj_in.to_dict()
         # Excluir los campos clave del update
-        update_fields = [f"{k} = ?" for k in data.keys() if k not in keys]
-        update_values = [v for k, v in data.items() if k not in keys]
-        
-        where_clause = " AND ".join([f"{k} = ?" for k in keys.keys()])
-        where_values = tuple(keys.values())
-        
-        all_values = tuple(update_values) + where_values
-        
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                f"UPDATE {self.table_name} SET {', '.join(update_fields)} WHERE {where_clause}",
-                all_values
+        set_fields = tuple(k for k in data.keys() if k not in keys)
+        key_names = tuple(keys.keys())
+        query = self._statement(
+            ('update_by_keys', set_fields, key_names),
+            lambda: (
+                f"UPDATE {self.table_name} SET {', '.join(f'{k} = ?' for k in set_fields)} "
+                f"WHERE {' AND '.join(f'{k} = ?' for k in key_names)}"
             )
-            conn.commit()
-            return cursor.rowcount > 0
+        )
+        values = tuple(data[k] for k in set_fields) + tuple(keys.values())
+        with self.pool.connection() as conn:
+            return conn.execute(query, values).rowcount > 0
 
+    @write_method
     def delete(self, id_field: str, id_value: Any) -> bool:
         """
         Elimina un registro por su campo clave primaria.
@@ -243,31 +567,24 @@ class BaseService:
         :param id_value: Valor del campo clave primaria.
         :return: True si se eliminó, False si no existe.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                f"DELETE FROM {self.table_name} WHERE {id_field} = ?",
-                (id_value,)
-            )
-            conn.commit()
-            return cursor.rowcount > 0
+        query = self._statement(('delete', id_field), lambda: f"DELETE FROM {self.table_name} WHERE {id_field} = ?")
+        with self.pool.connection() as conn:
+            return conn.execute(query, (id_value,)).rowcount > 0
 
+    @write_method
     def delete_by_keys(self, keys: Dict[str, Any]) -> bool:
         """
         Elimina un registro usando múltiples campos clave.
         :param keys: Diccionario con los campos clave y sus valores.
         :return: True si se eliminó, False si no existe.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            where_clause = " AND ".join([f"{k} = ?" for k in keys.keys()])
-            values = tuple(keys.values())
-            cursor.execute(
-                f"DELETE FROM {self.table_name} WHERE {where_clause}",
-                values
-            )
-            conn.commit()
-            return cursor.rowcount > 0 
+        key_names = tuple(keys.keys())
+        query = self._statement(
+            ('delete_by_keys', key_names),
+            lambda: f"DELETE FROM {self.table_name} WHERE {' AND '.join(f'{k} = ?' for k in key_names)}"
+        )
+        with self.pool.connection() as conn:
+            return conn.execute(query, tuple(keys.values())).rowcount > 0
 
     def get_last_record(self, id_field: str) -> Optional[Any]:
         """
@@ -275,24 +592,21 @@ class BaseService:
         :param id_field: Nombre del campo clave primaria para ordenar.
         :return: Instancia del modelo o None si la tabla está vacía.
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute(f"SELECT * FROM {self.table_name} ORDER BY {id_field} DESC LIMIT 1")
-            
-            row = cursor.fetchone()
-            if row:
-                return self.model.from_dict(dict(zip([col[0] for col in cursor.description], row)))
-            return None
+        query = self._statement(
+            ('last_record', id_field), lambda: f"{self._select_sql} ORDER BY {id_field} DESC LIMIT 1"
+        )
+        with self.pool.connection() as conn:
+            row = conn.execute(query).fetchone()
+        return self._from_row(row) if row else None
         
 #VISTAS
     def get_productos_completos(self) -> List[Dict[str, Any]]:
         """
         Obtiene todos los productos con información completa desde la vista
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row  # Para acceso por nombre de columna
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row  # Para acceso por nombre de columna
             cursor.execute("SELECT * FROM vista_productos_completos")
             return [dict(row) for row in cursor.fetchall()]
 
@@ -325,7 +639,7 @@ class BaseService:
         if order_direction.upper() not in ('ASC', 'DESC'):
             raise ValueError("order_direction debe ser 'ASC' o 'DESC'")
         
-        query = f"SELECT * FROM {self.table_name}"
+        query = self._select_sql
         params = []
         conditions = []
         
@@ -353,11 +667,23 @@ class BaseService:
         query += f" ORDER BY {order_by} {order_direction}"
         
         # Ejecución
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-            
-            return [self.model.from_dict(dict(row)) for row in rows] if rows else []            
-                
\ No newline at end of file
+        with self.pool.connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return list(map(self._from_row, rows))
+
+    # Interfaz asíncrona del repositorio: las mismas operaciones, ejecutadas en el executor
+    # de base de datos para que los endpoints async no bloqueen el event loop.
+    aget_all = async_method(get_all)
+    alist_page = async_method(list_page)
+    aget_by_id = async_method(get_by_id)
+    aget_by_keys = async_method(get_by_keys)
+    acreate = async_method(create)
+    abulk_create = async_method(bulk_create)
+    abulk_upsert = async_method(bulk_upsert)
+    aupdate = async_method(update)
+    aupdate_by_keys = async_method(update_by_keys)
+    adelete = async_method(delete)
+    adelete_by_keys = async_method(delete_by_keys)
+    aget_last_record = async_method(get_last_record)
+    aget_productos_completos = async_method(get_productos_completos)
+    aget_data_from_date = async_method(get_data_from_date)
@@ -3,16 +3,19 @@ from typing import List, Optional, Dict
 from datetime import date
 from backend.models.view_models import DetalleCompra, DetalleProductoCompra, ResumenCompra
 from backend.models.models import Compra, Proveedor, Producto, ProductoNoPreparado, Movimiento
+from database.pool import get_pool
+from database.executor import async_method
 
 class CompraService:
     def __init__(self, db_path: str = None):
         self.db_path = db_path
+        self.pool = get_pool(db_path)
 
     def _execute_query(self, query: str, params: tuple = ()) -> List[Dict]:
         """Ejecuta una consulta y devuelve los resultados como diccionarios"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
             cursor.execute(query, params)
             return [dict(row) for row in cursor.fetchall()]
 
@@ -176,4 +179,8 @@ class CompraService:
                 fecha_formateada=compra.fecha.strftime("%d/%m/%Y")
             ))
         
-        return resumenes
\ No newline at end of file
+        return resumenes
+
+    # Interfaz asíncrona (se ejecuta en el executor de base de datos)
+    aobtener_detalle_compra = async_method(obtener_detalle_compra)
+    aobtener_resumenes_compras = async_method(obtener_resumenes_compras)
@@ -0,0 +1,38 @@
+import sqlite3
+from typing import List, Dict
+from backend.models.view_models import AlertaStock
+from database.pool import get_pool
+
+class InventarioService:
+    """
+    Consultas de inventario sobre Productos_noPreparados, que guarda el stock actual de cada
+    producto y se mantiene al día desde Movimientos (triggers) y las transacciones de venta.
+    """
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path
+        self.pool = get_pool(db_path)
+
+    def _execute_query(self, query: str, params: tuple = ()) -> List[Dict]:
+        """Ejecuta una consulta y devuelve los resultados como diccionarios"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            cursor.execute(query, params)
+            return [dict(row) for row in cursor.fetchall()]
+
+    def obtener_alertas_stock(self) -> List[AlertaStock]:
+        """
+        Obtiene los productos con stock por debajo del mínimo.
+        La condición coincide con el índice parcial idx_noPreparados_stock_bajo, así que
+        sólo se leen las filas en alerta sin importar el tamaño del catálogo.
+        """
+        alertas = self._execute_query(
+            """SELECT np.cod_producto_noPreparado AS cod_producto, p.nombre,
+                      np.cant_actual, np.cant_min, np.cant_min - np.cant_actual AS faltante,
+                      np.unidad_medida
+               FROM Productos_noPreparados np
+               JOIN Productos p ON p.cod_producto = np.cod_producto_noPreparado
+               WHERE np.cant_actual < np.cant_min
+               ORDER BY faltante DESC, np.cod_producto_noPreparado"""
+        )
+        return [AlertaStock(**alerta) for alerta in alertas]
@@ -0,0 +1,131 @@
+import os
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from backend.models.models import CotizacionVenta, DetalleVenta, LineaCotizada, TasaCambio, Venta
+from backend.services.tasaCambio_cache import TTLCache, tasa_cache, ULTIMA_TASA
+from database.executor import async_method
+
+load_dotenv()
+
+# Segundos que se sirve el mapa de precios desde memoria (se invalida además al escribir productos)
+PRECIOS_CACHE_TTL = float(os.getenv('PRECIOS_CACHE_TTL', '3600'))
+
+MAPA_PRECIOS = 'mapa_precios'
+
+# Diferencia admitida entre un monto enviado por la caja y el total del servidor, en céntimos
+# (ambos redondeados a 2 decimales), para no exigir que la caja reproduzca el redondeo del servidor
+TOLERANCIA_CENTIMOS = 1
+
+# Caché compartida del mapa cod_producto -> precio_usd
+precios_cache = TTLCache({MAPA_PRECIOS: PRECIOS_CACHE_TTL})
+
+
+class PreciosService:
+    """
+    Motor de precios de las ventas: calcula el precio de cada línea y los totales en USD y Bs
+    a partir de Productos.precio_usd y la tasa de cambio actual, ambos servidos desde memoria.
+    Los montos que envía la caja no se usan.
+    """
+
+    def __init__(self, producto_service, tasa_service):
+        """
+        :param producto_service: Servicio de la tabla Productos.
+        :param tasa_service: Servicio de la tabla TasasCambio.
+        """
+        self.producto_service = producto_service
+        self.tasa_service = tasa_service
+
+    def _cargar_mapa(self) -> Dict[str, float]:
+        """Lee en una consulta el precio en USD de todos los productos."""
+        with self.producto_service.pool.connection() as conn:
+            return dict(conn.execute("SELECT cod_producto, precio_usd FROM Productos"))
+
+    def mapa_precios(self) -> Dict[str, float]:
+        """Mapa cod_producto -> precio_usd (desde caché si está vigente)."""
+        return precios_cache.get_or_load(MAPA_PRECIOS, self._cargar_mapa)
+
+    def tasa_actual(self) -> TasaCambio:
+        """
+        Última tasa de cambio registrada (la misma caché que GET /tasas_cambio/ultima_tasa/).
+        :raises ValueError: Si no hay ninguna tasa registrada.
+        """
+        tasa = tasa_cache.get_or_load(ULTIMA_TASA, lambda: self.tasa_service.get_last_record("id_tasa"))
+        if tasa is None:
+            raise ValueError("No hay una tasa de cambio registrada para calcular la venta")
+        return tasa
+
+    def invalidar(self) -> None:
+        """Descarta el mapa de precios (se llama cada vez que se escriben productos)."""
+        precios_cache.invalidate(MAPA_PRECIOS)
+
+    def cotizar(self, detalles_data: List[DetalleVenta]) -> CotizacionVenta:
+        """
+        Calcula el precio de cada línea y los totales de la venta.
+        El total en Bs se calcula sobre el total en USD sin redondear y ambos se redondean a 2 decimales.
+        :param detalles_data: Detalles con código de producto y cantidad.
+        :return: Líneas con precio y subtotales, y totales en USD y Bs con la tasa usada.
+        :raises ValueError: Si un producto no existe, no tiene precio o no hay tasa de cambio.
+        """
+        precios = self.mapa_precios()
+        tasa = self.tasa_actual()
+
+        lineas = []
+        total_usd = 0.0
+        for detalle in detalles_data:
+            precio = precios.get(detalle.cod_producto)
+            if precio is None:
+                if detalle.cod_producto in precios:
+                    raise ValueError(f"El producto {detalle.cod_producto} no tiene precio")
+                raise ValueError(f"Producto {detalle.cod_producto} no encontrado")
+            subtotal = precio * detalle.cantidad_producto
+            total_usd += subtotal
+            lineas.append(LineaCotizada(
+                cod_producto=detalle.cod_producto,
+                cantidad_producto=detalle.cantidad_producto,
+                precio_unitario=precio,
+                subtotal_usd=round(subtotal, 2),
+                subtotal_bs=round(subtotal * tasa.valor_usd_bs, 2)
+            ))
+
+        return CotizacionVenta(
+            lineas=lineas,
+            monto_total_usd=round(total_usd, 2),
+            monto_total_bs=round(total_usd * tasa.valor_usd_bs, 2),
+            id_tasa=tasa.id_tasa,
+            valor_usd_bs=tasa.valor_usd_bs
+        )
+
+    def preciar_venta(self, venta_data: Venta, detalles_data: List[DetalleVenta]) -> Tuple[Venta, List[DetalleVenta]]:
+        """
+        Devuelve copias de la venta y sus detalles con los montos, precios e id_tasa del motor.
+        :raises ValueError: Si un producto no existe, no tiene precio o no hay tasa de cambio.
+        """
+        cotizacion = self.cotizar(detalles_data)
+        venta = venta_data.model_copy(update={
+            "monto_total_usd": cotizacion.monto_total_usd,
+            "monto_total_bs": cotizacion.monto_total_bs,
+            "id_tasa": cotizacion.id_tasa
+        })
+        detalles = [
+            detalle.model_copy(update={"precio_unitario": linea.precio_unitario})
+            for detalle, linea in zip(detalles_data, cotizacion.lineas)
+        ]
+        return venta, detalles
+
+    @staticmethod
+    def cuadrar_monto(enviado: Optional[float], total: float, mensaje: str) -> float:
+        """
+        Monto que se registra para un pago o crédito: siempre el total del servidor.
+        :param enviado: Monto enviado por la caja (None si lo omitió).
+        :param total: Total calculado por el motor.
+        :param mensaje: Mensaje del error si el monto enviado no coincide.
+        :raises ValueError: Si el monto enviado difiere del total en más de TOLERANCIA_CENTIMOS.
+        """
+        if enviado is not None and abs(round(enviado * 100) - round(total * 100)) > TOLERANCIA_CENTIMOS:
+            raise ValueError(mensaje)
+        return total
+
+    # Versión asíncrona (al vencer la caché lee la base de datos en el executor)
+    acotizar = async_method(cotizar)
@@ -1,29 +1,223 @@
+import asyncio
+import os
+import random
+import time
 from datetime import datetime
-import httpx 
+from typing import Optional
+
+import httpx
+from dotenv import load_dotenv
+
 from backend.models.models import TasaCambio
+from backend.services.services import tasaCambio_service
+from backend.services.tasaCambio_cache import tasa_cache, DOLAR_API, ULTIMA_TASA
+
+load_dotenv()
+
+PYDOLARVE_URL = os.getenv('PYDOLARVE_URL', 'https://pydolarve.org/')
+PYDOLARVE_TIMEOUT = float(os.getenv('PYDOLARVE_TIMEOUT', '5'))            # segundos por intento
+PYDOLARVE_RETRIES = int(os.getenv('PYDOLARVE_RETRIES', '3'))              # intentos totales
+PYDOLARVE_BACKOFF = float(os.getenv('PYDOLARVE_BACKOFF', '0.5'))          # base del backoff exponencial
+PYDOLARVE_FAILURE_THRESHOLD = int(os.getenv('PYDOLARVE_FAILURE_THRESHOLD', '3'))
+PYDOLARVE_RESET_TIMEOUT = float(os.getenv('PYDOLARVE_RESET_TIMEOUT', '60'))
+
+
+class CircuitOpenError(Exception):
+    """Excepción lanzada cuando el circuito hacia PyDolarVE está abierto."""
+    def __init__(self, retry_in: float, message: str = None):
+        self.retry_in = retry_in
+        self.message = message or f"PyDolarVE no disponible, se reintentará en {retry_in:.0f} segundos"
+        super().__init__(self.message)
+
+
+class RespuestaInvalidaError(Exception):
+    """Excepción lanzada cuando PyDolarVE responde con un cuerpo que no es el esperado."""
+    def __init__(self, message: str):
+        self.message = message
+        super().__init__(self.message)
+
 
-class PyDolarVE: 
+# Fallos de la API: cuentan para el circuito y activan el respaldo con la última tasa almacenada
+ERRORES_API = (CircuitOpenError, httpx.HTTPError, RespuestaInvalidaError)
+
+
+class CircuitBreaker:
+    """
+    Circuito simple cerrado / abierto / semiabierto.
+    Tras failure_threshold fallos consecutivos se abre durante reset_timeout segundos;
+    luego deja pasar una sola petición de prueba (las demás siguen rechazándose mientras
+    está en curso) y se cierra si tiene éxito o vuelve a abrirse si falla.
+    """
+
+    def __init__(self, failure_threshold: int = PYDOLARVE_FAILURE_THRESHOLD, reset_timeout: float = PYDOLARVE_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'cerrado'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'semiabierto'
+        return 'abierto'
+
+    def before_call(self) -> None:
+        """:raises CircuitOpenError: Si el circuito está abierto o ya hay una petición de prueba en curso."""
+        state = self.state
+        if state == 'abierto':
+            raise CircuitOpenError(self.reset_timeout - (time.monotonic() - self.opened_at))
+        if state == 'semiabierto':
+            if self.probe_in_flight:
+                raise CircuitOpenError(0, "PyDolarVE no disponible, hay una petición de prueba en curso")
+            self.probe_in_flight = True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self.probe_in_flight = False
+        if self.state == 'semiabierto' or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {"estado": self.state, "fallos_consecutivos": self.failures, "prueba_en_curso": self.probe_in_flight}
+
+
+class PyDolarVE:
     """
     Clase PyDolarVE para interactuar con la API de PyDolarVE.
+    Comparte un único httpx.AsyncClient (abierto y cerrado en el lifespan de la app),
+    con timeouts, reintentos con jitter y un circuito que, si la API falla,
+    devuelve la última tasa almacenada.
     """
-    
-    BASE_URL = "https://pydolarve.org/"
-    
-    async def get_data(self, endpoint: str = 'api/v2/tipo-cambio', params: dict = {"currency": "usd"}):
+
+    BASE_URL = PYDOLARVE_URL
+
+    _client: Optional[httpx.AsyncClient] = None
+    breaker = CircuitBreaker()
+
+    @classmethod
+    def _build_client(cls) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=cls.BASE_URL,
+            timeout=httpx.Timeout(PYDOLARVE_TIMEOUT),
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5)
+        )
+
+    @classmethod
+    async def startup(cls) -> None:
+        """Abre el cliente HTTP compartido (se llama al iniciar la app)."""
+        if cls._client is None or cls._client.is_closed:
+            cls._client = cls._build_client()
+
+    @classmethod
+    async def shutdown(cls) -> None:
+        """Cierra el cliente HTTP compartido (se llama al apagar la app)."""
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+
+    @classmethod
+    def stats(cls) -> dict:
+        """Estado del circuito y del cliente compartido."""
+        return {
+            "circuito": cls.breaker.stats(),
+            "cliente_abierto": cls._client is not None and not cls._client.is_closed,
+        }
+
+    @staticmethod
+    def _leer_respuesta(response: httpx.Response, campos: tuple) -> dict:
+        """
+        Cuerpo JSON de la respuesta con los campos requeridos.
+        :raises RespuestaInvalidaError: Si el cuerpo no es un objeto JSON o le falta algún campo.
+        """
+        try:
+            data = response.json()
+        except ValueError:
+            raise RespuestaInvalidaError("PyDolarVE respondió con un cuerpo que no es JSON")
+        if not isinstance(data, dict):
+            raise RespuestaInvalidaError("PyDolarVE respondió con un JSON que no es un objeto")
+        faltantes = [campo for campo in campos if campo not in data]
+        if faltantes:
+            raise RespuestaInvalidaError(f"Faltan campos en la respuesta de PyDolarVE: {', '.join(faltantes)}")
+        return data
+
+    async def _request(self, client: httpx.AsyncClient, endpoint: str, params: dict, campos: tuple = ()):
+        """
+        Hace la petición con reintentos (backoff exponencial con jitter) ante errores de red,
+        5xx o una respuesta sin el JSON esperado.
+        """
+        for intento in range(1, PYDOLARVE_RETRIES + 1):
+            try:
+                response = await client.get(endpoint, params=params)
+                response.raise_for_status()
+                return self._leer_respuesta(response, campos)
+            except (httpx.TransportError, httpx.HTTPStatusError, RespuestaInvalidaError) as e:
+                es_reintentable = not isinstance(e, httpx.HTTPStatusError) or e.response.status_code >= 500
+                if not es_reintentable or intento == PYDOLARVE_RETRIES:
+                    raise
+                espera = PYDOLARVE_BACKOFF * (2 ** (intento - 1))
+                await asyncio.sleep(random.uniform(0, espera))
+
+    async def get_data(
+        self, endpoint: str = 'api/v2/tipo-cambio', params: dict = {"currency": "usd"}, campos: tuple = ('price',)
+    ):
+        """
+        :param campos: Campos que debe traer la respuesta; si falta alguno cuenta como un fallo de la API.
+        """
         # headers = {"Authorization": f"Bearer {self.api_key}"}
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{self.BASE_URL}/{endpoint}", params=params)
-            response.raise_for_status()
-            return response.json()
+        self.breaker.before_call()
+        try:
+            if self._client is not None and not self._client.is_closed:
+                data = await self._request(self._client, endpoint, params, campos)
+            else:
+                # Fuera del backend (p. ej. save_tasa) no hay cliente compartido
+                async with self._build_client() as client:
+                    data = await self._request(client, endpoint, params, campos)
+        except BaseException:
+            # También cuenta una cancelación (p. ej. el timeout del job): libera la petición de prueba
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return data
+
+    async def _tasa_almacenada(self, error: Exception) -> TasaCambio:
+        """
+        Respaldo cuando la API falla: la última tasa almacenada.
+        :raises Exception: El error original si no hay ninguna tasa almacenada.
+        """
+        ultima = await tasa_cache.get_or_load_async(
+            ULTIMA_TASA, lambda: tasaCambio_service.aget_last_record("id_tasa")
+        )
+        if ultima is None:
+            raise error
+        print(f"[PYDOLARVE] API no disponible ({error}), se usa la última tasa almacenada")
+        return ultima
 
-    async def get_precio_dolar(self): 
-        data = await self.get_data()
+    async def get_precio_dolar(self, fallback: bool = True):
+        """
+        Obtiene el precio actual del dólar desde PyDolarVE.
+        :param fallback: Si la API falla, devolver la última tasa almacenada en lugar de lanzar el error.
+            Debe ser False cuando la tasa obtenida se va a guardar.
+        """
+        try:
+            data = await self.get_data()
+        except ERRORES_API as e:
+            if not fallback:
+                raise
+            return await self._tasa_almacenada(e)
         if data:
             valor_usd_bs = data['price']
-            fecha_str = data['last_update'].strip()  # '18/07/2025, 12:00 AM'
+            fecha_str = data.get('last_update', '').strip()  # '18/07/2025, 12:00 AM'
             fecha = datetime.now()
             origen = 'BCV'
-            
+
             return TasaCambio(
                 id_tasa=None,
                 fecha=fecha,
@@ -32,3 +226,14 @@ class PyDolarVE:
             )
         else:
             return ("No se pudo obtener el precio del dólar del API de PyDolarVE")
+
+    async def get_precio_dolar_cache(self):
+        """
+        Precio actual del dólar servido desde la caché DOLAR_API.
+        Sólo se guardan en caché las respuestas de la API; el respaldo (última tasa almacenada)
+        no, para que la siguiente petición vuelva a consultar la API en cuanto se recupere.
+        """
+        try:
+            return await tasa_cache.get_or_load_async(DOLAR_API, lambda: self.get_precio_dolar(fallback=False))
+        except ERRORES_API as e:
+            return await self._tasa_almacenada(e)
@@ -0,0 +1,77 @@
+import sqlite3
+from typing import List, Dict, Optional
+from backend.models.view_models import ResumenVentasPeriodo
+from database.pool import get_pool
+
+# Longitud del prefijo de Resumen_Ventas_Diarias.fecha que define cada período
+PERIODOS = {'dia': 10, 'mes': 7}
+
+class ReportesService:
+    """
+    Reportes de ventas sobre Resumen_Ventas_Diarias, que los triggers de Ventas, Detalle_Venta
+    y Pagos mantienen al día. Los rangos recorren la clave primaria (fecha, ...), así que el costo depende de los
+    días consultados y no de la cantidad de ventas.
+    """
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path
+        self.pool = get_pool(db_path)
+
+    def _execute_query(self, query: str, params: tuple = ()) -> List[Dict]:
+        """Ejecuta una consulta y devuelve los resultados como diccionarios"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
+            cursor.execute(query, params)
+            return [dict(row) for row in cursor.fetchall()]
+
+    def obtener_resumen_ventas(
+        self,
+        periodo: str = 'dia',
+        fecha_desde: Optional[str] = None,
+        fecha_hasta: Optional[str] = None,
+        metodo_pago: Optional[str] = None,
+        tipo_venta: Optional[str] = None,
+        id_categoria: Optional[int] = None
+    ) -> List[ResumenVentasPeriodo]:
+        """
+        Obtiene los totales de ventas agrupados por período, método de pago, tipo de venta y categoría.
+        :param periodo: 'dia' o 'mes'.
+        :param fecha_desde: Límite inferior ISO inclusivo (YYYY-MM-DD).
+        :param fecha_hasta: Límite superior ISO exclusivo (YYYY-MM-DD).
+        :raises ValueError: Si el período no es válido.
+        """
+        if periodo not in PERIODOS:
+            raise ValueError(f"Período inválido: {periodo}. Use uno de {list(PERIODOS)}")
+
+        condiciones = []
+        params = []
+        if fecha_desde:
+            condiciones.append("r.fecha >= ?")
+            params.append(fecha_desde)
+        if fecha_hasta:
+            condiciones.append("r.fecha < ?")
+            params.append(fecha_hasta)
+        if metodo_pago:
+            condiciones.append("r.metodo_pago = ?")
+            params.append(metodo_pago)
+        if tipo_venta:
+            condiciones.append("r.tipo_venta = ?")
+            params.append(tipo_venta)
+        if id_categoria is not None:
+            condiciones.append("r.id_categoria = ?")
+            params.append(id_categoria)
+        where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+
+        filas = self._execute_query(
+            f"""SELECT substr(r.fecha, 1, {PERIODOS[periodo]}) AS periodo,
+                       r.metodo_pago, r.tipo_venta, r.id_categoria, c.descr AS categoria_descr,
+                       SUM(r.num_ventas) AS num_ventas, SUM(r.unidades) AS unidades,
+                       ROUND(SUM(r.monto_bs), 2) AS monto_bs, ROUND(SUM(r.monto_usd), 2) AS monto_usd
+                FROM Resumen_Ventas_Diarias r
+                LEFT JOIN categoria_productos c ON c.id_categoria = r.id_categoria
+                {where}
+                GROUP BY 1, r.metodo_pago, r.tipo_venta, r.id_categoria
+                ORDER BY 1, r.metodo_pago, r.tipo_venta, r.id_categoria""",
+            tuple(params)
+        )
+        return [ResumenVentasPeriodo(**fila) for fila in filas]
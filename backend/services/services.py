@@ -6,6 +6,9 @@ from backend.services.base_service import BaseService
 from backend.models.view_models import ProductoVistaBase
 from backend.services.ventaDetalle_services import VentaDetalleService
 from backend.services.comprasDetalle_service import CompraService
+from backend.services.inventario_service import InventarioService
+from backend.services.reportes_service import ReportesService
+from backend.services.precios_service import PreciosService
 
 
 cliente_service = BaseService(Cliente, "Clientes", db_path, unique_fields=["ci_cliente"])
@@ -24,4 +27,7 @@ producto_no_preparado_service = BaseService(ProductoNoPreparado, "Productos_noPr
 
 vistaProductos_service = BaseService(ProductoVistaBase, "vista_productos_completos", db_path)
 vistaCompras_service = CompraService(db_path)
-vistaVentas_services = VentaDetalleService(db_path)
\ No newline at end of file
+vistaVentas_services = VentaDetalleService(db_path)
+inventario_service = InventarioService(db_path)
+reportes_service = ReportesService(db_path)
+precios_service = PreciosService(producto_service, tasaCambio_service)
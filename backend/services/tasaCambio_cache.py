@@ -0,0 +1,101 @@
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Segundos que se sirve la última tasa desde memoria antes de volver a consultar la base de datos
+TASA_CACHE_TTL = float(os.getenv('TASA_CACHE_TTL', '300'))
+# Segundos que se reutiliza la respuesta de PyDolarVE antes de volver a llamar a la API
+DOLAR_CACHE_TTL = float(os.getenv('DOLAR_CACHE_TTL', '600'))
+
+ULTIMA_TASA = 'ultima_tasa'
+DOLAR_API = 'dolar_api'
+
+
+class TTLCache:
+    """
+    Caché en memoria de lectura directa (read-through) con expiración por entrada.
+    Guarda contadores de aciertos, fallos e invalidaciones.
+    """
+
+    def __init__(self, ttls: Dict[str, float]):
+        """
+        :param ttls: Tiempo de vida en segundos por clave.
+        """
+        self.ttls = ttls
+        self._entries: Dict[str, tuple] = {}
+        self._generations: Dict[str, int] = {}     # se incrementa en cada invalidación de la clave
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def _lookup(self, key: str) -> tuple:
+        """Devuelve (encontrado, valor, generación) contando el acierto o fallo."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._hits += 1
+                return True, entry[0], None
+            self._misses += 1
+            return False, None, self._generations.get(key, 0)
+
+    def set(self, key: str, value: Any, generation: Optional[int] = None) -> None:
+        """
+        Guarda un valor; los valores None no se guardan para no cachear ausencias.
+        :param generation: Generación de la clave al empezar a cargar el valor; si la clave se
+            invalidó mientras tanto, el valor puede estar desactualizado y no se guarda.
+        """
+        if value is None:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generations.get(key, 0):
+                return
+            self._entries[key] = (value, time.monotonic() + self.ttls.get(key, 60))
+
+    def get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        """Devuelve el valor en caché o lo carga con loader y lo guarda."""
+        found, value, generation = self._lookup(key)
+        if found:
+            return value
+        value = loader()
+        self.set(key, value, generation)
+        return value
+
+    async def get_or_load_async(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Versión asíncrona de get_or_load para cargadores async (p. ej. PyDolarVE)."""
+        found, value, generation = self._lookup(key)
+        if found:
+            return value
+        value = await loader()
+        self.set(key, value, generation)
+        return value
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Invalida una clave o, si no se indica, toda la caché."""
+        with self._lock:
+            keys = set(self._entries) | set(self.ttls) if key is None else {key}
+            for k in keys:
+                self._entries.pop(k, None)
+                self._generations[k] = self._generations.get(k, 0) + 1
+            self._invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Devuelve los contadores de uso de la caché."""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "invalidations": self._invalidations,
+                "hit_ratio": round(self._hits / total, 4) if total else 0.0,
+                "entries": list(self._entries.keys()),
+            }
+
+
+# Caché compartida de tasas de cambio
+tasa_cache = TTLCache({ULTIMA_TASA: TASA_CACHE_TTL, DOLAR_API: DOLAR_CACHE_TTL})
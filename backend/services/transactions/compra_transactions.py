@@ -0,0 +1,132 @@
+import sqlite3
+from typing import Dict, List
+from fastapi import HTTPException
+from database.pool import get_pool
+from database.writer import get_writer, WriterTimeoutError
+from backend.models.models import Compra, LineaCompra
+
+
+def verificar_productos_compra(cursor: sqlite3.Cursor, rif: str, detalles_data: List[LineaCompra]) -> None:
+    """
+    Valida en una sola consulta que el proveedor exista y que todos los productos
+    de la compra sean productos no preparados (los únicos que llevan stock).
+
+    :param cursor: Cursor de la conexión de la transacción.
+    :param rif: RIF del proveedor de la compra.
+    :param detalles_data: Líneas de la compra.
+    :raises ValueError: Si el proveedor o algún producto no existe.
+    """
+    codigos = list(dict.fromkeys(detalle.cod_producto for detalle in detalles_data))
+    valores = ", ".join(["(?)"] * len(codigos))
+    cursor.execute(
+        f"""WITH recibido(cod_producto) AS (VALUES {valores})
+            SELECT r.cod_producto, np.cod_producto_noPreparado IS NOT NULL,
+                   EXISTS (SELECT 1 FROM Proveedores WHERE Rif = ?)
+            FROM recibido r
+            LEFT JOIN Productos_noPreparados np ON np.cod_producto_noPreparado = r.cod_producto""",
+        codigos + [rif]
+    )
+    filas = {fila[0]: fila[1:] for fila in cursor.fetchall()}
+
+    # La existencia del proveedor viene repetida en todas las filas
+    if not filas[codigos[0]][1]:
+        raise ValueError(f"Proveedor {rif} no encontrado")
+    for cod_producto in codigos:
+        if not filas[cod_producto][0]:
+            raise ValueError(f"Producto no preparado {cod_producto} no encontrado")
+
+
+def _registrar_compra(compra_data: Compra, detalles_data: List[LineaCompra], db_path: str) -> dict:
+    """
+    Parte transaccional de la compra. Se ejecuta en el escritor único:
+    si lanza una excepción se deshacen todas sus escrituras.
+    """
+    with get_pool(db_path).connection() as conn:
+        cursor = conn.cursor()
+
+        verificar_productos_compra(cursor, compra_data.Rif, detalles_data)
+
+        # Insertar la cabecera de la compra
+        cursor.execute(
+            "INSERT INTO Compras (fecha, Rif, gasto_total) VALUES (?, ?, ?)",
+            (compra_data.fecha.isoformat(), compra_data.Rif, compra_data.gasto_total)
+        )
+        id_compra = cursor.lastrowid
+
+        # Un movimiento de entrada por línea: tr_after_movimiento_insert suma el stock
+        fecha = compra_data.fecha.isoformat()
+        cursor.executemany(
+            """INSERT INTO Movimientos (
+                cod_producto, referencia, tipo_movimiento, cant_movida,
+                costo_unitario, id_compra, fc_actualizacion, comentario
+            ) VALUES (?, 'compra', 'entrada', ?, ?, ?, ?, ?)""",
+            [
+                (detalle.cod_producto, detalle.cantidad, detalle.costo_unitario, id_compra, fecha, f"Compra #{id_compra}")
+                for detalle in detalles_data
+            ]
+        )
+
+        # Actualizar el costo de compra (si un producto viene en varias líneas, vale la última)
+        costos: Dict[str, float] = {detalle.cod_producto: detalle.costo_unitario for detalle in detalles_data}
+        cursor.executemany(
+            "UPDATE Productos_noPreparados SET costo_compra = ? WHERE cod_producto_noPreparado = ?",
+            [(costo, cod_producto) for cod_producto, costo in costos.items()]
+        )
+
+    return {
+        "success": True,
+        "message": "Compra registrada exitosamente",
+        "id_compra": id_compra,
+        "lineas": len(detalles_data),
+        "productos_actualizados": list(costos)
+    }
+
+
+def registrar_compra_completa(compra_data: Compra, detalles_data: List[LineaCompra], db_path: str) -> dict:
+    """
+    Registra una compra completa: la cabecera, un movimiento de entrada por línea
+    (que suma el stock) y el nuevo costo de compra de cada producto, todo en una transacción.
+
+    Args:
+        compra_data: Datos de la compra
+        detalles_data: Líneas recibidas (producto, cantidad y costo unitario)
+        db_path: Ruta a la base de datos SQLite
+
+    Returns:
+        dict: Resultado de la operación con ID de compra generado
+
+    Raises:
+        HTTPException: Si hay errores de validación (422) o en la transacción (400)
+    """
+    try:
+        if not detalles_data:
+            raise ValueError("La compra debe tener al menos una línea")
+
+        total_lineas = sum(detalle.cantidad * detalle.costo_unitario for detalle in detalles_data)
+        if abs(total_lineas - compra_data.gasto_total) > 0.01:
+            raise ValueError("El gasto total no coincide con la suma de las líneas de la compra")
+
+        # El resto se ejecuta en el escritor único: cabecera, movimientos y costos
+        # se confirman juntos en una transacción abierta con BEGIN IMMEDIATE
+        return get_writer(db_path).submit(_registrar_compra, compra_data, detalles_data, db_path)
+
+    except ValueError as ve:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "success": False,
+                "error": "Error de validación",
+                "message": str(ve)
+            }
+        )
+    except WriterTimeoutError:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "success": False,
+                "error": "Error en la transacción",
+                "message": str(e)
+            }
+        )
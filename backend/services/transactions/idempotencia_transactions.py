@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Callable, Optional
+
+from dotenv import load_dotenv
+from pydantic import BaseModel
+
+from database.pool import get_pool
+from database.writer import get_writer
+
+load_dotenv()
+
+IDEMPOTENCY_TTL = float(os.getenv('IDEMPOTENCY_TTL_HOURS', '24')) * 3600     # segundos que se conserva una clave
+
+# Las claves se guardan en la misma transacción que la operación: si ésta falla no queda
+# clave, así que un reintento de una petición fallida vuelve a ejecutarse. Un reintento de
+# una petición exitosa devuelve la respuesta guardada sin repetir la transacción.
+
+
+class IdempotencyKeyReusedError(ValueError):
+    """
+    Excepción lanzada cuando una clave de idempotencia se reutiliza con otro cuerpo de petición.
+    Es un ValueError para que los endpoints de registro la respondan como error de validación (422).
+    """
+    def __init__(self, clave: str, message: str = None):
+        self.clave = clave
+        self.message = message or f"La clave de idempotencia {clave} ya se usó con una petición distinta"
+        super().__init__(self.message)
+
+
+class ClaveIdempotencia:
+    """Clave de idempotencia de una petición: endpoint, clave enviada y huella del cuerpo."""
+    __slots__ = ('endpoint', 'clave', 'huella')
+
+    def __init__(self, endpoint: str, clave: str, huella: str):
+        self.endpoint = endpoint
+        self.clave = clave
+        self.huella = huella
+
+    @classmethod
+    def desde_peticion(cls, clave: Optional[str], endpoint: str, payload: BaseModel) -> Optional['ClaveIdempotencia']:
+        """
+        Construye la clave a partir de la cabecera Idempotency-Key (None si no se envió).
+        :param clave: Valor de la cabecera.
+        :param endpoint: Ruta del endpoint (las claves son independientes por endpoint).
+        :param payload: Cuerpo validado de la petición.
+        """
+        if not clave:
+            return None
+        # Sólo los campos enviados: los valores por defecto (p. ej. Venta.fecha_hora = ahora) cambian en cada reintento
+        huella = hashlib.sha256(payload.model_dump_json(exclude_unset=True).encode()).hexdigest()
+        return cls(endpoint, clave, huella)
+
+
+def buscar_respuesta(conn: sqlite3.Connection, clave: ClaveIdempotencia) -> Optional[Any]:
+    """
+    Busca por clave primaria la respuesta guardada de una petición (ignora las claves vencidas).
+    :return: Respuesta guardada o None si la clave no existe.
+    :raises IdempotencyKeyReusedError: Si la clave se usó con otro cuerpo.
+    """
+    fila = conn.execute(
+        "SELECT huella, respuesta FROM Idempotencia WHERE endpoint = ? AND clave = ? AND creada_en >= ?",
+        (clave.endpoint, clave.clave, time.time() - IDEMPOTENCY_TTL)
+    ).fetchone()
+    if fila is None:
+        return None
+    if fila[0] != clave.huella:
+        raise IdempotencyKeyReusedError(clave.clave)
+    return json.loads(fila[1])
+
+
+def _ejecutar_y_guardar(db_path: str, clave: ClaveIdempotencia, fn: Callable, *args) -> Any:
+    """
+    Parte que corre en el escritor único: vuelve a buscar la clave (otro reintento pudo
+    guardarla mientras ésta esperaba turno), ejecuta la operación y guarda su respuesta.
+    """
+    with get_pool(db_path).connection() as conn:
+        previa = buscar_respuesta(conn, clave)
+        if previa is not None:
+            return previa
+        resultado = fn(*args)
+        # REPLACE: puede quedar una fila vencida con la misma clave que aún no se purgó
+        conn.execute(
+            "INSERT OR REPLACE INTO Idempotencia (endpoint, clave, huella, respuesta, creada_en) VALUES (?, ?, ?, ?, ?)",
+            (clave.endpoint, clave.clave, clave.huella, json.dumps(resultado), time.time())
+        )
+    return resultado
+
+
+def ejecutar_idempotente(db_path: str, clave: Optional[ClaveIdempotencia], fn: Callable, *args) -> Any:
+    """
+    Ejecuta fn(*args) en el escritor único. Con clave de idempotencia, si la petición ya se
+    procesó se devuelve la respuesta guardada (lectura por clave primaria, sin pasar por el
+    escritor); si no, la respuesta se guarda en la misma transacción que la operación.
+    :param db_path: Ruta a la base de datos.
+    :param clave: Clave de la petición o None si no se envió.
+    :param fn: Función transaccional (p. ej. _registrar_venta).
+    :raises IdempotencyKeyReusedError: Si la clave se usó con otro cuerpo.
+    """
+    if clave is None:
+        return get_writer(db_path).submit(fn, *args)
+
+    with get_pool(db_path).connection() as conn:
+        previa = buscar_respuesta(conn, clave)
+    if previa is not None:
+        return previa
+    return get_writer(db_path).submit(_ejecutar_y_guardar, db_path, clave, fn, *args)
+
+
+def purgar_claves_vencidas(db_path: str) -> int:
+    """
+    Elimina las claves de idempotencia más antiguas que IDEMPOTENCY_TTL.
+    :return: Cantidad de claves eliminadas.
+    """
+    def purgar() -> int:
+        with get_pool(db_path).connection() as conn:
+            return conn.execute(
+                "DELETE FROM Idempotencia WHERE creada_en < ?", (time.time() - IDEMPOTENCY_TTL,)
+            ).rowcount
+    return get_writer(db_path).submit(purgar)
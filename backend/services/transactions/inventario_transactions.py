@@ -0,0 +1,161 @@
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from backend.models.models import DetalleVenta
+
+# Flujo único de inventario para las ventas: dentro de la transacción de la venta se
+# agrega un movimiento de salida por producto (Movimientos) y se descuenta el stock con
+# una sola sentencia. Ningún trigger vuelve a tocar el stock por movimientos de venta.
+# El descuento incrementa version_stock para que no se registre como ajuste manual.
+
+
+class StockConflictError(Exception):
+    """Excepción lanzada cuando el stock disponible no alcanza para la cantidad solicitada."""
+    def __init__(self, cod_producto: str, disponible: int, solicitado: int, message: str = None):
+        self.cod_producto = cod_producto
+        self.disponible = disponible
+        self.solicitado = solicitado
+        self.message = message or (
+            f"No hay suficiente stock para {cod_producto}. "
+            f"Stock actual: {disponible}, solicitado: {solicitado}"
+        )
+        super().__init__(self.message)
+
+
+def _cantidades_por_producto(detalles_data: List[DetalleVenta]) -> Dict[str, int]:
+    """Suma las cantidades solicitadas por producto (un producto puede venir en varias líneas)."""
+    cantidades: Dict[str, int] = {}
+    for detalle in detalles_data:
+        cantidades[detalle.cod_producto] = cantidades.get(detalle.cod_producto, 0) + detalle.cantidad_producto
+    return cantidades
+
+
+def verificar_stock(cursor: sqlite3.Cursor, detalles_data: List[DetalleVenta]) -> Dict[str, dict]:
+    """
+    Valida en una sola consulta que todos los productos existan y que los no preparados
+    tengan stock suficiente para la cantidad total solicitada.
+    Debe llamarse dentro del escritor único (transacción abierta con BEGIN IMMEDIATE) para que
+    el stock leído no cambie antes del descuento.
+
+    :param cursor: Cursor de la conexión de la transacción.
+    :param detalles_data: Detalles de la venta.
+    :return: Diccionario {cod_producto: {'cant_actual', 'nueva_cantidad'}} de los productos no preparados.
+    :raises ValueError: Si un producto no existe.
+    :raises StockConflictError: Si no hay stock suficiente.
+    """
+    cantidades = _cantidades_por_producto(detalles_data)
+    if not cantidades:
+        return {}
+
+    valores = ", ".join(["(?, ?)"] * len(cantidades))
+    params = [valor for item in cantidades.items() for valor in item]
+    cursor.execute(
+        f"""WITH solicitado(cod_producto, cantidad) AS (VALUES {valores})
+            SELECT s.cod_producto, p.cod_producto IS NOT NULL, np.cant_actual
+            FROM solicitado s
+            LEFT JOIN Productos p ON p.cod_producto = s.cod_producto
+            LEFT JOIN Productos_noPreparados np ON np.cod_producto_noPreparado = s.cod_producto""",
+        params
+    )
+    filas = {fila[0]: fila[1:] for fila in cursor.fetchall()}
+
+    productos_verificar = {}
+    # Se recorre en el orden de los detalles para reportar el primer error como antes
+    for cod_producto, cantidad in cantidades.items():
+        existe, cant_actual = filas[cod_producto]
+        if not existe:
+            raise ValueError(f"Producto {cod_producto} no encontrado")
+
+        # Solo verificamos stock para productos no preparados
+        if cant_actual is not None:
+            nueva_cantidad = cant_actual - cantidad
+            if nueva_cantidad < 0:
+                raise StockConflictError(cod_producto, cant_actual, cantidad)
+            productos_verificar[cod_producto] = {
+                'cant_actual': cant_actual,
+                'nueva_cantidad': nueva_cantidad
+            }
+    return productos_verificar
+
+
+def descontar_stock(cursor: sqlite3.Cursor, productos_verificar: Dict[str, dict]) -> None:
+    """
+    Descuenta en una sola sentencia las cantidades vendidas de los productos no preparados.
+    El descuento es condicional (cant_actual >= cantidad), así que nunca deja stock negativo
+    aunque otra transacción lo haya modificado desde la validación.
+
+    :param cursor: Cursor de la conexión de la transacción.
+    :param productos_verificar: Resultado de verificar_stock.
+    :raises StockConflictError: Si algún producto ya no tiene stock suficiente.
+    """
+    if not productos_verificar:
+        return
+    cantidades = {
+        cod_producto: info['cant_actual'] - info['nueva_cantidad']
+        for cod_producto, info in productos_verificar.items()
+    }
+    valores = ", ".join(["(?, ?)"] * len(cantidades))
+    params = [valor for item in cantidades.items() for valor in item]
+    cursor.execute(
+        f"""WITH solicitado(cod_producto, cantidad) AS (VALUES {valores})
+            UPDATE Productos_noPreparados
+            SET cant_actual = cant_actual - (
+                SELECT s.cantidad FROM solicitado s
+                WHERE s.cod_producto = Productos_noPreparados.cod_producto_noPreparado
+            ),
+                version_stock = version_stock + 1
+            WHERE cod_producto_noPreparado IN (SELECT cod_producto FROM solicitado)
+              AND cant_actual >= (
+                SELECT s.cantidad FROM solicitado s
+                WHERE s.cod_producto = Productos_noPreparados.cod_producto_noPreparado
+            )""",
+        params
+    )
+    # rowcount no se informa para sentencias que empiezan con WITH; changes() sí
+    actualizados = cursor.execute("SELECT changes()").fetchone()[0]
+    if actualizados == len(cantidades):
+        return
+
+    # Algún descuento no se aplicó: se busca el primer producto sin stock para reportarlo
+    for cod_producto, cantidad in cantidades.items():
+        cursor.execute(
+            "SELECT cant_actual FROM Productos_noPreparados WHERE cod_producto_noPreparado = ?",
+            (cod_producto,)
+        )
+        fila = cursor.fetchone()
+        disponible = fila[0] if fila else 0
+        if disponible < cantidad:
+            raise StockConflictError(cod_producto, disponible, cantidad)
+    raise StockConflictError(next(iter(cantidades)), 0, 0, "El stock cambió durante la venta, intente de nuevo")
+
+
+def registrar_salida_venta(
+    cursor: sqlite3.Cursor,
+    id_venta: int,
+    fecha_hora: Optional[datetime],
+    detalles_data: List[DetalleVenta],
+    productos_verificar: Dict[str, dict]
+) -> None:
+    """
+    Registra la salida de inventario de una venta: un movimiento 'venta' por producto
+    y el descuento condicional del stock de los productos no preparados.
+
+    :param cursor: Cursor de la conexión de la transacción.
+    :param id_venta: ID de la venta registrada.
+    :param fecha_hora: Fecha y hora de la venta (se usa su fecha en el movimiento).
+    :param detalles_data: Detalles de la venta.
+    :param productos_verificar: Resultado de verificar_stock.
+    :raises StockConflictError: Si algún producto ya no tiene stock suficiente.
+    """
+    fecha = (fecha_hora or datetime.now()).date().isoformat()
+    cursor.executemany(
+        """INSERT INTO Movimientos (
+            cod_producto, referencia, tipo_movimiento, cant_movida, fc_actualizacion, comentario
+        ) VALUES (?, 'venta', 'salida', ?, ?, ?)""",
+        [
+            (cod_producto, cantidad, fecha, f"Venta #{id_venta}")
+            for cod_producto, cantidad in _cantidades_por_producto(detalles_data).items()
+        ]
+    )
+    descontar_stock(cursor, productos_verificar)
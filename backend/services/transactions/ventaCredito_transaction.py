@@ -1,10 +1,16 @@
-import sqlite3
 from typing import List, Optional
 from fastapi import HTTPException
+from database.pool import get_pool
+from database.writer import WriterTimeoutError
 from backend.models.models import DetalleVenta, Pago, Venta, Credito
-from backend.services.transactions.venta_transactions import registrar_venta_con_detalles_y_pago
+from backend.services.transactions.venta_transactions import registrar_venta_con_detalles_y_pago, insertar_detalles
+from backend.services.transactions.inventario_transactions import (
+    StockConflictError, verificar_stock, registrar_salida_venta
+)
+from backend.services.transactions.idempotencia_transactions import ClaveIdempotencia, ejecutar_idempotente
+from backend.services.services import precios_service
 
-def registrar_venta_credito_completa(
+def _registrar_venta_credito(
     venta_data: Venta,
     detalles_data: List[DetalleVenta],
     credito_data: Credito,
@@ -12,92 +18,36 @@ def registrar_venta_credito_completa(
     pago_inicial: Optional[Pago] = None
 ) -> dict:
     """
-    Registra una venta a crédito completa con sus detalles, registro de crédito
-    y pago inicial opcional.
-    
-    Args:
-        venta_data: Datos de la venta
-        detalles_data: Lista de detalles de productos vendidos
-        credito_data: Datos del crédito a crear
-        pago_inicial: Pago inicial opcional (puede ser None si no hay pago inicial)
-        db_path: Ruta a la base de datos SQLite
-    
-    Returns:
-        dict: Resultado de la operación con IDs generados
-        
-    Raises:
-        HTTPException: Si hay errores de validación o en la transacción
+    Parte transaccional de la venta a crédito. Se ejecuta en el escritor único:
+    si lanza una excepción se deshacen todas sus escrituras.
     """
-    conn = None
-    try:
-        conn = sqlite3.connect(db_path)
+    # Precios y totales del servidor, calculados después de buscar la clave de idempotencia
+    venta_data, detalles_data = precios_service.preciar_venta(venta_data, detalles_data)
+
+    # Validar montos del crédito
+    credito_data = credito_data.model_copy(update={"monto_total": precios_service.cuadrar_monto(
+        credito_data.monto_total, venta_data.monto_total_usd,
+        "El monto total del crédito debe coincidir con el monto USD de la venta"
+    )})
+
+    if pago_inicial:
+        if pago_inicial.monto is None:
+            raise ValueError("El pago inicial debe indicar su monto")
+        if round(pago_inicial.monto, 2) > venta_data.monto_total_bs:
+            raise ValueError("El pago inicial no puede ser mayor al total de la venta")
+
+    with get_pool(db_path).connection() as conn:
         cursor = conn.cursor()
-        
-        # 1. Validaciones iniciales
-        if venta_data.tipo != 'credito':
-            raise ValueError("El tipo de venta debe ser 'credito'")
-            
-        if not venta_data.ci_cliente:
-            raise ValueError("Las ventas a crédito requieren un cliente")
-            
-        if venta_data.ci_cliente != credito_data.ci_cliente:
-            raise ValueError("El cliente de la venta debe coincidir con el del crédito")
-        
+
         # Validar que el cliente existe
         cursor.execute("SELECT ci_cliente FROM Clientes WHERE ci_cliente = ?", (venta_data.ci_cliente,))
         if not cursor.fetchone():
             raise ValueError(f"Cliente {venta_data.ci_cliente} no encontrado")
-        
-        # Validar montos del crédito
-        if credito_data.monto_total != venta_data.monto_total_usd:
-            raise ValueError("El monto total del crédito debe coincidir con el monto USD de la venta")
-            
-        if pago_inicial:
-            if pago_inicial.monto > venta_data.monto_total_bs:
-                raise ValueError("El pago inicial no puede ser mayor al total de la venta")
-            
-            # Convertir pago inicial a USD para comparar con crédito
-            pago_inicial_usd = pago_inicial.monto / (venta_data.monto_total_bs / venta_data.monto_total_usd)
-            # print('credito_data.monto_pagado', credito_data.monto_pagado)
-            # print('pago_inicial_usd', pago_inicial_usd)
 
-            # if credito_data.monto_pagado != pago_inicial_usd:
-            #     raise ValueError("El monto pagado del crédito debe coincidir con el pago inicial en USD")
+        # Verificar stock para productos no preparados (una sola consulta)
+        productos_verificar = verificar_stock(cursor, detalles_data)
 
-        # 2. Verificar stock para productos no preparados
-        productos_verificar = {}
-        for detalle in detalles_data:
-            cursor.execute(
-                """SELECT p.cod_producto, np.cant_actual
-                   FROM Productos p
-                   LEFT JOIN Productos_noPreparados np ON p.cod_producto = np.cod_producto_noPreparado
-                   WHERE p.cod_producto = ?""",
-                (detalle.cod_producto,)
-            )
-            producto = cursor.fetchone()
-            
-            if not producto:
-                raise ValueError(f"Producto {detalle.cod_producto} no encontrado")
-            
-            cod_producto, cant_actual = producto
-            
-            # Solo verificamos stock para productos no preparados
-            if cant_actual is not None:
-                nueva_cantidad = cant_actual - detalle.cantidad_producto
-                if nueva_cantidad < 0:
-                    raise ValueError(
-                        f"No hay suficiente stock para {cod_producto}. "
-                        f"Stock actual: {cant_actual}, solicitado: {detalle.cantidad_producto}"
-                    )
-                productos_verificar[cod_producto] = {
-                    'cant_actual': cant_actual,
-                    'nueva_cantidad': nueva_cantidad
-                }
-
-        # 3. Iniciar transacción
-        cursor.execute("BEGIN TRANSACTION")
-
-        # 4. Insertar la venta
+        # Insertar la venta
         cursor.execute(
             """INSERT INTO Ventas (
                 monto_total_bs, fecha_hora, monto_total_usd, 
@@ -114,21 +64,11 @@ def registrar_venta_credito_completa(
         )
         id_venta = cursor.lastrowid
 
-        # 5. Insertar detalles de venta
-        for detalle in detalles_data:
-            cursor.execute(
-                """INSERT INTO Detalle_Venta (
-                    id_venta, cod_producto, cantidad_producto, precio_unitario
-                ) VALUES (?, ?, ?, ?)""",
-                (
-                    id_venta,
-                    detalle.cod_producto,
-                    detalle.cantidad_producto,
-                    detalle.precio_unitario
-                )
-            )
+        # Insertar detalles de venta y registrar la salida de inventario
+        insertar_detalles(cursor, id_venta, detalles_data)
+        registrar_salida_venta(cursor, id_venta, venta_data.fecha_hora, detalles_data, productos_verificar)
 
-        # 6. Insertar el crédito
+        # Insertar el crédito
         cursor.execute(
             """INSERT INTO Creditos (
                 ci_cliente, fecha_credito, fecha_ultimo_abono,
@@ -146,7 +86,7 @@ def registrar_venta_credito_completa(
         )
         id_credito = cursor.lastrowid
 
-        # 7. Insertar pago inicial si existe
+        # Insertar pago inicial si existe
         id_pago = None
         if pago_inicial:
             cursor.execute(
@@ -165,34 +105,73 @@ def registrar_venta_credito_completa(
             )
             id_pago = cursor.lastrowid
 
-        # 8. Actualizar inventario para productos no preparados
-        for cod_producto, info in productos_verificar.items():
-            cursor.execute(
-                """UPDATE Productos_noPreparados 
-                   SET cant_actual = ? 
-                   WHERE cod_producto_noPreparado = ?""",
-                (info['nueva_cantidad'], cod_producto)
-            )
-
-        # 9. Confirmar transacción
-        conn.commit()
+    result = {
+        "success": True,
+        "message": "Venta a crédito registrada exitosamente",
+        "id_venta": id_venta,
+        "id_credito": id_credito,
+        "productos_actualizados": productos_verificar
+    }
+    
+    if id_pago:
+        result["id_pago_inicial"] = id_pago
         
-        result = {
-            "success": True,
-            "message": "Venta a crédito registrada exitosamente",
-            "id_venta": id_venta,
-            "id_credito": id_credito,
-            "productos_actualizados": productos_verificar
-        }
+    return result
+
+
+def registrar_venta_credito_completa(
+    venta_data: Venta,
+    detalles_data: List[DetalleVenta],
+    credito_data: Credito,
+    db_path: str,
+    pago_inicial: Optional[Pago] = None,
+    idempotencia: Optional[ClaveIdempotencia] = None
+) -> dict:
+    """
+    Registra una venta a crédito completa con sus detalles, registro de crédito
+    y pago inicial opcional. Los montos de la venta y los precios de los detalles los
+    calcula el motor de precios.
+    
+    Args:
+        venta_data: Datos de la venta
+        detalles_data: Lista de detalles de productos vendidos
+        credito_data: Datos del crédito a crear (sin monto_total se registra el total en USD de la venta)
+        pago_inicial: Pago inicial opcional (puede ser None si no hay pago inicial)
+        db_path: Ruta a la base de datos SQLite
+        idempotencia: Clave de idempotencia de la petición (un reintento devuelve la respuesta guardada)
+    
+    Returns:
+        dict: Resultado de la operación con IDs generados
         
-        if id_pago:
-            result["id_pago_inicial"] = id_pago
+    Raises:
+        HTTPException: Si hay errores de validación (422), stock insuficiente (409) o en la transacción
+    """
+    try:
+        # 1. Validaciones iniciales
+        if venta_data.tipo != 'credito':
+            raise ValueError("El tipo de venta debe ser 'credito'")
             
-        return result
+        if not venta_data.ci_cliente:
+            raise ValueError("Las ventas a crédito requieren un cliente")
 
+        if venta_data.ci_cliente != credito_data.ci_cliente:
+            raise ValueError("El cliente de la venta debe coincidir con el del crédito")
+
+        # 2. Precios, montos y escrituras se ejecutan en el escritor único (transacción abierta con BEGIN IMMEDIATE)
+        return ejecutar_idempotente(
+            db_path, idempotencia, _registrar_venta_credito, venta_data, detalles_data, credito_data, db_path, pago_inicial
+        )
+
+    except StockConflictError as se:
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "success": False,
+                "error": "Stock insuficiente",
+                "message": str(se)
+            }
+        )
     except ValueError as ve:
-        if conn:
-            conn.rollback()
         raise HTTPException(
             status_code=422,
             detail={
@@ -201,9 +180,9 @@ def registrar_venta_credito_completa(
                 "message": str(ve)
             }
         )
+    except WriterTimeoutError:
+        raise
     except Exception as e:
-        if conn:
-            conn.rollback()
         raise HTTPException(
             status_code=400,
             detail={
@@ -212,9 +191,6 @@ def registrar_venta_credito_completa(
                 "message": str(e)
             }
         )
-    finally:
-        if conn:
-            conn.close()
 
 
 def registrar_venta_completa(
@@ -223,7 +199,7 @@ def registrar_venta_completa(
     db_path: str,
     pago_data: Optional[Pago] = None,
     credito_data: Optional[Credito] = None,
-    
+    idempotencia: Optional[ClaveIdempotencia] = None
 ) -> dict:
     """
     Función unificada que maneja tanto ventas de contado como a crédito.
@@ -234,6 +210,7 @@ def registrar_venta_completa(
         pago_data: Datos del pago (obligatorio para venta de contado, opcional para crédito)
         credito_data: Datos del crédito (solo para ventas a crédito)
         db_path: Ruta a la base de datos SQLite
+        idempotencia: Clave de idempotencia de la petición (un reintento devuelve la respuesta guardada)
     
     Returns:
         dict: Resultado de la operación
@@ -253,7 +230,8 @@ def registrar_venta_completa(
             detalles_data=detalles_data,
             credito_data=credito_data,
             pago_inicial=pago_data,
-            db_path=db_path
+            db_path=db_path,
+            idempotencia=idempotencia
         )
     else:
         if not pago_data:
@@ -269,5 +247,6 @@ def registrar_venta_completa(
             venta_data=venta_data,
             detalles_data=detalles_data,
             pago_data=pago_data,
-            db_path=db_path
+            db_path=db_path,
+            idempotencia=idempotencia
         )
\ No newline at end of file
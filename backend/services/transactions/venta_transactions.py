@@ -1,77 +1,54 @@
 import sqlite3
-from typing import List
+from typing import List, Optional
 from fastapi import HTTPException
+from database.pool import get_pool
+from database.writer import WriterTimeoutError
 from backend.models.models import DetalleVenta, Pago, Venta, ProductoNoPreparado
+from backend.services.transactions.inventario_transactions import (
+    StockConflictError, verificar_stock, registrar_salida_venta
+)
+from backend.services.transactions.idempotencia_transactions import ClaveIdempotencia, ejecutar_idempotente
+from backend.services.services import precios_service
 
-def registrar_venta_con_detalles_y_pago(
+
+def insertar_detalles(cursor: sqlite3.Cursor, id_venta: int, detalles_data: List[DetalleVenta]) -> None:
+    """Inserta todos los detalles de la venta con un único executemany."""
+    cursor.executemany(
+        """INSERT INTO Detalle_Venta (
+            id_venta, cod_producto, cantidad_producto, precio_unitario
+        ) VALUES (?, ?, ?, ?)""",
+        [
+            (id_venta, detalle.cod_producto, detalle.cantidad_producto, detalle.precio_unitario)
+            for detalle in detalles_data
+        ]
+    )
+
+
+def _registrar_venta(
     venta_data: Venta,
     detalles_data: List[DetalleVenta],
     pago_data: Pago,
     db_path: str
 ) -> dict:
     """
-    Registra una venta completa con sus detalles y pago asociado,
-    validando que no queden cantidades negativas en inventario.
-    
-    Args:
-        venta_data: Datos de la venta
-        detalles_data: Lista de detalles de productos vendidos
-        pago_data: Datos del pago asociado
-        db_path: Ruta a la base de datos SQLite
-    
-    Returns:
-        dict: Resultado de la operación con ID de venta generado
-        
-    Raises:
-        HTTPException: Si hay errores de validación o en la transacción
+    Parte transaccional de la venta de contado. Se ejecuta en el escritor único:
+    si lanza una excepción se deshacen todas sus escrituras.
     """
-    conn = None
-    try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # # 1. Validaciones iniciales
-        # total_detalles = sum(d.precio_unitario * d.cantidad_producto for d in detalles_data)
-        # if abs(total_detalles - venta_data.monto_total_bs) > 0.01:
-        #     raise ValueError("El monto total no coincide con la suma de los productos")
-        
-        if abs(pago_data.monto - venta_data.monto_total_bs) > 0.001:
-            raise ValueError("El monto del pago no coincide con el total de la venta")
+    # Precios y totales del servidor (precios vigentes y tasa actual, desde memoria). Se calculan
+    # aquí, después de buscar la clave de idempotencia: un reintento de una venta ya registrada
+    # devuelve la respuesta guardada aunque entre tanto hayan cambiado los precios o la tasa.
+    venta_data, detalles_data = precios_service.preciar_venta(venta_data, detalles_data)
+    pago_data = pago_data.model_copy(update={"monto": precios_service.cuadrar_monto(
+        pago_data.monto, venta_data.monto_total_bs, "El monto del pago no coincide con el total de la venta"
+    )})
 
-        # 2. Verificar stock antes de comenzar la transacción
-        productos_verificar = {}
-        for detalle in detalles_data:
-            cursor.execute(
-                """SELECT p.cod_producto, np.cant_actual
-                   FROM Productos p
-                   LEFT JOIN Productos_noPreparados np ON p.cod_producto = np.cod_producto_noPreparado
-                   WHERE p.cod_producto = ?""",
-                (detalle.cod_producto,)
-            )
-            producto = cursor.fetchone()
-            
-            if not producto:
-                raise ValueError(f"Producto {detalle.cod_producto} no encontrado")
-            
-            cod_producto, cant_actual = producto
-            
-            # Solo verificamos stock para productos no preparados
-            if cant_actual is not None:
-                nueva_cantidad = cant_actual - detalle.cantidad_producto
-                if nueva_cantidad < 0:
-                    raise ValueError(
-                        f"No hay suficiente stock para {cod_producto}. "
-                        f"Stock actual: {cant_actual}, solicitado: {detalle.cantidad_producto}"
-                    )
-                productos_verificar[cod_producto] = {
-                    'cant_actual': cant_actual,
-                    'nueva_cantidad': nueva_cantidad
-                }
+    with get_pool(db_path).connection() as conn:
+        cursor = conn.cursor()
 
-        # 3. Iniciar transacción
-        cursor.execute("BEGIN TRANSACTION")
+        # Verificar stock (una sola consulta)
+        productos_verificar = verificar_stock(cursor, detalles_data)
 
-        # 4. Insertar la venta
+        # Insertar la venta
         cursor.execute(
             """INSERT INTO Ventas (
                 monto_total_bs, fecha_hora, monto_total_usd, 
@@ -88,22 +65,11 @@ def registrar_venta_con_detalles_y_pago(
         )
         id_venta = cursor.lastrowid
 
-        # 5. Insertar detalles
-        for detalle in detalles_data:
-            # Insertar detalle
-            cursor.execute(
-                """INSERT INTO Detalle_Venta (
-                    id_venta, cod_producto, cantidad_producto, precio_unitario
-                ) VALUES (?, ?, ?, ?)""",
-                (
-                    id_venta,
-                    detalle.cod_producto,
-                    detalle.cantidad_producto,
-                    detalle.precio_unitario
-                )
-            )
-            
-        # 6. Insertar el pago
+        # Insertar detalles y registrar la salida de inventario
+        insertar_detalles(cursor, id_venta, detalles_data)
+        registrar_salida_venta(cursor, id_venta, venta_data.fecha_hora, detalles_data, productos_verificar)
+
+        # Insertar el pago
         cursor.execute(
             """INSERT INTO Pagos (
                 id_venta, monto, fecha_pago, 
@@ -119,19 +85,54 @@ def registrar_venta_con_detalles_y_pago(
             )
         )
 
-        # 7. Confirmar transacción
-        conn.commit()
+    return {
+        "success": True,
+        "message": "Venta registrada exitosamente",
+        "id_venta": id_venta,
+        "productos_actualizados": productos_verificar
+    }
+
+
+def registrar_venta_con_detalles_y_pago(
+    venta_data: Venta,
+    detalles_data: List[DetalleVenta],
+    pago_data: Pago,
+    db_path: str,
+    idempotencia: Optional[ClaveIdempotencia] = None
+) -> dict:
+    """
+    Registra una venta completa con sus detalles y pago asociado,
+    validando que no queden cantidades negativas en inventario.
+    Los montos de la venta y los precios de los detalles los calcula el motor de precios.
+    
+    Args:
+        venta_data: Datos de la venta
+        detalles_data: Lista de detalles de productos vendidos
+        pago_data: Datos del pago asociado (sin monto se registra el total de la venta)
+        db_path: Ruta a la base de datos SQLite
+        idempotencia: Clave de idempotencia de la petición (un reintento devuelve la respuesta guardada)
+    
+    Returns:
+        dict: Resultado de la operación con ID de venta generado
         
-        return {
-            "success": True,
-            "message": "Venta registrada exitosamente",
-            "id_venta": id_venta,
-            "productos_actualizados": productos_verificar
-        }
+    Raises:
+        HTTPException: Si hay errores de validación (422), stock insuficiente (409) o en la transacción
+    """
+    try:
+        # Precios, montos y escrituras se ejecutan en el escritor único: su transacción se abre con
+        # BEGIN IMMEDIATE, así dos cajas no pueden validar y vender las mismas unidades a la vez
+        return ejecutar_idempotente(db_path, idempotencia, _registrar_venta, venta_data, detalles_data, pago_data, db_path)
 
+    except StockConflictError as se:
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "success": False,
+                "error": "Stock insuficiente",
+                "message": str(se)
+            }
+        )
     except ValueError as ve:
-        if conn:
-            conn.rollback()
         raise HTTPException(
             status_code=422,
             detail={
@@ -140,9 +141,9 @@ def registrar_venta_con_detalles_y_pago(
                 "message": str(ve)
             }
         )
+    except WriterTimeoutError:
+        raise
     except Exception as e:
-        if conn:
-            conn.rollback()
         raise HTTPException(
             status_code=400,
             detail={
@@ -151,6 +152,3 @@ def registrar_venta_con_detalles_y_pago(
                 "message": str(e)
             }
         )
-    finally:
-        if conn:
-            conn.close()
\ No newline at end of file
@@ -1,18 +1,24 @@
 import sqlite3
-from typing import List, Optional, Dict
+from typing import Any, Iterable, List, Optional, Dict, Tuple
 from datetime import datetime
 from backend.models.view_models import DetalleVentaCompleto, DetalleProductoVenta, ResumenVenta
 from backend.models.models import Venta, Cliente, ProductoBase, DetalleVenta, Pago, TasaCambio
+from database.pool import get_pool
+from database.executor import async_method
+
+# Límite de parámetros por consulta IN (...) (SQLITE_MAX_VARIABLE_NUMBER es 999 en versiones antiguas)
+MAX_IN_PARAMS = 500
 
 class VentaDetalleService:
     def __init__(self, db_path: str = None):
         self.db_path = db_path
+        self.pool = get_pool(db_path)
 
     def _execute_query(self, query: str, params: tuple = ()) -> List[Dict]:
         """Ejecuta una consulta y devuelve los resultados como diccionarios"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
             cursor.execute(query, params)
             return [dict(row) for row in cursor.fetchall()]
 
@@ -21,6 +27,26 @@ class VentaDetalleService:
         results = self._execute_query(query, params)
         return results[0] if results else None
 
+    def _get_records_by_keys(self, table: str, key_field: str, keys: Iterable, order_field: str = None) -> Dict[Any, Dict]:
+        """
+        Obtiene en lote los registros cuyo key_field está en keys, usando consultas IN (...).
+        Si hay varios registros con la misma clave se conserva el primero según order_field.
+        :return: Diccionario clave -> registro
+        """
+        keys = list(dict.fromkeys(k for k in keys if k is not None))
+        records = {}
+        order_by = f" ORDER BY {order_field}" if order_field else ""
+        for i in range(0, len(keys), MAX_IN_PARAMS):
+            chunk = keys[i:i + MAX_IN_PARAMS]
+            placeholders = ', '.join(['?'] * len(chunk))
+            rows = self._execute_query(
+                f"SELECT * FROM {table} WHERE {key_field} IN ({placeholders}){order_by}",
+                tuple(chunk)
+            )
+            for row in rows:
+                records.setdefault(row[key_field], row)
+        return records
+
     def obtener_detalle_venta(self, id_venta: int) -> Optional[DetalleVentaCompleto]:
         """
         Obtiene el detalle completo de una venta utilizando las vistas SQL
@@ -118,65 +144,88 @@ class VentaDetalleService:
 
     def obtener_resumenes_ventas(
         self,
-        fecha_inicio: Optional[str] = None,
-        fecha_fin: Optional[str] = None,
+        fecha_desde: Optional[str] = None,
+        fecha_hasta: Optional[str] = None,
         ci_cliente: Optional[str] = None,
         tipo_venta: Optional[str] = None,
         metodo_pago: Optional[str] = None,
-        limit: int = 100
-    ) -> List[ResumenVenta]:
+        limit: int = 100,
+        despues_de: Optional[Tuple[str, int]] = None
+    ) -> Tuple[List[ResumenVenta], Optional[Tuple[str, int]]]:
         """
-        Obtiene resúmenes de ventas con filtros opcionales.
-        Utiliza la vista vista_resumen_ventas para mayor eficiencia.
+        Obtiene resúmenes de ventas con filtros opcionales, ordenados de la más reciente
+        a la más antigua y paginados por (fecha_hora, id_venta).
+        Los filtros de fecha se aplican sobre Ventas.fecha_hora para aprovechar su índice.
+        :param fecha_desde: Límite inferior ISO (YYYY-MM-DD), inclusivo.
+        :param fecha_hasta: Límite superior ISO (YYYY-MM-DD), exclusivo.
+        :param despues_de: Clave (fecha_hora, id_venta) de la última venta de la página anterior.
+        :return: Resúmenes de la página y la clave para pedir la siguiente (None si no hay más).
         """
         # 1. Construir consulta base con filtros
-        query = "SELECT * FROM vista_resumen_ventas"
+        query = """
+            SELECT 
+                v.id_venta,
+                v.fecha_hora,
+                strftime('%d/%m/%Y', v.fecha_hora) AS fecha_formateada,
+                strftime('%H:%M', v.fecha_hora) AS hora_formateada,
+                v.monto_total_usd,
+                v.monto_total_bs,
+                v.tipo,
+                v.ci_cliente,
+                v.id_tasa,
+                (SELECT COALESCE(SUM(dv.cantidad_producto), 0)
+                   FROM Detalle_Venta dv WHERE dv.id_venta = v.id_venta) AS cantidad_total_productos
+            FROM Ventas v
+        """
         conditions = []
         params = []
         
-        if fecha_inicio:
-            conditions.append("fecha_formateada >= ?")
-            params.append(fecha_inicio)
-        if fecha_fin:
-            conditions.append("fecha_formateada <= ?")
-            params.append(fecha_fin)
+        if fecha_desde:
+            conditions.append("v.fecha_hora >= ?")
+            params.append(fecha_desde)
+        if fecha_hasta:
+            conditions.append("v.fecha_hora < ?")
+            params.append(fecha_hasta)
         if ci_cliente:
-            conditions.append("ci_cliente = ?")
+            conditions.append("v.ci_cliente = ?")
             params.append(ci_cliente)
         if tipo_venta:
-            conditions.append("tipo = ?")
+            conditions.append("v.tipo = ?")
             params.append(tipo_venta)
         if metodo_pago:
-            conditions.append("metodo_pago = ?")
+            conditions.append("EXISTS (SELECT 1 FROM Pagos p WHERE p.id_venta = v.id_venta AND p.metodo_pago = ?)")
             params.append(metodo_pago)
+        if despues_de:
+            conditions.append("(v.fecha_hora, v.id_venta) < (?, ?)")
+            params.extend(despues_de)
         
         if conditions:
             query += " WHERE " + " AND ".join(conditions)
         
-        query += " ORDER BY fecha_formateada DESC, hora_formateada DESC LIMIT ?"
+        query += " ORDER BY v.fecha_hora DESC, v.id_venta DESC LIMIT ?"
         params.append(limit)
         
-        # 2. Ejecutar consulta
-        ventas_data = self._execute_query(query, params)
+        # 2. Ejecutar consulta y cargar en lote clientes y pagos (una consulta IN por tabla)
+        with self.pool.connection():
+            ventas_data = self._execute_query(query, params)
+            clientes_data = self._get_records_by_keys(
+                "Clientes", "ci_cliente", (v.get('ci_cliente') for v in ventas_data)
+            )
+            pagos_data = self._get_records_by_keys(
+                "Pagos", "id_venta", (v['id_venta'] for v in ventas_data), order_field="id_pago"
+            )
         
         # 3. Procesar resultados
         resumenes = []
         for v in ventas_data:
             # Obtener cliente si existe
             cliente = None
-            if v.get('ci_cliente'):
-                cliente_data = self._get_single_record(
-                    "SELECT * FROM Clientes WHERE ci_cliente = ?",
-                    (v['ci_cliente'],)
-                )
-                if cliente_data:
-                    cliente = Cliente(**cliente_data)
+            cliente_data = clientes_data.get(v.get('ci_cliente'))
+            if cliente_data:
+                cliente = Cliente(**cliente_data)
             
             # Obtener pago
-            pago_data = self._get_single_record(
-                "SELECT * FROM Pagos WHERE id_venta = ?",
-                (v['id_venta'],)
-            )
+            pago_data = pagos_data.get(v['id_venta'])
             if not pago_data:
                 continue  # Saltar ventas sin pago
             pago = Pago(**pago_data)
@@ -186,10 +235,10 @@ class VentaDetalleService:
                 id_venta=v['id_venta'],
                 monto_total_bs=v['monto_total_bs'],
                 monto_total_usd=v['monto_total_usd'],
-                fecha_hora=datetime.strptime(f"{v['fecha_formateada']} {v['hora_formateada']}", "%d/%m/%Y %H:%M"),
+                fecha_hora=datetime.fromisoformat(v['fecha_hora']),
                 tipo=v['tipo'],
                 ci_cliente=v.get('ci_cliente'),
-                id_tasa=None  # No incluido en el resumen
+                id_tasa=v.get('id_tasa')
             )
             
             resumenes.append(ResumenVenta(
@@ -201,34 +250,42 @@ class VentaDetalleService:
                 hora_formateada=v['hora_formateada']
             ))
         
-        return resumenes
+        # 4. Clave de la siguiente página (sólo si la página vino completa)
+        siguiente = None
+        if len(ventas_data) == limit:
+            ultima = ventas_data[-1]
+            siguiente = (ultima['fecha_hora'], ultima['id_venta'])
+        
+        return resumenes, siguiente
 
     def obtener_ventas_por_producto(
         self, 
         cod_producto: str,
-        fecha_inicio: Optional[str] = None,
-        fecha_fin: Optional[str] = None,
+        fecha_desde: Optional[str] = None,
+        fecha_hasta: Optional[str] = None,
         limit: int = 100
     ) -> List[DetalleProductoVenta]:
         """
-        Obtiene todas las ventas donde aparece un producto específico
+        Obtiene todas las ventas donde aparece un producto específico.
+        :param fecha_desde: Límite inferior ISO (YYYY-MM-DD), inclusivo.
+        :param fecha_hasta: Límite superior ISO (YYYY-MM-DD), exclusivo.
         """
         query = """
-            SELECT v.*, dv.*, p.nombre as nombre_producto
-            FROM vista_detalle_productos_venta v
-            JOIN Productos p ON v.cod_producto = p.cod_producto
-            WHERE v.cod_producto = ?
+            SELECT d.*
+            FROM vista_detalle_productos_venta d
+            JOIN Ventas v ON v.id_venta = d.id_venta
+            WHERE d.cod_producto = ?
         """
         params = [cod_producto]
         
-        if fecha_inicio:
-            query += " AND v.fecha_formateada >= ?"
-            params.append(fecha_inicio)
-        if fecha_fin:
-            query += " AND v.fecha_formateada <= ?"
-            params.append(fecha_fin)
+        if fecha_desde:
+            query += " AND v.fecha_hora >= ?"
+            params.append(fecha_desde)
+        if fecha_hasta:
+            query += " AND v.fecha_hora < ?"
+            params.append(fecha_hasta)
         
-        query += " ORDER BY v.fecha_formateada DESC, v.hora_formateada DESC LIMIT ?"
+        query += " ORDER BY v.fecha_hora DESC, v.id_venta DESC LIMIT ?"
         params.append(limit)
         
         productos_data = self._execute_query(query, params)
@@ -255,4 +312,9 @@ class VentaDetalleService:
                 detalle_venta=detalle_venta
             ))
         
-        return productos
\ No newline at end of file
+        return productos
+
+    # Interfaz asíncrona (se ejecuta en el executor de base de datos)
+    aobtener_detalle_venta = async_method(obtener_detalle_venta)
+    aobtener_resumenes_ventas = async_method(obtener_resumenes_ventas)
+    aobtener_ventas_por_producto = async_method(obtener_ventas_por_producto)
@@ -1,31 +1,144 @@
 #guarda de manera automatica el cambio de tasa en la base de datos, si esta corriendo el backend
-from apscheduler.schedulers.background import BackgroundScheduler
+from datetime import datetime, timedelta
+import os
+import time
+import asyncio
+from typing import Optional
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.date import DateTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 import pytz
-import asyncio
-import nest_asyncio
 
+from backend.models.models import TasaCambio
 from backend.services.pydolarve_service import PyDolarVE
 from backend.controllers.controller import tasasCambio_controller
+from backend.services.transactions.idempotencia_transactions import purgar_claves_vencidas
+from database.database import db_path
+from database.executor import run_in_db
 
-nest_asyncio.apply()
 # Define la zona horaria de Venezuela
 venezuela_tz = pytz.timezone("America/Caracas")
 
-def guardar_tasa_automatica():
+JOB_ID = "guardar_tasa_automatica"
+JOB_HOUR, JOB_MINUTE = 16, 1                                           # hora diaria del job (Caracas)
+JOB_TIMEOUT = float(os.getenv('TASA_JOB_TIMEOUT', '60'))               # segundos máximos por ejecución
+JOB_MAX_RETRIES = int(os.getenv('TASA_JOB_MAX_RETRIES', '3'))          # reintentos tras un fallo
+JOB_RETRY_DELAY = float(os.getenv('TASA_JOB_RETRY_DELAY', '300'))      # segundos entre reintentos
+JOB_MISFIRE_GRACE = int(os.getenv('TASA_JOB_MISFIRE_GRACE', '3600'))   # segundos de tolerancia si el backend estuvo caído
+IDEMPOTENCY_PRUNE_JOB_ID = "purgar_claves_idempotencia"
+IDEMPOTENCY_PRUNE_INTERVAL = float(os.getenv('IDEMPOTENCY_PRUNE_MINUTES', '60'))
+
+# Métricas de las ejecuciones del job
+job_metrics = {
+    "ejecuciones": 0,
+    "exitos": 0,
+    "fallos": 0,
+    "reintentos_programados": 0,
+    "recuperaciones_programadas": 0,
+    "ultima_ejecucion": None,
+    "ultima_duracion_ms": None,
+    "ultimo_error": None,
+}
+
+
+def _programar_reintento(intento: int) -> None:
+    """Programa una ejecución única del job tras JOB_RETRY_DELAY segundos."""
+    if intento > JOB_MAX_RETRIES:
+        print(f"[APSCHEDULER] Se agotaron los {JOB_MAX_RETRIES} reintentos para guardar la tasa.")
+        return
+    run_date = datetime.now(venezuela_tz) + timedelta(seconds=JOB_RETRY_DELAY)
+    scheduler.add_job(
+        guardar_tasa_automatica,
+        DateTrigger(run_date=run_date),
+        kwargs={"intento": intento},
+        id=f"{JOB_ID}_reintento",
+        replace_existing=True,
+        misfire_grace_time=JOB_MISFIRE_GRACE,
+    )
+    job_metrics["reintentos_programados"] += 1
+    print(f"[APSCHEDULER] Reintento {intento}/{JOB_MAX_RETRIES} programado para {run_date:%H:%M:%S}.")
+
+
+async def guardar_tasa_automatica(intento: int = 0):
     print("[APSCHEDULER] Intentando guardar la tasa automáticamente...")
+    inicio = time.perf_counter()
+    job_metrics["ejecuciones"] += 1
+    job_metrics["ultima_ejecucion"] = datetime.now(venezuela_tz).isoformat()
     try:
-        tasa = asyncio.run(PyDolarVE().get_precio_dolar())
-        tasasCambio_controller.create(tasa)
+        tasa = await asyncio.wait_for(PyDolarVE().get_precio_dolar(fallback=False), timeout=JOB_TIMEOUT)
+        # La escritura en SQLite es bloqueante: se ejecuta en el executor de base de datos
+        await tasasCambio_controller.acreate(tasa)
+        job_metrics["exitos"] += 1
+        job_metrics["ultimo_error"] = None
         print(f"[APSCHEDULER] Tasa guardada automáticamente: {tasa.valor_usd_bs} (Origen: {tasa.origen})")
     except Exception as e:
-        print(f"[APSCHEDULER] Error al guardar la tasa automáticamente: {e}")
+        job_metrics["fallos"] += 1
+        job_metrics["ultimo_error"] = str(e) or type(e).__name__
+        print(f"[APSCHEDULER] Error al guardar la tasa automáticamente: {e!r}")
+        _programar_reintento(intento + 1)
+    finally:
+        job_metrics["ultima_duracion_ms"] = round((time.perf_counter() - inicio) * 1000, 3)
+
+def tasa_pendiente(ultima: Optional[TasaCambio], ahora: datetime) -> bool:
+    """
+    Indica si ya pasó la hora del job de hoy y la última tasa guardada es de un día anterior.
+    :param ultima: Última tasa almacenada (None si no hay ninguna).
+    :param ahora: Fecha y hora actual en Caracas.
+    """
+    hora_job = ahora.replace(hour=JOB_HOUR, minute=JOB_MINUTE, second=0, microsecond=0)
+    if ahora < hora_job:
+        return False
+    return ultima is None or ultima.fecha.date() < ahora.date()
 
-# Scheduler
-scheduler = BackgroundScheduler(timezone=venezuela_tz)
+
+async def recuperar_ejecucion_perdida() -> bool:
+    """
+    Los jobs viven en memoria: si el backend estaba apagado a la hora del job, al reiniciar
+    el cron sólo espera al día siguiente (misfire_grace_time no recupera ejecuciones de otro
+    proceso). Al iniciar se programa una ejecución inmediata si ya pasó la hora y no hay tasa de hoy.
+    :return: True si se programó la ejecución.
+    """
+    ultima = await tasasCambio_controller.aget_last_record("id_tasa")
+    ahora = datetime.now(venezuela_tz)
+    if not tasa_pendiente(ultima, ahora):
+        return False
+    scheduler.add_job(
+        guardar_tasa_automatica,
+        DateTrigger(run_date=ahora),
+        id=f"{JOB_ID}_recuperacion",
+        replace_existing=True,
+        misfire_grace_time=JOB_MISFIRE_GRACE,
+    )
+    job_metrics["recuperaciones_programadas"] += 1
+    print("[APSCHEDULER] No hay tasa de hoy y ya pasó la hora del job: se ejecuta ahora.")
+    return True
+
+async def purgar_idempotencia():
+    """Elimina las claves de idempotencia vencidas de los endpoints de registro de ventas."""
+    try:
+        eliminadas = await run_in_db(purgar_claves_vencidas, db_path)
+        if eliminadas:
+            print(f"[APSCHEDULER] {eliminadas} claves de idempotencia vencidas eliminadas.")
+    except Exception as e:
+        print(f"[APSCHEDULER] Error al purgar claves de idempotencia: {e!r}")
+
+# Scheduler: corre sobre el event loop de la app (se inicia en el lifespan)
+scheduler = AsyncIOScheduler(timezone=venezuela_tz)
 scheduler.add_job(
     guardar_tasa_automatica,
-    CronTrigger(hour='16', minute="01") #hora en la que se ejecuta automaticamente el scheduler
+    CronTrigger(hour=JOB_HOUR, minute=JOB_MINUTE), #hora en la que se ejecuta automaticamente el scheduler
+    id=JOB_ID,
+    coalesce=True,                      # si se acumulan ejecuciones perdidas, corre sólo una
+    max_instances=1,
+    misfire_grace_time=JOB_MISFIRE_GRACE,
+)
+scheduler.add_job(
+    purgar_idempotencia,
+    IntervalTrigger(minutes=IDEMPOTENCY_PRUNE_INTERVAL),
+    id=IDEMPOTENCY_PRUNE_JOB_ID,
+    coalesce=True,
+    max_instances=1,
 )
 
-print("[APSCHEDULER] Scheduler configurado, esperando inicio...") 
+print("[APSCHEDULER] Scheduler configurado, esperando inicio...")
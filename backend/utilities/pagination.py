@@ -0,0 +1,27 @@
+# Utilidades para paginación por cursor (keyset)
+import base64
+import json
+from typing import Any, List
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Codifica los valores de la última fila de una página como cursor opaco."""
+    raw = json.dumps(values, separators=(',', ':'), default=str).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Decodifica un cursor generado por encode_cursor.
+    :param cursor: Cursor recibido del cliente.
+    :param size: Cantidad de valores esperados.
+    :raises ValueError: Si el cursor es inválido.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Cursor inválido: {cursor}") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError(f"Cursor inválido: {cursor}")
+    return values
@@ -5,7 +5,7 @@ from backend.controllers.controller import tasasCambio_controller
 
 async def main():
     service = PyDolarVE()
-    tasa = await service.get_precio_dolar()
+    tasa = await service.get_precio_dolar(fallback=False)
     tasasCambio_controller.create(tasa)
     print("Tasa guardada:", tasa)
 
@@ -0,0 +1,97 @@
+import os
+import sqlite3
+from typing import Any, Dict
+
+from dotenv import load_dotenv
+
+from database.migrations import run_migrations
+from database.pool import get_pool
+
+load_dotenv()
+
+# Perfiles de configuración de SQLite. journal_mode se guarda en el archivo de la
+# base de datos; el resto de PRAGMAs se aplican a cada conexión nueva del pool.
+PRAGMA_PROFILES: Dict[str, Dict[str, Any]] = {
+    'produccion': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,     # 256 MB
+        'cache_size': -64000,               # ~64 MB (negativo = KiB)
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,               # ms
+    },
+    'desarrollo': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 32 * 1024 * 1024,
+        'cache_size': -8000,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    'seguro': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'mmap_size': 0,
+        'cache_size': -16000,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 10000,
+    },
+}
+
+DEFAULT_PROFILE = os.getenv('SQLITE_PROFILE', 'produccion')
+
+# PRAGMAs que se aplican por conexión (journal_mode es persistente en el archivo)
+CONNECTION_PRAGMAS = ('synchronous', 'mmap_size', 'cache_size', 'temp_store', 'busy_timeout')
+
+
+def get_profile(name: str = None) -> Dict[str, Any]:
+    """
+    Obtiene un perfil de PRAGMAs por nombre.
+    :param name: Nombre del perfil (por defecto SQLITE_PROFILE o 'produccion').
+    :raises ValueError: Si el perfil no existe.
+    """
+    name = name or DEFAULT_PROFILE
+    if name not in PRAGMA_PROFILES:
+        raise ValueError(f"Perfil de SQLite desconocido: {name}. Use uno de {list(PRAGMA_PROFILES)}")
+    return PRAGMA_PROFILES[name]
+
+
+def apply_connection_pragmas(conn: sqlite3.Connection, profile: Dict[str, Any]) -> None:
+    """Aplica los PRAGMAs por conexión del perfil a una conexión abierta."""
+    for pragma in CONNECTION_PRAGMAS:
+        if pragma in profile:
+            conn.execute(f"PRAGMA {pragma} = {profile[pragma]}")
+
+
+def bootstrap_database(db_path: str, profile_name: str = None) -> Dict[str, Any]:
+    """
+    Prepara la base de datos al iniciar la aplicación:
+    activa el modo WAL, aplica las migraciones pendientes y configura el
+    pool compartido para que cada conexión nueva aplique los PRAGMAs del perfil.
+    :param db_path: Ruta al archivo de la base de datos.
+    :param profile_name: Nombre del perfil a usar.
+    :return: Valores efectivos de los PRAGMAs tras la configuración.
+    """
+    profile = get_profile(profile_name)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        journal_mode = conn.execute(f"PRAGMA journal_mode = {profile['journal_mode']}").fetchone()[0]
+        if journal_mode.upper() != profile['journal_mode'].upper():
+            print(f"[BOOTSTRAP] No se pudo activar journal_mode={profile['journal_mode']}, se mantiene {journal_mode}")
+    finally:
+        conn.close()
+
+    run_migrations(db_path)
+
+    pool = get_pool(db_path)
+    pool.configure(lambda c: apply_connection_pragmas(c, profile))
+
+    with pool.connection() as conn:
+        efectivos = {
+            pragma: conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+            for pragma in ('journal_mode',) + CONNECTION_PRAGMAS
+        }
+
+    print(f"[BOOTSTRAP] Base de datos configurada con perfil '{profile_name or DEFAULT_PROFILE}': {efectivos}")
+    return efectivos
@@ -77,6 +77,7 @@ CREATE TABLE IF NOT EXISTS Productos_noPreparados (
   costo_compra REAL,
   unidad_medida TEXT,
   Rif TEXT,
+  version_stock INTEGER NOT NULL DEFAULT 0,   -- la incrementan los cambios de stock hechos desde Movimientos
   FOREIGN KEY (cod_producto_noPreparado) REFERENCES Productos(cod_producto),
   FOREIGN KEY (Rif) REFERENCES Proveedores(Rif)
 );
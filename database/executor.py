@@ -0,0 +1,161 @@
+import asyncio
+import functools
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+from database.pool import DEFAULT_POOL_SIZE
+
+load_dotenv()
+
+DEFAULT_EXECUTOR_WORKERS = int(os.getenv('SQLITE_EXECUTOR_WORKERS', str(DEFAULT_POOL_SIZE)))
+DEFAULT_EXECUTOR_QUEUE = int(os.getenv('SQLITE_EXECUTOR_QUEUE', '200'))        # operaciones en espera
+DEFAULT_EXECUTOR_TIMEOUT = float(os.getenv('SQLITE_EXECUTOR_TIMEOUT', '10'))   # segundos esperando cupo en la cola
+LATENCY_SAMPLES = 1000
+
+
+class ExecutorBusyError(Exception):
+    """Excepción lanzada cuando la cola del executor de base de datos está llena."""
+    def __init__(self, timeout: float, message: str = None):
+        self.timeout = timeout
+        self.message = message or f"La base de datos está ocupada, no hubo cupo tras esperar {timeout} segundos"
+        super().__init__(self.message)
+
+
+class DBExecutor:
+    """
+    Executor dedicado a las operaciones síncronas de SQLite llamadas desde código async.
+
+    Usa sus propios hilos (tantos como conexiones tiene el pool, así ningún hilo espera por
+    una conexión) en lugar del threadpool por defecto de FastAPI, y limita las operaciones
+    pendientes con una cola acotada: si se llena, las nuevas esperan hasta `timeout`
+    segundos y luego fallan con ExecutorBusyError en vez de acumularse sin límite.
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_EXECUTOR_WORKERS,
+        max_queue: int = DEFAULT_EXECUTOR_QUEUE,
+        timeout: float = DEFAULT_EXECUTOR_TIMEOUT
+    ):
+        """
+        :param workers: Hilos que ejecutan operaciones de base de datos.
+        :param max_queue: Operaciones que pueden esperar además de las que están en ejecución.
+        :param timeout: Segundos que una operación espera por un cupo en la cola.
+        """
+        if workers < 1:
+            raise ValueError("El executor necesita al menos un hilo")
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._pending = 0
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+
+    def startup(self) -> None:
+        """Crea los hilos y la cola (se llama al iniciar la app, dentro de su event loop)."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sqlite")
+            # El semáforo queda ligado al event loop que lo usa primero
+            self._slots = asyncio.Semaphore(self.workers + self.max_queue)
+
+    def shutdown(self) -> None:
+        """Espera las operaciones en curso y libera los hilos (se llama al apagar la app)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._slots = None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Ejecuta una función síncrona de base de datos en el executor y espera su resultado.
+        :raises ExecutorBusyError: Si la cola sigue llena tras el tiempo de espera.
+        """
+        if self._executor is None or self._slots is None:
+            self.startup()
+        slots = self._slots
+
+        inicio = time.perf_counter()
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._rejected += 1
+            raise ExecutorBusyError(self.timeout)
+
+        with self._lock:
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            resultado = await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            slots.release()
+            with self._lock:
+                self._pending -= 1
+                self._latencies.append(time.perf_counter() - inicio)
+        with self._lock:
+            self._completed += 1
+        return resultado
+
+    def stats(self) -> Dict[str, Any]:
+        """Métricas del executor: carga actual y latencias (espera + ejecución) recientes."""
+        with self._lock:
+            latencias = sorted(self._latencies)
+            stats = {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "pending": self._pending,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+            }
+        for nombre, percentil in (("p50_ms", 0.50), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+            stats[nombre] = (
+                round(latencias[min(len(latencias) - 1, int(len(latencias) * percentil))] * 1000, 3)
+                if latencias else 0.0
+            )
+        return stats
+
+
+db_executor = DBExecutor()
+
+
+async def run_in_db(fn: Callable, *args, **kwargs) -> Any:
+    """Ejecuta una función síncrona de base de datos en el executor compartido."""
+    return await db_executor.run(fn, *args, **kwargs)
+
+
+def async_method(method: Callable) -> Callable:
+    """
+    Crea la versión asíncrona de un método síncrono de un servicio o controlador:
+    la llamada se ejecuta en el executor de base de datos.
+    El método se resuelve por nombre al llamar, así respeta las sobrescrituras de las subclases.
+
+    Uso (en el cuerpo de la clase): aget_all = async_method(get_all)
+    """
+    nombre = method.__name__
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        return await run_in_db(getattr(self, nombre), *args, **kwargs)
+
+    wrapper.__name__ = f"a{nombre}"
+    return wrapper
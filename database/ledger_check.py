@@ -0,0 +1,105 @@
+# Verificación del invariante de inventario: el stock de cada producto no preparado
+# (Productos_noPreparados.cant_actual) debe coincidir con el saldo de sus Movimientos.
+# Con --reconstruir recalcula el stock desde Movimientos para los productos descuadrados.
+import sqlite3
+import sys
+from typing import Any, Dict, List
+
+REBUILD_LOCK_TIMEOUT = 30      # segundos esperando que el backend libere el bloqueo de escritura
+
+# Saldo de cada producto no preparado según el libro de movimientos
+STOCK_LEDGER_QUERY = """
+SELECT
+    np.cod_producto_noPreparado AS cod_producto,
+    np.cant_actual AS cant_actual,
+    COALESCE(SUM(
+        CASE m.tipo_movimiento
+            WHEN 'entrada' THEN m.cant_movida
+            WHEN 'salida' THEN -m.cant_movida
+            ELSE 0
+        END
+    ), 0) AS cant_movimientos
+FROM Productos_noPreparados np
+LEFT JOIN Movimientos m ON m.cod_producto = np.cod_producto_noPreparado
+GROUP BY np.cod_producto_noPreparado
+"""
+
+
+def _read_drift(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    """Productos cuyo cant_actual no coincide con el saldo de sus movimientos, leídos en conn."""
+    conn.row_factory = sqlite3.Row
+    filas = conn.execute(STOCK_LEDGER_QUERY).fetchall()
+    return [
+        {
+            "cod_producto": fila["cod_producto"],
+            "cant_actual": fila["cant_actual"],
+            "cant_movimientos": fila["cant_movimientos"],
+            "diferencia": fila["cant_actual"] - fila["cant_movimientos"],
+        }
+        for fila in filas
+        if fila["cant_actual"] != fila["cant_movimientos"]
+    ]
+
+
+def find_drift(db_path: str) -> List[Dict[str, Any]]:
+    """
+    Recalcula el stock desde Movimientos y lo compara con cant_actual.
+    :param db_path: Ruta al archivo de la base de datos.
+    :return: Productos cuyo stock no coincide con sus movimientos.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        return _read_drift(conn)
+    finally:
+        conn.close()
+
+
+def rebuild_stock(db_path: str) -> List[Dict[str, Any]]:
+    """
+    Reemplaza cant_actual por el saldo de Movimientos en los productos descuadrados.
+    Los descuadres se leen y se corrigen dentro de una misma transacción BEGIN IMMEDIATE,
+    así ninguna venta o compra del backend se confirma entre la lectura y la corrección.
+    Incrementa version_stock para que el cambio no se registre como un ajuste manual.
+    :param db_path: Ruta al archivo de la base de datos.
+    :return: Productos corregidos (con sus valores previos).
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None, timeout=REBUILD_LOCK_TIMEOUT)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            descuadres = _read_drift(conn)
+            conn.executemany(
+                """UPDATE Productos_noPreparados
+                   SET cant_actual = ?, version_stock = version_stock + 1
+                   WHERE cod_producto_noPreparado = ?""",
+                [(item["cant_movimientos"], item["cod_producto"]) for item in descuadres]
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+    return descuadres
+
+
+def print_report(descuadres: List[Dict[str, Any]]) -> int:
+    """Imprime los productos descuadrados y devuelve cuántos son."""
+    for item in descuadres:
+        print(
+            f"[DESCUADRE] {item['cod_producto']}: cant_actual={item['cant_actual']} "
+            f"movimientos={item['cant_movimientos']} diferencia={item['diferencia']:+}"
+        )
+    print("=" * 60)
+    print(f"{len(descuadres)} productos con stock distinto al de sus movimientos.")
+    return len(descuadres)
+
+
+if __name__ == "__main__":
+    from database import db_path
+    if "--reconstruir" in sys.argv[1:]:
+        corregidos = rebuild_stock(db_path)
+        print_report(corregidos)
+        print(f"{len(corregidos)} productos reconstruidos desde Movimientos.")
+        sys.exit(0)
+    sys.exit(1 if print_report(find_drift(db_path)) else 0)
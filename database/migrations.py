@@ -0,0 +1,565 @@
+import sqlite3
+from datetime import datetime
+from typing import Callable, List, Tuple, Union
+
+# Tabla donde se registran las migraciones aplicadas
+MIGRATIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+  version INTEGER PRIMARY KEY,
+  nombre TEXT NOT NULL,
+  aplicada_en TEXT NOT NULL
+);
+"""
+
+# 001 - Índices para las búsquedas y rangos de fecha más usados por los servicios
+MIGRACION_001_INDICES = """
+-- VentaDetalleService: pagos y detalles por venta
+CREATE INDEX IF NOT EXISTS idx_pagos_id_venta ON Pagos (id_venta);
+CREATE INDEX IF NOT EXISTS idx_detalle_venta_venta_producto ON Detalle_Venta (id_venta, cod_producto, cantidad_producto);
+CREATE INDEX IF NOT EXISTS idx_detalle_venta_producto ON Detalle_Venta (cod_producto);
+
+-- Triggers de inventario y vista de compras
+CREATE INDEX IF NOT EXISTS idx_movimientos_producto_ref_fecha ON Movimientos (cod_producto, referencia, fc_actualizacion);
+CREATE INDEX IF NOT EXISTS idx_movimientos_id_compra ON Movimientos (id_compra);
+
+-- get_data_from_date y listados por fecha
+CREATE INDEX IF NOT EXISTS idx_pagos_fecha_pago ON Pagos (fecha_pago);
+CREATE INDEX IF NOT EXISTS idx_tasas_cambio_fecha ON TasasCambio (fecha);
+CREATE INDEX IF NOT EXISTS idx_compras_fecha ON Compras (fecha);
+CREATE INDEX IF NOT EXISTS idx_ventas_fecha_hora ON Ventas (fecha_hora);
+
+-- Claves foráneas consultadas por cliente / venta
+CREATE INDEX IF NOT EXISTS idx_ventas_ci_cliente ON Ventas (ci_cliente);
+CREATE INDEX IF NOT EXISTS idx_creditos_id_venta ON Creditos (id_venta);
+CREATE INDEX IF NOT EXISTS idx_creditos_ci_cliente ON Creditos (ci_cliente);
+"""
+
+# 002 - Las ventas descuentan stock una sola vez, desde su transacción (descuento condicional
+# bajo BEGIN IMMEDIATE). El trigger de Pagos sólo registra los movimientos de salida y el
+# trigger general deja de ajustar stock para movimientos de venta.
+MIGRACION_002_DESCUENTO_VENTA = """
+DROP TRIGGER IF EXISTS tr_after_venta_completa;
+CREATE TRIGGER tr_after_venta_completa
+AFTER INSERT ON Pagos
+WHEN (SELECT COUNT(*) FROM Ventas WHERE id_venta = NEW.id_venta) > 0
+BEGIN
+    INSERT INTO Movimientos (
+        cod_producto, referencia, tipo_movimiento, cant_movida, fc_actualizacion, comentario
+    )
+    SELECT dv.cod_producto, 'venta', 'salida', dv.cantidad_producto, datetime('now'), 'Venta #' || NEW.id_venta
+    FROM Detalle_Venta dv
+    WHERE dv.id_venta = NEW.id_venta;
+END;
+
+DROP TRIGGER IF EXISTS tr_after_movimiento_general_insert;
+CREATE TRIGGER tr_after_movimiento_general_insert
+AFTER INSERT ON Movimientos
+WHEN NEW.referencia NOT IN ('compra', 'venta')
+BEGIN
+    UPDATE Productos_noPreparados
+    SET cant_actual = CASE
+        WHEN NEW.tipo_movimiento = 'entrada' THEN cant_actual + NEW.cant_movida
+        WHEN NEW.tipo_movimiento = 'salida' THEN cant_actual - NEW.cant_movida
+        ELSE cant_actual
+    END
+    WHERE cod_producto_noPreparado = NEW.cod_producto;
+
+    SELECT CASE
+        WHEN NEW.tipo_movimiento = 'salida'
+        AND EXISTS (
+            SELECT 1 FROM Productos_noPreparados
+            WHERE cod_producto_noPreparado = NEW.cod_producto
+            AND cant_actual < 0
+        )
+        THEN RAISE(ABORT, 'Stock insuficiente para el producto: ')
+    END;
+END;
+"""
+
+# 003 - Flujo único de inventario para ventas: la transacción de la venta agrega los
+# movimientos y descuenta el stock, así que se elimina el trigger de Pagos (que además
+# duplicaba los movimientos con cada abono). Se normaliza fc_actualizacion de los
+# movimientos de venta que el trigger guardaba con hora.
+MIGRACION_003_LEDGER_VENTAS = """
+DROP TRIGGER IF EXISTS tr_after_venta_completa;
+
+UPDATE Movimientos
+SET fc_actualizacion = date(fc_actualizacion)
+WHERE referencia = 'venta' AND length(fc_actualizacion) > 10;
+"""
+
+# 004 - Origen explícito de los cambios de stock. Todo cambio hecho a partir de Movimientos
+# (triggers y transacción de venta) incrementa version_stock; un cambio de cant_actual que no
+# la incrementa es un ajuste manual y se registra como movimiento de ajuste. Reemplaza la
+# búsqueda de compras de los últimos 5 segundos en Movimientos por una comparación O(1).
+# Las bases creadas con el create_db.py actual ya traen la columna: sólo se agrega si falta.
+MIGRACION_004_VERSION_STOCK = """
+ALTER TABLE Productos_noPreparados ADD COLUMN version_stock INTEGER NOT NULL DEFAULT 0;
+"""
+
+MIGRACION_004_ORIGEN_STOCK = """
+DROP TRIGGER IF EXISTS tr_after_movimiento_insert;
+CREATE TRIGGER tr_after_movimiento_insert
+AFTER INSERT ON Movimientos
+WHEN NEW.referencia = 'compra'
+BEGIN
+    -- Validar que tenga costo_unitario para compras
+    SELECT CASE
+        WHEN NEW.costo_unitario IS NULL
+        THEN RAISE(ABORT, 'Las compras deben especificar costo_unitario')
+    END;
+    
+    -- Actualizar stock solo para productos no preparados
+    UPDATE Productos_noPreparados
+    SET cant_actual = cant_actual + NEW.cant_movida,
+        version_stock = version_stock + 1
+    WHERE cod_producto_noPreparado = NEW.cod_producto;
+END;
+
+DROP TRIGGER IF EXISTS tr_after_movimiento_general_insert;
+CREATE TRIGGER tr_after_movimiento_general_insert
+AFTER INSERT ON Movimientos
+WHEN NEW.referencia NOT IN ('compra', 'venta') -- Compras tienen su propio trigger; las ventas registran movimiento y stock en su transacción
+BEGIN
+    -- Validar que el producto sea no preparado antes de actualizar stock
+    UPDATE Productos_noPreparados
+    SET cant_actual = CASE 
+        WHEN NEW.tipo_movimiento = 'entrada' THEN cant_actual + NEW.cant_movida
+        WHEN NEW.tipo_movimiento = 'salida' THEN cant_actual - NEW.cant_movida
+        ELSE cant_actual
+    END,
+        version_stock = version_stock + 1
+    WHERE cod_producto_noPreparado = NEW.cod_producto;
+    
+    -- Validar que no quede stock negativo para salidas
+    SELECT CASE
+        WHEN NEW.tipo_movimiento = 'salida' 
+        AND EXISTS (
+            SELECT 1 FROM Productos_noPreparados 
+            WHERE cod_producto_noPreparado = NEW.cod_producto 
+            AND cant_actual < 0
+        )
+        THEN RAISE(ABORT, 'Stock insuficiente para el producto: ')
+    END;
+END;
+
+DROP TRIGGER IF EXISTS tr_after_producto_nopreparado_insert;
+CREATE TRIGGER tr_after_producto_nopreparado_insert
+AFTER INSERT ON Productos_noPreparados
+BEGIN
+    -- Verificar que el producto exista en la tabla Productos
+    SELECT CASE
+        WHEN (SELECT COUNT(*) FROM Productos WHERE cod_producto = NEW.cod_producto_noPreparado) = 0
+        THEN RAISE(ABORT, 'El producto no existe en la tabla Productos')
+    END;
+    
+    -- El stock inicial entra por Movimientos: se parte de 0 y el movimiento de ajuste lo aplica
+    UPDATE Productos_noPreparados
+    SET cant_actual = 0,
+        version_stock = version_stock + 1
+    WHERE cod_producto_noPreparado = NEW.cod_producto_noPreparado;
+
+    -- Insertar movimiento de inventario inicial (entrada por ajuste inicial)
+    INSERT INTO Movimientos (
+        cod_producto,
+        referencia,
+        tipo_movimiento,
+        cant_movida,
+        costo_unitario,
+        fc_actualizacion,
+        comentario
+    ) VALUES (
+        NEW.cod_producto_noPreparado,
+        'ajuste',
+        'entrada',
+        NEW.cant_actual,
+        NEW.costo_compra,
+        date('now'),
+        'Registro inicial de producto no preparado'
+    );
+END;
+
+DROP TRIGGER IF EXISTS tr_after_producto_nopreparado_update;
+CREATE TRIGGER tr_after_producto_nopreparado_update
+AFTER UPDATE OF cant_actual ON Productos_noPreparados
+WHEN NEW.cant_actual <> OLD.cant_actual AND NEW.version_stock = OLD.version_stock
+BEGIN
+    -- Cambio directo de cant_actual (ajuste manual): se revierte y se registra como
+    -- movimiento de ajuste, que el trigger general aplica al stock
+    UPDATE Productos_noPreparados
+    SET cant_actual = OLD.cant_actual,
+        version_stock = version_stock + 1
+    WHERE cod_producto_noPreparado = NEW.cod_producto_noPreparado;
+
+    INSERT INTO Movimientos (
+        cod_producto,
+        referencia,
+        tipo_movimiento,
+        cant_movida,
+        costo_unitario,
+        fc_actualizacion,
+        comentario
+    ) VALUES (
+        NEW.cod_producto_noPreparado,
+        'ajuste',
+        CASE WHEN NEW.cant_actual > OLD.cant_actual THEN 'entrada' ELSE 'salida' END,
+        abs(NEW.cant_actual - OLD.cant_actual),
+        NEW.costo_compra,
+        date('now'),
+        'Ajuste de inventario'
+    );
+END;
+"""
+
+# 005 - Índice parcial con los productos no preparados por debajo del stock mínimo
+# (GET /inventario/alertas). Productos_noPreparados ya es el stock materializado.
+MIGRACION_005_STOCK_BAJO = """
+CREATE INDEX IF NOT EXISTS idx_noPreparados_stock_bajo
+ON Productos_noPreparados (cod_producto_noPreparado)
+WHERE cant_actual < cant_min;
+"""
+
+# 006 - Resumen diario de ventas por día × método de pago × tipo de venta × categoría.
+# Lo mantienen los triggers de la migración 009; aquí se crea y se llena con las ventas existentes.
+# Los montos de la venta se reparten entre categorías según el subtotal de sus detalles.
+MIGRACION_006_RESUMEN_VENTAS_DIARIAS = """
+CREATE TABLE IF NOT EXISTS Resumen_Ventas_Diarias (
+  fecha TEXT NOT NULL,                -- YYYY-MM-DD de Ventas.fecha_hora
+  metodo_pago TEXT NOT NULL,          -- método del pago inicial o 'sin_pago'
+  tipo_venta TEXT NOT NULL,
+  id_categoria INTEGER NOT NULL,      -- 0 = sin categoría
+  num_ventas INTEGER NOT NULL DEFAULT 0,
+  unidades INTEGER NOT NULL DEFAULT 0,
+  monto_bs REAL NOT NULL DEFAULT 0,
+  monto_usd REAL NOT NULL DEFAULT 0,
+  PRIMARY KEY (fecha, metodo_pago, tipo_venta, id_categoria)
+);
+
+WITH por_categoria AS (
+    SELECT v.id_venta,
+           substr(v.fecha_hora, 1, 10) AS fecha,
+           COALESCE((SELECT pa.metodo_pago FROM Pagos pa WHERE pa.id_venta = v.id_venta
+                     ORDER BY pa.id_pago LIMIT 1), 'sin_pago') AS metodo_pago,
+           v.tipo AS tipo_venta,
+           COALESCE(p.id_categoria, 0) AS id_categoria,
+           v.monto_total_bs, v.monto_total_usd,
+           SUM(dv.cantidad_producto) AS unidades,
+           SUM(dv.cantidad_producto * dv.precio_unitario) AS subtotal
+    FROM Ventas v
+    JOIN Detalle_Venta dv ON dv.id_venta = v.id_venta
+    JOIN Productos p ON p.cod_producto = dv.cod_producto
+    GROUP BY v.id_venta, COALESCE(p.id_categoria, 0)
+),
+por_venta AS (
+    SELECT id_venta, SUM(subtotal) AS subtotal, SUM(unidades) AS unidades
+    FROM por_categoria GROUP BY id_venta
+),
+proporciones AS (
+    SELECT c.*, CASE WHEN v.subtotal > 0 THEN c.subtotal / v.subtotal
+                     ELSE c.unidades * 1.0 / v.unidades END AS proporcion
+    FROM por_categoria c JOIN por_venta v ON v.id_venta = c.id_venta
+)
+INSERT INTO Resumen_Ventas_Diarias (
+    fecha, metodo_pago, tipo_venta, id_categoria, num_ventas, unidades, monto_bs, monto_usd
+)
+SELECT fecha, metodo_pago, tipo_venta, id_categoria, COUNT(*), SUM(unidades),
+       SUM(monto_total_bs * proporcion), SUM(monto_total_usd * proporcion)
+FROM proporciones
+GROUP BY fecha, metodo_pago, tipo_venta, id_categoria;
+"""
+
+# 007 - Claves de idempotencia de los endpoints de registro de ventas: clave -> respuesta
+# guardada en la misma transacción que la venta. Se consultan por (endpoint, clave) y se
+# purgan por antigüedad (creada_en, segundos epoch).
+MIGRACION_007_IDEMPOTENCIA = """
+CREATE TABLE IF NOT EXISTS Idempotencia (
+  endpoint TEXT NOT NULL,
+  clave TEXT NOT NULL,
+  huella TEXT NOT NULL,               -- sha256 del cuerpo de la petición
+  respuesta TEXT NOT NULL,            -- JSON de la respuesta
+  creada_en REAL NOT NULL,
+  PRIMARY KEY (endpoint, clave)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_idempotencia_creada_en ON Idempotencia (creada_en);
+"""
+
+# 008 - Saldo inicial en el libro de movimientos. Los productos cargados antes de crear los
+# triggers (datos de prueba de insert_db.py o bases antiguas) no tienen el movimiento de
+# "Registro inicial", así que su stock no coincidía con sus movimientos y ledger_check.py
+# --reconstruir lo habría dejado en cero. Se agrega un ajuste de entrada por la diferencia
+# (igual a cant_actual si el producto no tiene movimientos) sin cambiar el stock: el trigger
+# general lo suma y luego se restaura cant_actual con version_stock incrementado.
+MIGRACION_008_SALDO_INICIAL = """
+CREATE TEMP TABLE saldo_inicial AS
+SELECT np.cod_producto_noPreparado AS cod_producto,
+       np.cant_actual AS cant_actual,
+       np.costo_compra AS costo_compra,
+       np.cant_actual - COALESCE(SUM(
+           CASE m.tipo_movimiento
+               WHEN 'entrada' THEN m.cant_movida
+               WHEN 'salida' THEN -m.cant_movida
+               ELSE 0
+           END
+       ), 0) AS apertura,
+       COALESCE(MIN(date(m.fc_actualizacion)), date('now')) AS fecha
+FROM Productos_noPreparados np
+LEFT JOIN Movimientos m ON m.cod_producto = np.cod_producto_noPreparado
+WHERE NOT EXISTS (
+    SELECT 1 FROM Movimientos a
+    WHERE a.cod_producto = np.cod_producto_noPreparado
+      AND a.referencia = 'ajuste'
+      AND a.comentario = 'Registro inicial de producto no preparado'
+)
+GROUP BY np.cod_producto_noPreparado
+HAVING apertura > 0;
+
+INSERT INTO Movimientos (
+    cod_producto, referencia, tipo_movimiento, cant_movida, costo_unitario, fc_actualizacion, comentario
+)
+SELECT cod_producto, 'ajuste', 'entrada', apertura, costo_compra, fecha, 'Registro inicial de producto no preparado'
+FROM saldo_inicial;
+
+UPDATE Productos_noPreparados
+SET cant_actual = (SELECT s.cant_actual FROM saldo_inicial s WHERE s.cod_producto = cod_producto_noPreparado),
+    version_stock = version_stock + 1
+WHERE cod_producto_noPreparado IN (SELECT cod_producto FROM saldo_inicial);
+
+DROP TABLE saldo_inicial;
+"""
+
+# Método del primer pago de la venta v (define su grupo en el resumen) o 'sin_pago'
+METODO_PRIMER_PAGO = (
+    "COALESCE((SELECT pa.metodo_pago FROM Pagos pa WHERE pa.id_venta = v.id_venta "
+    "ORDER BY pa.id_pago LIMIT 1), 'sin_pago')"
+)
+
+
+def aporte_resumen_ventas(ventas: str, signo: int = 1, metodo: str = METODO_PRIMER_PAGO) -> str:
+    """
+    Sentencias que suman (signo 1) o restan (signo -1) al resumen diario el aporte de un conjunto
+    de ventas, con el mismo reparto por categoría que la migración 006. Al restar se eliminan los
+    grupos que quedan sin ventas. No usa WITH porque SQLite no admite CTE dentro de triggers.
+    :param ventas: Lista o subconsulta SQL de los id_venta (p. ej. "OLD.id_venta, NEW.id_venta").
+    :param signo: 1 para sumar, -1 para restar.
+    :param metodo: Expresión SQL del método de pago de la venta v.
+    """
+    # Las ventas sin fecha no tienen día en el resumen
+    filtro = f"v.id_venta IN ({ventas}) AND v.fecha_hora IS NOT NULL"
+    proporcion = "CASE WHEN t.subtotal > 0 THEN c.subtotal / t.subtotal ELSE c.unidades * 1.0 / t.unidades END"
+    sql = f"""
+INSERT INTO Resumen_Ventas_Diarias (
+    fecha, metodo_pago, tipo_venta, id_categoria, num_ventas, unidades, monto_bs, monto_usd
+)
+SELECT c.fecha, c.metodo_pago, c.tipo_venta, c.id_categoria,
+       {signo} * COUNT(*), {signo} * SUM(c.unidades),
+       {signo} * SUM(c.monto_total_bs * {proporcion}),
+       {signo} * SUM(c.monto_total_usd * {proporcion})
+FROM (
+    SELECT v.id_venta, substr(v.fecha_hora, 1, 10) AS fecha, {metodo} AS metodo_pago,
+           v.tipo AS tipo_venta, COALESCE(p.id_categoria, 0) AS id_categoria,
+           v.monto_total_bs, v.monto_total_usd,
+           SUM(dv.cantidad_producto) AS unidades,
+           SUM(dv.cantidad_producto * dv.precio_unitario) AS subtotal
+    FROM Ventas v
+    JOIN Detalle_Venta dv ON dv.id_venta = v.id_venta
+    JOIN Productos p ON p.cod_producto = dv.cod_producto
+    WHERE {filtro}
+    GROUP BY v.id_venta, COALESCE(p.id_categoria, 0)
+) c
+JOIN (
+    SELECT v.id_venta,
+           SUM(dv.cantidad_producto) AS unidades,
+           SUM(dv.cantidad_producto * dv.precio_unitario) AS subtotal
+    FROM Ventas v
+    JOIN Detalle_Venta dv ON dv.id_venta = v.id_venta
+    JOIN Productos p ON p.cod_producto = dv.cod_producto
+    WHERE {filtro}
+    GROUP BY v.id_venta
+) t ON t.id_venta = c.id_venta
+WHERE true
+GROUP BY c.fecha, c.metodo_pago, c.tipo_venta, c.id_categoria
+ON CONFLICT (fecha, metodo_pago, tipo_venta, id_categoria) DO UPDATE SET
+    num_ventas = num_ventas + excluded.num_ventas,
+    unidades = unidades + excluded.unidades,
+    monto_bs = monto_bs + excluded.monto_bs,
+    monto_usd = monto_usd + excluded.monto_usd;
+"""
+    if signo < 0:
+        sql += f"""
+DELETE FROM Resumen_Ventas_Diarias
+WHERE num_ventas <= 0
+  AND fecha IN (SELECT substr(v.fecha_hora, 1, 10) FROM Ventas v WHERE {filtro});
+"""
+    return sql
+
+
+def _trigger_resumen(nombre: str, evento: str, sentencias: str, cuando: str = "") -> str:
+    """CREATE TRIGGER que mantiene el resumen diario al cambiar una venta, sus detalles o sus pagos."""
+    return f"""
+CREATE TRIGGER IF NOT EXISTS {nombre}
+{evento}
+{f'WHEN {cuando}' if cuando else ''}
+BEGIN
+{sentencias}
+END;
+"""
+
+
+# 009 - El resumen diario se mantiene con triggers sobre Ventas, Detalle_Venta y Pagos, así
+# también lo actualizan los PUT/DELETE del CRUD y las cargas masivas, no sólo las transacciones
+# de venta. Cada cambio resta antes el aporte de las ventas afectadas y lo vuelve a sumar después.
+# Se recalcula la tabla completa para corregir lo que hubiera quedado desfasado.
+MIGRACION_009_RESUMEN_TRIGGERS = (
+    "DELETE FROM Resumen_Ventas_Diarias;\n"
+    + aporte_resumen_ventas("SELECT id_venta FROM Ventas")
+    + _trigger_resumen(
+        "tr_resumen_ventas_update_antes",
+        "BEFORE UPDATE OF id_venta, fecha_hora, tipo, monto_total_bs, monto_total_usd ON Ventas",
+        aporte_resumen_ventas("OLD.id_venta", -1)
+    )
+    + _trigger_resumen(
+        "tr_resumen_ventas_update",
+        "AFTER UPDATE OF id_venta, fecha_hora, tipo, monto_total_bs, monto_total_usd ON Ventas",
+        aporte_resumen_ventas("NEW.id_venta")
+    )
+    + _trigger_resumen(
+        "tr_resumen_ventas_delete",
+        "BEFORE DELETE ON Ventas",
+        aporte_resumen_ventas("OLD.id_venta", -1)
+    )
+    # Las ventas registran sus detalles de una vez (executemany): cada línea vuelve a calcular
+    # sólo el aporte de su venta, que recorre los detalles de esa venta por idx_detalle_venta_venta_producto
+    + _trigger_resumen(
+        "tr_resumen_detalle_insert_antes",
+        "BEFORE INSERT ON Detalle_Venta",
+        aporte_resumen_ventas("NEW.id_venta", -1)
+    )
+    + _trigger_resumen(
+        "tr_resumen_detalle_insert",
+        "AFTER INSERT ON Detalle_Venta",
+        aporte_resumen_ventas("NEW.id_venta")
+    )
+    + _trigger_resumen(
+        "tr_resumen_detalle_update_antes",
+        "BEFORE UPDATE OF id_venta, cod_producto, cantidad_producto, precio_unitario ON Detalle_Venta",
+        aporte_resumen_ventas("OLD.id_venta, NEW.id_venta", -1)
+    )
+    + _trigger_resumen(
+        "tr_resumen_detalle_update",
+        "AFTER UPDATE OF id_venta, cod_producto, cantidad_producto, precio_unitario ON Detalle_Venta",
+        aporte_resumen_ventas("OLD.id_venta, NEW.id_venta")
+    )
+    + _trigger_resumen(
+        "tr_resumen_detalle_delete_antes",
+        "BEFORE DELETE ON Detalle_Venta",
+        aporte_resumen_ventas("OLD.id_venta", -1)
+    )
+    + _trigger_resumen(
+        "tr_resumen_detalle_delete",
+        "AFTER DELETE ON Detalle_Venta",
+        aporte_resumen_ventas("OLD.id_venta")
+    )
+    # Sólo el primer pago define el grupo de la venta: los abonos posteriores no cambian el resumen.
+    # El id del pago aún no existe en un BEFORE INSERT, así que se resta como 'sin_pago' después.
+    + _trigger_resumen(
+        "tr_resumen_pago_insert",
+        "AFTER INSERT ON Pagos",
+        aporte_resumen_ventas("NEW.id_venta", -1, "'sin_pago'") + aporte_resumen_ventas("NEW.id_venta"),
+        "NOT EXISTS (SELECT 1 FROM Pagos WHERE id_venta = NEW.id_venta AND id_pago <> NEW.id_pago)"
+    )
+    + _trigger_resumen(
+        "tr_resumen_pago_update_antes",
+        "BEFORE UPDATE OF id_pago, id_venta, metodo_pago ON Pagos",
+        aporte_resumen_ventas("OLD.id_venta, NEW.id_venta", -1)
+    )
+    + _trigger_resumen(
+        "tr_resumen_pago_update",
+        "AFTER UPDATE OF id_pago, id_venta, metodo_pago ON Pagos",
+        aporte_resumen_ventas("OLD.id_venta, NEW.id_venta")
+    )
+    + _trigger_resumen(
+        "tr_resumen_pago_delete_antes",
+        "BEFORE DELETE ON Pagos",
+        aporte_resumen_ventas("OLD.id_venta", -1)
+    )
+    + _trigger_resumen(
+        "tr_resumen_pago_delete",
+        "AFTER DELETE ON Pagos",
+        aporte_resumen_ventas("OLD.id_venta")
+    )
+)
+
+
+def has_column(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    """Indica si una tabla ya tiene la columna."""
+    return any(row[1] == column for row in conn.execute(f"PRAGMA table_info({table})"))
+
+
+def migracion_004_origen_stock(conn: sqlite3.Connection) -> str:
+    """SQL de la migración 004: la columna version_stock (si falta) y los triggers que la usan."""
+    if has_column(conn, 'Productos_noPreparados', 'version_stock'):
+        return MIGRACION_004_ORIGEN_STOCK
+    return MIGRACION_004_VERSION_STOCK + MIGRACION_004_ORIGEN_STOCK
+
+
+# Lista ordenada de migraciones: (versión, nombre, sql). El sql puede ser una función que
+# recibe la conexión y devuelve el script, para migraciones que dependen del esquema existente.
+MIGRATIONS: List[Tuple[int, str, Union[str, Callable[[sqlite3.Connection], str]]]] = [
+    (1, 'indices_busqueda', MIGRACION_001_INDICES),
+    (2, 'descuento_unico_venta', MIGRACION_002_DESCUENTO_VENTA),
+    (3, 'ledger_ventas', MIGRACION_003_LEDGER_VENTAS),
+    (4, 'origen_stock', migracion_004_origen_stock),
+    (5, 'indice_stock_bajo', MIGRACION_005_STOCK_BAJO),
+    (6, 'resumen_ventas_diarias', MIGRACION_006_RESUMEN_VENTAS_DIARIAS),
+    (7, 'idempotencia', MIGRACION_007_IDEMPOTENCIA),
+    (8, 'saldo_inicial_movimientos', MIGRACION_008_SALDO_INICIAL),
+    (9, 'resumen_ventas_triggers', MIGRACION_009_RESUMEN_TRIGGERS),
+]
+
+
+def get_applied_versions(conn: sqlite3.Connection) -> List[int]:
+    """Devuelve las versiones de migración ya aplicadas."""
+    conn.execute(MIGRATIONS_TABLE)
+    return [row[0] for row in conn.execute("SELECT version FROM schema_migrations ORDER BY version")]
+
+
+def run_migrations(db_path: str) -> List[int]:
+    """
+    Aplica en orden las migraciones pendientes, cada una en su propia transacción.
+    :param db_path: Ruta al archivo de la base de datos.
+    :return: Lista de versiones aplicadas en esta ejecución.
+    :raises sqlite3.Error: Si una migración falla (se revierte completa).
+    """
+    conn = sqlite3.connect(db_path)
+    aplicadas = []
+    try:
+        pendientes = set(v for v, _, _ in MIGRATIONS) - set(get_applied_versions(conn))
+        conn.commit()
+        for version, nombre, sql in MIGRATIONS:
+            if version not in pendientes:
+                continue
+            try:
+                script = sql(conn) if callable(sql) else sql
+                conn.executescript(f"BEGIN;\n{script}\n")
+                conn.execute(
+                    "INSERT INTO schema_migrations (version, nombre, aplicada_en) VALUES (?, ?, ?)",
+                    (version, nombre, datetime.now().isoformat())
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                conn.rollback()
+                print(f"[MIGRACIONES] Error aplicando {version:03d}_{nombre}: {e}")
+                raise
+            aplicadas.append(version)
+            print(f"[MIGRACIONES] Aplicada {version:03d}_{nombre}")
+    finally:
+        conn.close()
+    return aplicadas
+
+
+if __name__ == "__main__":
+    from database import db_path
+    print("Aplicando migraciones en:", db_path)
+    aplicadas = run_migrations(db_path)
+    print(f"{len(aplicadas)} migraciones aplicadas." if aplicadas else "La base de datos ya está al día.")
@@ -0,0 +1,299 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from queue import Empty, LifoQueue
+from typing import Callable, Dict, Iterator, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_POOL_SIZE = int(os.getenv('SQLITE_POOL_SIZE', '5'))
+DEFAULT_POOL_TIMEOUT = float(os.getenv('SQLITE_POOL_TIMEOUT', '10'))
+DEFAULT_HEALTH_CHECK_INTERVAL = float(os.getenv('SQLITE_POOL_HEALTH_CHECK', '30'))
+
+
+class PoolTimeoutError(Exception):
+    """Excepción lanzada cuando no hay conexiones libres dentro del tiempo de espera."""
+    def __init__(self, timeout: float, message: str = None):
+        self.timeout = timeout
+        self.message = message or f"No hay conexiones disponibles tras esperar {timeout} segundos"
+        super().__init__(self.message)
+
+
+class _PooledConnection:
+    """Conexión administrada por el pool junto con su marca de último uso."""
+    __slots__ = ('conn', 'last_used')
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.last_used = time.monotonic()
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones SQLite compartido entre hilos.
+
+    Cada hilo recibe una conexión exclusiva mientras la tenga prestada; si el mismo
+    hilo vuelve a pedir una conexión (p. ej. un servicio que llama a otro)
+    recibe la misma, por lo que las llamadas anidadas no consumen cupos extra.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_POOL_TIMEOUT,
+        health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL
+    ):
+        """
+        :param db_path: Ruta al archivo de la base de datos.
+        :param size: Número máximo de conexiones abiertas.
+        :param timeout: Segundos que se espera por una conexión libre.
+        :param health_check_interval: Segundos de inactividad tras los cuales se valida la conexión.
+        """
+        if size < 1:
+            raise ValueError("El tamaño del pool debe ser mayor a 0")
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+
+        self._idle: LifoQueue = LifoQueue()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._created = 0
+        self._closed = False
+        self._on_connect: Optional[Callable[[sqlite3.Connection], None]] = None
+
+        self._checkouts = 0
+        self._in_use = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._timeouts = 0
+        self._health_failures = 0
+
+    def configure(self, on_connect: Callable[[sqlite3.Connection], None]) -> None:
+        """
+        Registra una función que se ejecuta sobre cada conexión nueva (p. ej. PRAGMAs).
+        Las conexiones inactivas ya abiertas se descartan para que se recreen configuradas.
+        """
+        self._on_connect = on_connect
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except Empty:
+                break
+            self._discard(pooled)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre una conexión nueva hacia la base de datos."""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        if self._on_connect is not None:
+            try:
+                self._on_connect(conn)
+            except Exception:
+                conn.close()
+                raise
+        return conn
+
+    def _is_healthy(self, pooled: _PooledConnection) -> bool:
+        """Valida la conexión si estuvo inactiva más del intervalo configurado."""
+        if time.monotonic() - pooled.last_used < self.health_check_interval:
+            return True
+        try:
+            pooled.conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _discard(self, pooled: _PooledConnection) -> None:
+        """Cierra una conexión y libera su cupo en el pool."""
+        try:
+            pooled.conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._created -= 1
+
+    def _acquire(self) -> _PooledConnection:
+        """Obtiene una conexión libre, creando una nueva si queda cupo."""
+        if self._closed:
+            raise RuntimeError("El pool de conexiones está cerrado")
+
+        start = time.monotonic()
+        deadline = start + self.timeout
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except Empty:
+                pooled = None
+                with self._lock:
+                    if self._created < self.size:
+                        self._created += 1
+                        create = True
+                    else:
+                        create = False
+                if create:
+                    try:
+                        pooled = _PooledConnection(self._connect())
+                    except Exception:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        with self._lock:
+                            self._timeouts += 1
+                        raise PoolTimeoutError(self.timeout)
+                    try:
+                        pooled = self._idle.get(timeout=remaining)
+                    except Empty:
+                        continue
+
+            if not self._is_healthy(pooled):
+                with self._lock:
+                    self._health_failures += 1
+                self._discard(pooled)
+                continue
+
+            waited = time.monotonic() - start
+            with self._lock:
+                self._checkouts += 1
+                self._in_use += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+            return pooled
+
+    def _release(self, pooled: _PooledConnection, failed: bool) -> None:
+        """Devuelve la conexión al pool dejando cerrada cualquier transacción pendiente."""
+        conn = pooled.conn
+        try:
+            if conn.in_transaction:
+                if failed:
+                    conn.rollback()
+                else:
+                    conn.commit()
+            conn.row_factory = None
+        except sqlite3.Error:
+            with self._lock:
+                self._in_use -= 1
+            self._discard(pooled)
+            return
+
+        pooled.last_used = time.monotonic()
+        with self._lock:
+            self._in_use -= 1
+        if self._closed:
+            self._discard(pooled)
+        else:
+            self._idle.put(pooled)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Presta una conexión del pool.
+        Al salir del bloque se hace commit (o rollback si hubo excepción) y la conexión vuelve al pool.
+        """
+        held = getattr(self._local, 'held', None)
+        if held is not None:
+            # Llamada anidada en el mismo hilo: el bloque externo decide commit/rollback
+            yield held.conn
+            return
+
+        pooled = self._acquire()
+        self._local.held = pooled
+        failed = False
+        try:
+            yield pooled.conn
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self._local.held = None
+            self._release(pooled, failed)
+
+    @contextmanager
+    def bound(self, conn: sqlite3.Connection) -> Iterator[None]:
+        """
+        Hace que connection() en el hilo actual entregue conn sin hacer commit ni rollback
+        al salir: quien es dueño de conn controla la transacción (lo usa el escritor único).
+        """
+        previous = getattr(self._local, 'held', None)
+        self._local.held = _PooledConnection(conn)
+        try:
+            yield
+        finally:
+            self._local.held = previous
+
+    def dedicated_connection(self) -> sqlite3.Connection:
+        """
+        Abre una conexión fuera del pool (con la misma configuración) para operaciones
+        largas, como exportaciones en streaming, que no deben ocupar un cupo del pool
+        ni quedar ligadas a un hilo. Quien la pide es responsable de cerrarla.
+        """
+        return self._connect()
+
+    def close(self) -> None:
+        """Cierra todas las conexiones inactivas; las prestadas se cierran al devolverse."""
+        self._closed = True
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except Empty:
+                break
+            self._discard(pooled)
+
+    def stats(self) -> Dict[str, float]:
+        """Devuelve las métricas de uso del pool."""
+        with self._lock:
+            checkouts = self._checkouts
+            return {
+                "db_path": self.db_path,
+                "size": self.size,
+                "open_connections": self._created,
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+                "checkouts": checkouts,
+                "timeouts": self._timeouts,
+                "health_check_failures": self._health_failures,
+                "wait_avg_ms": round(self._wait_total / checkouts * 1000, 3) if checkouts else 0.0,
+                "wait_max_ms": round(self._wait_max * 1000, 3),
+            }
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str) -> ConnectionPool:
+    """
+    Obtiene el pool compartido para una base de datos, creándolo la primera vez.
+    Todos los servicios que usan la misma ruta comparten el mismo pool.
+    """
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(key)
+            _pools[key] = pool
+        return pool
+
+
+def all_pool_stats() -> list:
+    """Métricas de todos los pools creados en el proceso."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.stats() for pool in pools]
+
+
+def close_all_pools() -> None:
+    """Cierra todos los pools (se usa al apagar la aplicación)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
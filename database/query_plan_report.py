@@ -0,0 +1,136 @@
+# Reporte de EXPLAIN QUERY PLAN para las consultas que ejecutan los servicios.
+# Marca las consultas que siguen recorriendo una tabla completa (SCAN sin índice).
+import sqlite3
+import sys
+from typing import Any, Dict, List, Tuple
+
+# (descripción, consulta, parámetros de ejemplo)
+SERVICE_QUERIES: List[Tuple[str, str, tuple]] = [
+    ("VentaDetalleService: pago de una venta",
+     "SELECT * FROM Pagos WHERE id_venta = ?", (1,)),
+    ("VentaDetalleService: cliente de una venta",
+     "SELECT * FROM Clientes WHERE ci_cliente = ?", ('12345678',)),
+    ("VentaDetalleService: detalle de venta",
+     "SELECT * FROM vista_detalle_venta_completo WHERE id_venta = ?", (1,)),
+    ("VentaDetalleService: productos de una venta",
+     "SELECT * FROM vista_detalle_productos_venta WHERE id_venta = ?", (1,)),
+    ("Detalle_Venta por producto",
+     "SELECT * FROM Detalle_Venta WHERE cod_producto = ?", ('PROD001',)),
+    ("VentaDetalleService: listado de ventas",
+     "SELECT v.id_venta, (SELECT SUM(dv.cantidad_producto) FROM Detalle_Venta dv WHERE dv.id_venta = v.id_venta) "
+     "FROM Ventas v WHERE v.fecha_hora >= ? AND v.fecha_hora < ? AND (v.fecha_hora, v.id_venta) < (?, ?) "
+     "ORDER BY v.fecha_hora DESC, v.id_venta DESC LIMIT ?",
+     ('2025-01-01', '2025-02-01', '2025-01-15', 10, 100)),
+    ("VentaDetalleService: ventas por producto",
+     "SELECT d.* FROM vista_detalle_productos_venta d JOIN Ventas v ON v.id_venta = d.id_venta "
+     "WHERE d.cod_producto = ? AND v.fecha_hora >= ? ORDER BY v.fecha_hora DESC, v.id_venta DESC LIMIT ?",
+     ('PROD001', '2025-01-01', 100)),
+    ("CompraService: productos de una compra",
+     "SELECT * FROM vista_detalle_compras WHERE id_compra = ?", (1,)),
+    ("CompraService: listado de compras",
+     "SELECT * FROM Compras WHERE fecha >= ? ORDER BY fecha DESC LIMIT ?", ('2025-01-01', 100)),
+    ("BaseService.get_data_from_date: pagos",
+     "SELECT * FROM Pagos WHERE fecha_pago >= ? AND fecha_pago <= ? ORDER BY fecha_pago DESC",
+     ('2025-01-01', '2025-12-31')),
+    ("BaseService.get_data_from_date: tasas de cambio",
+     "SELECT * FROM TasasCambio WHERE fecha >= ? AND fecha <= ? ORDER BY fecha DESC",
+     ('2025-01-01', '2025-12-31')),
+    ("BaseService.get_last_record: última tasa",
+     "SELECT * FROM TasasCambio ORDER BY id_tasa DESC LIMIT 1", ()),
+    ("InventarioService: alertas de stock bajo",
+     "SELECT np.cod_producto_noPreparado, p.nombre FROM Productos_noPreparados np "
+     "JOIN Productos p ON p.cod_producto = np.cod_producto_noPreparado WHERE np.cant_actual < np.cant_min",
+     ()),
+    ("ReportesService: ventas diarias en un rango",
+     "SELECT r.fecha, SUM(r.monto_bs) FROM Resumen_Ventas_Diarias r "
+     "LEFT JOIN categoria_productos c ON c.id_categoria = r.id_categoria "
+     "WHERE r.fecha >= ? AND r.fecha < ? GROUP BY 1",
+     ('2025-01-01', '2025-02-01')),
+    ("Transacción de venta: detalles con categoría para el resumen diario",
+     "SELECT p.id_categoria, SUM(dv.cantidad_producto) FROM Ventas v "
+     "JOIN Detalle_Venta dv ON dv.id_venta = v.id_venta JOIN Productos p ON p.cod_producto = dv.cod_producto "
+     "WHERE v.id_venta = ? GROUP BY p.id_categoria",
+     (1,)),
+    ("Triggers / ventas: stock de un producto no preparado",
+     "SELECT cant_actual, version_stock FROM Productos_noPreparados WHERE cod_producto_noPreparado = ?",
+     ('PROD001',)),
+]
+
+# Consultas cuyo SCAN es aceptable: recorren en orden de rowid y se detienen con LIMIT
+ALLOWED_SCANS = {
+    "BaseService.get_last_record: última tasa",
+}
+
+
+def explain(conn: sqlite3.Connection, query: str, params: tuple = ()) -> List[str]:
+    """Devuelve las líneas de detalle de EXPLAIN QUERY PLAN para una consulta."""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+
+
+def _subqueries(plan: List[str]) -> set:
+    """Nombres de subconsultas/vistas materializadas en el plan (no son tablas reales)."""
+    nombres = set()
+    for detail in plan:
+        for prefijo in ("CO-ROUTINE ", "MATERIALIZE "):
+            if detail.startswith(prefijo):
+                nombres.add(detail[len(prefijo):].strip())
+    return nombres
+
+
+def is_full_scan(detail: str, subqueries: set = frozenset()) -> bool:
+    """Indica si una línea del plan es un recorrido completo de tabla sin índice."""
+    if not detail.startswith("SCAN ") or "USING" in detail:
+        return False
+    objetivo = detail[len("SCAN "):].split(" ")[0]
+    return objetivo != "CONSTANT" and objetivo not in subqueries
+
+
+def build_report(db_path: str) -> List[Dict[str, Any]]:
+    """
+    Ejecuta EXPLAIN QUERY PLAN sobre cada consulta del catálogo.
+    :return: Lista con la descripción, el plan y los recorridos completos detectados.
+    """
+    reporte = []
+    with sqlite3.connect(db_path) as conn:
+        for descripcion, query, params in SERVICE_QUERIES:
+            try:
+                plan = explain(conn, query, params)
+            except sqlite3.Error as e:
+                reporte.append({"descripcion": descripcion, "plan": [], "full_scans": [], "error": str(e)})
+                continue
+            subqueries = _subqueries(plan)
+            full_scans = [d for d in plan if is_full_scan(d, subqueries)]
+            reporte.append({
+                "descripcion": descripcion,
+                "plan": plan,
+                "full_scans": [] if descripcion in ALLOWED_SCANS else full_scans,
+                "error": None,
+            })
+    return reporte
+
+
+def print_report(reporte: List[Dict[str, Any]]) -> int:
+    """Imprime el reporte y devuelve la cantidad de consultas con recorridos completos."""
+    marcadas = 0
+    for item in reporte:
+        if item["error"]:
+            estado = "ERROR"
+        elif item["full_scans"]:
+            estado = "SCAN "
+            marcadas += 1
+        else:
+            estado = "OK   "
+        print(f"[{estado}] {item['descripcion']}")
+        for detalle in item["plan"]:
+            marca = "  <-- recorrido completo" if detalle in item["full_scans"] else ""
+            print(f"          {detalle}{marca}")
+        if item["error"]:
+            print(f"          {item['error']}")
+    print("=" * 60)
+    print(f"{marcadas} de {len(reporte)} consultas recorren tablas completas.")
+    return marcadas
+
+
+if __name__ == "__main__":
+    from database import db_path
+    sys.exit(1 if print_report(build_report(db_path)) else 0)
@@ -0,0 +1,133 @@
+# Verificación del resumen diario de ventas: Resumen_Ventas_Diarias debe coincidir con los
+# totales calculados desde las ventas con fecha, sus detalles y pagos (los triggers de la migración 009 lo
+# mantienen al día). Con --reconstruir vuelve a calcular la tabla completa desde las ventas.
+import sqlite3
+import sys
+from typing import Any, Dict, List, Tuple
+
+REBUILD_LOCK_TIMEOUT = 30      # segundos esperando que el backend libere el bloqueo de escritura
+TOLERANCIA_MONTO = 0.005       # diferencia de montos atribuible al redondeo de las sumas
+
+# Totales por día × método del primer pago × tipo de venta × categoría, con los montos de cada
+# venta repartidos entre sus categorías según el subtotal de los detalles (como la migración 006)
+RESUMEN_CALCULADO_QUERY = """
+WITH por_categoria AS (
+    SELECT v.id_venta,
+           substr(v.fecha_hora, 1, 10) AS fecha,
+           COALESCE((SELECT pa.metodo_pago FROM Pagos pa WHERE pa.id_venta = v.id_venta
+                     ORDER BY pa.id_pago LIMIT 1), 'sin_pago') AS metodo_pago,
+           v.tipo AS tipo_venta,
+           COALESCE(p.id_categoria, 0) AS id_categoria,
+           v.monto_total_bs, v.monto_total_usd,
+           SUM(dv.cantidad_producto) AS unidades,
+           SUM(dv.cantidad_producto * dv.precio_unitario) AS subtotal
+    FROM Ventas v
+    JOIN Detalle_Venta dv ON dv.id_venta = v.id_venta
+    JOIN Productos p ON p.cod_producto = dv.cod_producto
+    WHERE v.fecha_hora IS NOT NULL
+    GROUP BY v.id_venta, COALESCE(p.id_categoria, 0)
+),
+por_venta AS (
+    SELECT id_venta, SUM(subtotal) AS subtotal, SUM(unidades) AS unidades
+    FROM por_categoria GROUP BY id_venta
+),
+proporciones AS (
+    SELECT c.*, CASE WHEN v.subtotal > 0 THEN c.subtotal / v.subtotal
+                     ELSE c.unidades * 1.0 / v.unidades END AS proporcion
+    FROM por_categoria c JOIN por_venta v ON v.id_venta = c.id_venta
+)
+SELECT fecha, metodo_pago, tipo_venta, id_categoria, COUNT(*) AS num_ventas, SUM(unidades) AS unidades,
+       SUM(monto_total_bs * proporcion) AS monto_bs, SUM(monto_total_usd * proporcion) AS monto_usd
+FROM proporciones
+GROUP BY fecha, metodo_pago, tipo_venta, id_categoria
+"""
+
+RESUMEN_GUARDADO_QUERY = """
+SELECT fecha, metodo_pago, tipo_venta, id_categoria, num_ventas, unidades, monto_bs, monto_usd
+FROM Resumen_Ventas_Diarias
+"""
+
+Clave = Tuple[str, str, str, int]
+
+
+def _por_clave(filas) -> Dict[Clave, Tuple[int, int, float, float]]:
+    return {tuple(fila[:4]): tuple(fila[4:]) for fila in filas}
+
+
+def _read_drift(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    """Grupos del resumen cuyos totales no coinciden con los calculados desde las ventas, leídos en conn."""
+    guardado = _por_clave(conn.execute(RESUMEN_GUARDADO_QUERY).fetchall())
+    calculado = _por_clave(conn.execute(RESUMEN_CALCULADO_QUERY).fetchall())
+    descuadres = []
+    for clave in sorted(set(guardado) | set(calculado), key=str):
+        actual = guardado.get(clave, (0, 0, 0.0, 0.0))
+        esperado = calculado.get(clave, (0, 0, 0.0, 0.0))
+        if actual[:2] != esperado[:2] or any(
+            abs(a - e) > TOLERANCIA_MONTO for a, e in zip(actual[2:], esperado[2:])
+        ):
+            descuadres.append({
+                "fecha": clave[0], "metodo_pago": clave[1], "tipo_venta": clave[2], "id_categoria": clave[3],
+                "guardado": actual, "calculado": esperado,
+            })
+    return descuadres
+
+
+def find_drift(db_path: str) -> List[Dict[str, Any]]:
+    """
+    Recalcula el resumen diario desde las ventas y lo compara con Resumen_Ventas_Diarias.
+    :param db_path: Ruta al archivo de la base de datos.
+    :return: Grupos (día, método, tipo, categoría) con totales distintos.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        return _read_drift(conn)
+    finally:
+        conn.close()
+
+
+def rebuild_resumen(db_path: str) -> List[Dict[str, Any]]:
+    """
+    Vuelve a calcular Resumen_Ventas_Diarias completa desde Ventas, Detalle_Venta y Pagos,
+    en una transacción BEGIN IMMEDIATE para que ninguna venta se confirme a mitad del cálculo.
+    :param db_path: Ruta al archivo de la base de datos.
+    :return: Grupos que estaban descuadrados (con sus valores previos).
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None, timeout=REBUILD_LOCK_TIMEOUT)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            descuadres = _read_drift(conn)
+            conn.execute("DELETE FROM Resumen_Ventas_Diarias")
+            conn.execute(
+                "INSERT INTO Resumen_Ventas_Diarias (fecha, metodo_pago, tipo_venta, id_categoria, "
+                "num_ventas, unidades, monto_bs, monto_usd) " + RESUMEN_CALCULADO_QUERY
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+    return descuadres
+
+
+def print_report(descuadres: List[Dict[str, Any]]) -> int:
+    """Imprime los grupos descuadrados y devuelve cuántos son."""
+    for item in descuadres:
+        print(
+            f"[DESCUADRE] {item['fecha']} {item['metodo_pago']} {item['tipo_venta']} "
+            f"categoría {item['id_categoria']}: guardado={item['guardado']} calculado={item['calculado']}"
+        )
+    print("=" * 60)
+    print(f"{len(descuadres)} grupos del resumen diario distintos a las ventas.")
+    return len(descuadres)
+
+
+if __name__ == "__main__":
+    from database import db_path
+    if "--reconstruir" in sys.argv[1:]:
+        corregidos = rebuild_resumen(db_path)
+        print_report(corregidos)
+        print("Resumen diario reconstruido desde las ventas.")
+        sys.exit(0)
+    sys.exit(1 if print_report(find_drift(db_path)) else 0)
@@ -15,7 +15,8 @@ BEGIN
     
     -- Actualizar stock solo para productos no preparados
     UPDATE Productos_noPreparados
-    SET cant_actual = cant_actual + NEW.cant_movida
+    SET cant_actual = cant_actual + NEW.cant_movida,
+        version_stock = version_stock + 1
     WHERE cod_producto_noPreparado = NEW.cod_producto;
 END;
 """
@@ -31,6 +32,12 @@ BEGIN
         THEN RAISE(ABORT, 'El producto no existe en la tabla Productos')
     END;
     
+    -- El stock inicial entra por Movimientos: se parte de 0 y el movimiento de ajuste lo aplica
+    UPDATE Productos_noPreparados
+    SET cant_actual = 0,
+        version_stock = version_stock + 1
+    WHERE cod_producto_noPreparado = NEW.cod_producto_noPreparado;
+
     -- Insertar movimiento de inventario inicial (entrada por ajuste inicial)
     INSERT INTO Movimientos (
         cod_producto,
@@ -52,20 +59,20 @@ BEGIN
 END;
 """
 
-#actualiza Productos_noPreparados si detecta un cambio en la cantidad actual
+#registra como movimiento de ajuste cualquier cambio directo de la cantidad actual.
+#Los cambios hechos por movimientos incrementan version_stock, así el trigger los distingue sin consultar Movimientos
 ACTUALIZAR_NOPREPARADO_TRIGGER = """
 CREATE TRIGGER IF NOT EXISTS tr_after_producto_nopreparado_update
 AFTER UPDATE OF cant_actual ON Productos_noPreparados
-WHEN NEW.cant_actual <> OLD.cant_actual
+WHEN NEW.cant_actual <> OLD.cant_actual AND NEW.version_stock = OLD.version_stock
 BEGIN
-    SELECT CASE WHEN EXISTS (
-        SELECT 1 FROM Movimientos 
-        WHERE cod_producto = NEW.cod_producto_noPreparado 
-          AND referencia = 'compra' 
-          AND fc_actualizacion >= datetime('now', '-5 seconds')
-    ) THEN RAISE(IGNORE) END;
+    -- Cambio directo de cant_actual (ajuste manual): se revierte y se registra como
+    -- movimiento de ajuste, que el trigger general aplica al stock
+    UPDATE Productos_noPreparados
+    SET cant_actual = OLD.cant_actual,
+        version_stock = version_stock + 1
+    WHERE cod_producto_noPreparado = NEW.cod_producto_noPreparado;
 
-    
     INSERT INTO Movimientos (
         cod_producto,
         referencia,
@@ -86,50 +93,11 @@ BEGIN
 END;
 """
 
-VENTA_COMPLETA_TRIGGER = """
--- Trigger para actualizar inventario después de venta
-CREATE TRIGGER IF NOT EXISTS tr_after_venta_completa
-AFTER INSERT ON Pagos
-WHEN (SELECT COUNT(*) FROM Ventas WHERE id_venta = NEW.id_venta) > 0
-BEGIN
-    -- Registrar movimientos de salida por cada producto vendido
-    INSERT INTO Movimientos (
-        cod_producto, 
-        referencia, 
-        tipo_movimiento, 
-        cant_movida, 
-        fc_actualizacion,
-        comentario
-    )
-    SELECT 
-        dv.cod_producto,
-        'venta',
-        'salida',
-        dv.cantidad_producto,
-        datetime('now'),
-        'Venta #' || NEW.id_venta
-    FROM Detalle_Venta dv
-    WHERE dv.id_venta = NEW.id_venta;
-    
-    -- Actualizar stock de productos no preparados
-    UPDATE Productos_noPreparados
-    SET cant_actual = cant_actual - (
-        SELECT SUM(dv.cantidad_producto)
-        FROM Detalle_Venta dv
-        WHERE dv.cod_producto = Productos_noPreparados.cod_producto_noPreparado
-        AND dv.id_venta = NEW.id_venta
-    )
-    WHERE cod_producto_noPreparado IN (
-        SELECT cod_producto FROM Detalle_Venta WHERE id_venta = NEW.id_venta
-    );
-END;
-"""
-
-#Se activa después de cualquier INSERT en la tabla Movimientos, excepto para compras, Actualiza el stock en Productos_noPreparados
+#Se activa después de cualquier INSERT en la tabla Movimientos, excepto para compras y ventas, Actualiza el stock en Productos_noPreparados
 MOVIMIENTO_GENERAL_TRIGGER = """
 CREATE TRIGGER IF NOT EXISTS tr_after_movimiento_general_insert
 AFTER INSERT ON Movimientos
-WHEN NEW.referencia NOT IN ('compra') -- Excluir compras porque ya tienen su propio trigger
+WHEN NEW.referencia NOT IN ('compra', 'venta') -- Compras tienen su propio trigger; las ventas registran movimiento y stock en su transacción
 BEGIN
     -- Validar que el producto sea no preparado antes de actualizar stock
     UPDATE Productos_noPreparados
@@ -137,12 +105,9 @@ BEGIN
         WHEN NEW.tipo_movimiento = 'entrada' THEN cant_actual + NEW.cant_movida
         WHEN NEW.tipo_movimiento = 'salida' THEN cant_actual - NEW.cant_movida
         ELSE cant_actual
-    END
-    WHERE cod_producto_noPreparado = NEW.cod_producto
-    AND EXISTS (
-        SELECT 1 FROM Productos_noPreparados 
-        WHERE cod_producto_noPreparado = NEW.cod_producto
-    );
+    END,
+        version_stock = version_stock + 1
+    WHERE cod_producto_noPreparado = NEW.cod_producto;
     
     -- Validar que no quede stock negativo para salidas
     SELECT CASE
@@ -157,10 +122,11 @@ BEGIN
 END;
 """
 
+# Los triggers usan la columna version_stock de Productos_noPreparados (create_db.py; en bases antiguas la agrega la migración 004)
 ALL_TRIGGERS = [
     MOVIMIENTO_COMPRA_TRIGGER_BEFORE,
     INGRESAR_NOPREPARADO_TRIGGER,
-    VENTA_COMPLETA_TRIGGER,
+    ACTUALIZAR_NOPREPARADO_TRIGGER,
     MOVIMIENTO_GENERAL_TRIGGER,
 ]
 
@@ -0,0 +1,285 @@
+import functools
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from queue import Empty, Queue
+from typing import Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from database.pool import ConnectionPool, get_pool
+
+load_dotenv()
+
+DEFAULT_WRITER_MAX_BATCH = int(os.getenv('SQLITE_WRITER_MAX_BATCH', '50'))          # operaciones por transacción
+DEFAULT_WRITER_BATCH_WINDOW = float(os.getenv('SQLITE_WRITER_BATCH_WINDOW_MS', '2')) / 1000
+DEFAULT_WRITER_TIMEOUT = float(os.getenv('SQLITE_WRITER_TIMEOUT', '30'))            # segundos esperando turno
+LATENCY_SAMPLES = 1000
+
+
+class WriterTimeoutError(Exception):
+    """Excepción lanzada cuando una escritura no obtuvo turno dentro del tiempo de espera."""
+    def __init__(self, timeout: float, message: str = None):
+        self.timeout = timeout
+        self.message = message or f"La escritura no se ejecutó tras esperar {timeout} segundos en la cola"
+        super().__init__(self.message)
+
+
+class _Job:
+    """Operación de escritura encolada junto con el futuro donde se entrega su resultado."""
+    __slots__ = ('fn', 'args', 'kwargs', 'future')
+
+    def __init__(self, fn: Callable, args: tuple, kwargs: dict):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future: Future = Future()
+
+
+class DBWriter:
+    """
+    Escritor único de una base de datos.
+
+    SQLite admite un solo escritor a la vez, así que todas las operaciones que modifican
+    datos se encolan y las ejecuta un único hilo con su propia conexión. Las operaciones
+    que llegan juntas se agrupan en una sola transacción (group commit): cada una corre
+    dentro de su SAVEPOINT, de modo que si falla sólo se deshace lo suyo, y el lote se
+    confirma con un único COMMIT.
+
+    Mientras una operación se ejecuta, pool.connection() en el hilo del escritor entrega
+    la conexión del escritor, por lo que el código existente de los servicios funciona sin
+    cambios. Las lecturas siguen usando las conexiones del pool.
+    """
+
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        max_batch: int = DEFAULT_WRITER_MAX_BATCH,
+        batch_window: float = DEFAULT_WRITER_BATCH_WINDOW,
+        timeout: float = DEFAULT_WRITER_TIMEOUT
+    ):
+        """
+        :param pool: Pool de la base de datos (configura la conexión del escritor y se enlaza a ella).
+        :param max_batch: Operaciones máximas confirmadas en un mismo COMMIT.
+        :param batch_window: Segundos que se espera por más operaciones antes de confirmar un lote.
+        :param timeout: Segundos que una operación espera su turno antes de fallar.
+        """
+        if max_batch < 1:
+            raise ValueError("El lote del escritor debe admitir al menos una operación")
+        self.pool = pool
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.timeout = timeout
+
+        self._queue: Queue = Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._conn: Optional[sqlite3.Connection] = None
+
+        self._batches = 0
+        self._completed = 0
+        self._failed = 0
+        self._failed_commits = 0
+        self._timeouts = 0
+        self._max_batch_seen = 0
+        self._commit_latencies = deque(maxlen=LATENCY_SAMPLES)
+
+    def _start(self) -> None:
+        """Arranca el hilo del escritor si no está corriendo."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name=f"sqlite-writer:{os.path.basename(self.pool.db_path)}", daemon=True
+                )
+                self._thread.start()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Ejecuta fn(*args, **kwargs) en el hilo del escritor y espera su resultado.
+        Si se llama desde el propio escritor (operación anidada) se ejecuta directamente
+        dentro de la transacción en curso.
+        :raises WriterTimeoutError: Si la operación no empezó dentro del tiempo de espera.
+        """
+        if threading.current_thread() is self._thread:
+            return fn(*args, **kwargs)
+
+        self._start()
+        job = _Job(fn, args, kwargs)
+        self._queue.put(job)
+        try:
+            return job.future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            if job.future.cancel():
+                with self._lock:
+                    self._timeouts += 1
+                raise WriterTimeoutError(self.timeout)
+            # Ya se está ejecutando: se espera a que termine
+            return job.future.result()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Conexión propia del escritor, en modo autocommit para controlar BEGIN/COMMIT explícitamente."""
+        if self._conn is None:
+            self._conn = self.pool.dedicated_connection()
+            self._conn.isolation_level = None
+        return self._conn
+
+    def _next_batch(self, first: _Job) -> List[Optional[_Job]]:
+        """Reúne las operaciones que llegan dentro de la ventana del lote."""
+        batch = [first]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                job = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except Empty:
+                break
+            batch.append(job)
+            if job is None:
+                break
+        return batch
+
+    def _run(self) -> None:
+        """Bucle del hilo escritor: toma lotes de la cola y los confirma."""
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch = self._next_batch(first)
+            stop = batch[-1] is None
+            jobs = [job for job in batch if job is not None and job.future.set_running_or_notify_cancel()]
+            if jobs:
+                self._execute_batch(jobs)
+            if stop:
+                break
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _execute_batch(self, jobs: List[_Job]) -> None:
+        """Ejecuta un lote en una transacción, con un SAVEPOINT por operación y un único COMMIT."""
+        conn = self._connection()
+        done = []       # (job, resultado)
+        errors = []     # (job, excepción)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            with self.pool.bound(conn):
+                for job in jobs:
+                    conn.execute("SAVEPOINT escritura")
+                    try:
+                        result = job.fn(*job.args, **job.kwargs)
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO escritura")
+                        conn.execute("RELEASE escritura")
+                        errors.append((job, e))
+                    else:
+                        conn.execute("RELEASE escritura")
+                        done.append((job, result))
+            inicio = time.perf_counter()
+            conn.execute("COMMIT")
+            commit_latency = time.perf_counter() - inicio
+        except sqlite3.Error as e:
+            # Falló el BEGIN, un SAVEPOINT o el COMMIT: se descarta el lote completo
+            if conn.in_transaction:
+                try:
+                    conn.execute("ROLLBACK")
+                except sqlite3.Error:
+                    conn.close()
+                    self._conn = None
+            with self._lock:
+                self._batches += 1
+                self._failed += len(jobs)
+                self._failed_commits += 1
+            job_errors = dict(errors)
+            for job in jobs:
+                job.future.set_exception(job_errors.get(job, e))
+            return
+
+        with self._lock:
+            self._batches += 1
+            self._completed += len(done)
+            self._failed += len(errors)
+            self._max_batch_seen = max(self._max_batch_seen, len(jobs))
+            self._commit_latencies.append(commit_latency)
+        for job, result in done:
+            job.future.set_result(result)
+        for job, error in errors:
+            job.future.set_exception(error)
+
+    def close(self) -> None:
+        """Termina las operaciones encoladas y detiene el hilo del escritor."""
+        with self._lock:
+            thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join()
+
+    def stats(self) -> Dict[str, Any]:
+        """Métricas del escritor: profundidad de la cola, lotes y latencia de los COMMIT."""
+        with self._lock:
+            latencias = sorted(self._commit_latencies)
+            batches = self._batches
+            stats = {
+                "db_path": self.pool.db_path,
+                "queue_depth": self._queue.qsize(),
+                "batches": batches,
+                "completed": self._completed,
+                "failed": self._failed,
+                "failed_commits": self._failed_commits,
+                "timeouts": self._timeouts,
+                "avg_batch_size": round((self._completed + self._failed) / batches, 2) if batches else 0.0,
+                "max_batch_size": self._max_batch_seen,
+            }
+        for nombre, percentil in (("commit_p50_ms", 0.50), ("commit_p95_ms", 0.95), ("commit_p99_ms", 0.99)):
+            stats[nombre] = (
+                round(latencias[min(len(latencias) - 1, int(len(latencias) * percentil))] * 1000, 3)
+                if latencias else 0.0
+            )
+        return stats
+
+
+_writers: Dict[str, DBWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(db_path: str) -> DBWriter:
+    """
+    Obtiene el escritor único de una base de datos, creándolo la primera vez.
+    Comparte la clave con get_pool, así escritor y pool apuntan al mismo archivo.
+    """
+    key = os.path.abspath(db_path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = DBWriter(get_pool(key))
+            _writers[key] = writer
+        return writer
+
+
+def write_method(method: Callable) -> Callable:
+    """
+    Decorador para métodos de servicio que modifican datos: la llamada se ejecuta
+    en el escritor único de la base de datos del servicio (self.db_path).
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        return get_writer(self.db_path).submit(method, self, *args, **kwargs)
+    return wrapper
+
+
+def all_writer_stats() -> list:
+    """Métricas de todos los escritores creados en el proceso."""
+    with _writers_lock:
+        writers = list(_writers.values())
+    return [writer.stats() for writer in writers]
+
+
+def close_all_writers() -> None:
+    """Detiene todos los escritores (se usa al apagar la aplicación, antes de cerrar los pools)."""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
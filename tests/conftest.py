@@ -0,0 +1,104 @@
+# Configuración común de las pruebas: una base de datos temporal creada con los scripts de
+# database/ (en el orden del README) y la app levantada con TestClient sobre esa base.
+import itertools
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+import pytest
+import pytz
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_DIR = tempfile.mkdtemp(prefix="2ms-pruebas-")
+DB_PATH = os.path.join(DB_DIR, "pruebas.db")
+SCRIPTS_DB = ("create_db.py", "insert_db.py", "triggers_db.py", "views_db.py")
+
+# Antes de importar el backend: database.database lee SQLITE_DB al importarse
+os.environ["SQLITE_DB"] = DB_PATH
+# main.py abre tags_metadata.json y monta public/ con rutas relativas a la raíz del repositorio
+os.chdir(RAIZ)
+
+for script in SCRIPTS_DB:
+    subprocess.run([sys.executable, os.path.join(RAIZ, "database", script)], check=True, capture_output=True)
+
+# Una tasa de hoy (con el valor de la última): así la app no busca la tasa en PyDolarVE al iniciar
+with sqlite3.connect(DB_PATH) as _conn:
+    _conn.execute(
+        """INSERT INTO TasasCambio (fecha, valor_usd_bs, origen)
+           SELECT ?, valor_usd_bs, 'BCV' FROM TasasCambio ORDER BY id_tasa DESC LIMIT 1""",
+        (datetime.now(pytz.timezone("America/Caracas")).replace(tzinfo=None).isoformat(),)
+    )
+_conn.close()
+
+_codigos = itertools.count(1)
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(DB_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def client():
+    """TestClient de la app (el lifespan aplica las migraciones y configura el pool)."""
+    from fastapi.testclient import TestClient
+    from backend.main import app
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def db_path(client) -> str:
+    """Ruta de la base de datos de pruebas, ya migrada."""
+    return DB_PATH
+
+
+@pytest.fixture
+def conn(db_path):
+    """Conexión directa a la base de datos de pruebas para preparar datos y verificar resultados."""
+    conexion = sqlite3.connect(db_path, timeout=10)
+    yield conexion
+    conexion.close()
+
+
+@pytest.fixture
+def nuevo_producto(conn):
+    """
+    Crea un producto no preparado propio de la prueba (así las pruebas no dependen del stock
+    que dejaron otras) y devuelve su código.
+    """
+    from backend.services.services import precios_service
+
+    def crear(stock: int = 10, precio_usd: float = 1.0, id_categoria: int = 5) -> str:
+        cod = f"TEST{next(_codigos):04d}"
+        conn.execute(
+            "INSERT INTO Productos (cod_producto, nombre, precio_usd, id_categoria) VALUES (?, ?, ?, ?)",
+            (cod, f"Producto de prueba {cod}", precio_usd, id_categoria)
+        )
+        # tr_after_producto_nopreparado_insert registra el stock inicial como movimiento de ajuste
+        conn.execute(
+            """INSERT INTO Productos_noPreparados (
+                cod_producto_noPreparado, cant_min, cant_actual, costo_compra, unidad_medida, Rif
+            ) VALUES (?, 1, ?, 0.5, 'unidad', 'J-12345678-9')""",
+            (cod, stock)
+        )
+        conn.commit()
+        precios_service.invalidar()
+        return cod
+
+    return crear
+
+
+@pytest.fixture
+def venta_contado():
+    """Cuerpo de POST /ventas/registrar: la caja sólo envía códigos y cantidades."""
+    def cuerpo(*detalles, metodo_pago: str = "efectivo_bs") -> dict:
+        return {
+            "venta": {"tipo": "de_contado"},
+            "detalles": [{"cod_producto": cod, "cantidad_producto": cantidad} for cod, cantidad in detalles],
+            "pago": {"fecha_pago": "2025-03-01", "metodo_pago": metodo_pago},
+        }
+    return cuerpo
@@ -0,0 +1,39 @@
+# Arranque de SQLite: modo WAL persistente y PRAGMAs del perfil en cada conexión del pool
+from database.bootstrap import CONNECTION_PRAGMAS, bootstrap_database, get_profile
+from database.pool import get_pool
+
+# Valor que devuelve SQLite al consultar cada PRAGMA configurado con un nombre
+PRAGMA_NUMERICOS = {"NORMAL": 1, "FULL": 2, "MEMORY": 2}
+
+
+def esperado(valor):
+    return PRAGMA_NUMERICOS.get(valor, valor)
+
+
+def test_pool_aplica_pragmas_del_perfil(db_path):
+    perfil = get_profile()
+    with get_pool(db_path).connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        for pragma in CONNECTION_PRAGMAS:
+            assert conn.execute(f"PRAGMA {pragma}").fetchone()[0] == esperado(perfil[pragma]), pragma
+
+
+def test_conexion_dedicada_usa_la_misma_configuracion(db_path):
+    perfil = get_profile()
+    conn = get_pool(db_path).dedicated_connection()
+    try:
+        for pragma in CONNECTION_PRAGMAS:
+            assert conn.execute(f"PRAGMA {pragma}").fetchone()[0] == esperado(perfil[pragma]), pragma
+    finally:
+        conn.close()
+
+
+def test_bootstrap_devuelve_los_valores_efectivos(db_path):
+    perfil = get_profile("seguro")
+    try:
+        efectivos = bootstrap_database(db_path, "seguro")
+        assert efectivos["journal_mode"] == "wal"
+        assert efectivos["synchronous"] == 2
+        assert efectivos["busy_timeout"] == perfil["busy_timeout"]
+    finally:
+        bootstrap_database(db_path)
@@ -0,0 +1,61 @@
+# Cargas masivas: resultado por registro y atomicidad
+import itertools
+
+import pytest
+
+_cedulas = itertools.count(70000000)
+
+
+@pytest.fixture
+def cedula():
+    """Cédulas nuevas (numéricas, fuera del rango de la prueba de exportación)."""
+    return lambda: str(next(_cedulas))
+
+
+def cliente(ci: str, nombre: str = "Cliente Masivo") -> dict:
+    return {"ci_cliente": ci, "nombre": nombre}
+
+
+def existe(conn, ci: str) -> bool:
+    return conn.execute("SELECT 1 FROM Clientes WHERE ci_cliente = ?", (ci,)).fetchone() is not None
+
+
+def test_carga_parcial_guarda_los_validos(client, conn, cedula):
+    a, b = cedula(), cedula()
+    # 12345678 ya existe en los datos de ejemplo; a aparece dos veces en la misma carga
+    respuesta = client.post(
+        "/clientes/bulk", params={"atomic": "false"},
+        json=[cliente(a), cliente("12345678"), cliente(b), cliente(a, "Repetido")]
+    )
+    assert respuesta.status_code == 200
+    cuerpo = respuesta.json()
+    assert (cuerpo["creados"], cuerpo["fallidos"]) == (2, 2)
+    assert [r["estado"] for r in cuerpo["resultados"]] == ["creado", "duplicado", "creado", "duplicado"]
+    assert [r["indice"] for r in cuerpo["resultados"]] == [0, 1, 2, 3]
+    assert existe(conn, a) and existe(conn, b)
+    # El duplicado dentro de la carga no pisa al primero
+    assert conn.execute("SELECT nombre FROM Clientes WHERE ci_cliente = ?", (a,)).fetchone()[0] == "Cliente Masivo"
+    assert conn.execute("SELECT nombre FROM Clientes WHERE ci_cliente = '12345678'").fetchone()[0] == "Juan Pérez"
+
+
+def test_carga_atomica_no_guarda_nada(client, conn, cedula):
+    a, b = cedula(), cedula()
+    respuesta = client.post("/clientes/bulk", json=[cliente(a), cliente("12345678"), cliente(b)])
+    assert respuesta.status_code == 409
+    detalle = respuesta.json()["detail"]
+    assert detalle["code"] == "BULK_ABORTED"
+    assert [e["indice"] for e in detalle["errores"]] == [1]
+    assert not existe(conn, a) and not existe(conn, b)
+
+
+def test_upsert_parcial(client, conn, cedula):
+    a, b = cedula(), cedula()
+    client.post("/clientes/bulk", json=[cliente(a)])
+    respuesta = client.put(
+        "/clientes/bulk", params={"atomic": "false"},
+        json=[cliente(a, "Actualizado"), cliente(b)]
+    )
+    assert respuesta.status_code == 200
+    assert [r["estado"] for r in respuesta.json()["resultados"]] == ["actualizado", "creado"]
+    assert conn.execute("SELECT nombre FROM Clientes WHERE ci_cliente = ?", (a,)).fetchone()[0] == "Actualizado"
+    assert existe(conn, b)
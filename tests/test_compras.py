@@ -0,0 +1,71 @@
+# Registro de compras: cabecera, movimientos y costos se confirman o se deshacen juntos
+import pytest
+
+RIF = "J-12345678-9"
+
+
+def compra(*lineas) -> dict:
+    """Cuerpo de POST /compras/registrar para líneas (código, cantidad, costo unitario)."""
+    return {
+        "compra": {"fecha": "2025-03-01", "Rif": RIF, "gasto_total": sum(c * costo for _, c, costo in lineas)},
+        "detalles": [
+            {"cod_producto": cod, "cantidad": cantidad, "costo_unitario": costo}
+            for cod, cantidad, costo in lineas
+        ]
+    }
+
+
+def estado(conn, *codigos):
+    """Compras registradas, movimientos de compra y (stock, costo) de los productos."""
+    compras = conn.execute("SELECT COUNT(*) FROM Compras").fetchone()[0]
+    movimientos = conn.execute("SELECT COUNT(*) FROM Movimientos WHERE referencia = 'compra'").fetchone()[0]
+    productos = conn.execute(
+        f"""SELECT cod_producto_noPreparado, cant_actual, costo_compra FROM Productos_noPreparados
+            WHERE cod_producto_noPreparado IN ({', '.join('?' * len(codigos))})
+            ORDER BY cod_producto_noPreparado""",
+        codigos
+    ).fetchall()
+    return compras, movimientos, productos
+
+
+@pytest.fixture
+def falla_en_movimiento(conn):
+    """Hace fallar en la base de datos el movimiento de compra de un producto."""
+    def instalar(cod: str) -> None:
+        conn.execute(
+            f"""CREATE TRIGGER tr_prueba_falla_compra BEFORE INSERT ON Movimientos
+                WHEN NEW.cod_producto = '{cod}' AND NEW.referencia = 'compra'
+                BEGIN SELECT RAISE(ABORT, 'falla simulada'); END"""
+        )
+        conn.commit()
+
+    yield instalar
+    conn.execute("DROP TRIGGER IF EXISTS tr_prueba_falla_compra")
+    conn.commit()
+
+
+def test_compra_suma_stock_y_actualiza_costo(client, conn, nuevo_producto):
+    a, b = nuevo_producto(stock=2), nuevo_producto(stock=0)
+    respuesta = client.post("/compras/registrar", json=compra((a, 5, 0.8), (b, 3, 1.25)))
+    assert respuesta.status_code == 200
+    _, _, productos = estado(conn, a, b)
+    assert productos == [(a, 7, 0.8), (b, 3, 1.25)]
+
+
+def test_producto_inexistente_no_registra_nada(client, conn, nuevo_producto):
+    a = nuevo_producto()
+    antes = estado(conn, a)
+    respuesta = client.post("/compras/registrar", json=compra((a, 5, 0.8), ("NOEXISTE", 1, 1.0)))
+    assert respuesta.status_code == 422
+    assert estado(conn, a) == antes
+
+
+def test_falla_tras_la_cabecera_deshace_la_compra(client, conn, nuevo_producto, falla_en_movimiento):
+    a, b = nuevo_producto(stock=4), nuevo_producto(stock=4)
+    # La cabecera y el movimiento de a ya se escribieron cuando falla el de b
+    falla_en_movimiento(b)
+    antes = estado(conn, a, b)
+    respuesta = client.post("/compras/registrar", json=compra((a, 5, 0.8), (b, 3, 1.25)))
+    assert respuesta.status_code == 400
+    assert "falla simulada" in respuesta.json()["detail"]["message"]
+    assert estado(conn, a, b) == antes
@@ -0,0 +1,30 @@
+# Altas por los routers CRUD: duplicados (409) y otras restricciones de la tabla (400)
+import itertools
+
+_cedulas = itertools.count(69000000)
+
+
+def test_alta_duplicada_responde_409(client, conn):
+    ci = str(next(_cedulas))
+    assert client.post("/clientes/", json={"ci_cliente": ci, "nombre": "Cliente Original"}).status_code == 201
+
+    respuesta = client.post("/clientes/", json={"ci_cliente": ci, "nombre": "Cliente Repetido"})
+    assert respuesta.status_code == 409
+    assert respuesta.json()["detail"] == {
+        "message": f"Ya existe un registro con ci_cliente = {ci}",
+        "field": "ci_cliente",
+        "value": ci,
+        "code": "DUPLICATE_KEY",
+    }
+    assert conn.execute("SELECT nombre FROM Clientes WHERE ci_cliente = ?", (ci,)).fetchone()[0] == "Cliente Original"
+
+
+def test_restriccion_check_responde_400(client, conn):
+    antes = conn.execute("SELECT COUNT(*) FROM categoria_productos").fetchone()[0]
+    respuesta = client.post("/categoria_productos/", json={"descr": "Inválida", "tipo": "otro"})
+    assert respuesta.status_code == 400
+    detalle = respuesta.json()["detail"]
+    assert detalle["code"] == "CONSTRAINT_VIOLATION"
+    assert "CHECK constraint failed" in detalle["detail"]
+    assert detalle["detail"] in detalle["message"]
+    assert conn.execute("SELECT COUNT(*) FROM categoria_productos").fetchone()[0] == antes
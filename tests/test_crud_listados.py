@@ -0,0 +1,44 @@
+# Listados de los routers CRUD: paginación por cursor (keyset) y listado completo por defecto
+
+
+def test_listado_de_ventas_usa_la_clave_id_venta(client):
+    respuesta = client.get("/ventas/", params={"limit": 5})
+    assert respuesta.status_code == 200
+
+
+def test_sin_limit_ni_after_devuelve_todos_los_registros(client, conn):
+    total = conn.execute("SELECT COUNT(*) FROM Productos").fetchone()[0]
+    respuesta = client.get("/productos/")
+    assert respuesta.status_code == 200
+    assert len(respuesta.json()) == total
+    assert "x-next-cursor" not in respuesta.headers
+
+
+def test_pagina_exacta_no_devuelve_cursor(client, conn):
+    total = conn.execute("SELECT COUNT(*) FROM Productos").fetchone()[0]
+    respuesta = client.get("/productos/", params={"limit": total})
+    assert len(respuesta.json()) == total
+    assert "x-next-cursor" not in respuesta.headers
+
+
+def test_recorrer_paginas_con_el_cursor(client, conn):
+    codigos = [fila[0] for fila in conn.execute("SELECT cod_producto FROM Productos ORDER BY cod_producto")]
+    vistos, cursor = [], None
+    while True:
+        params = {"limit": 3, "fields": "cod_producto"}
+        if cursor:
+            params["after"] = cursor
+        respuesta = client.get("/productos/", params=params)
+        assert respuesta.status_code == 200
+        pagina = respuesta.json()
+        assert pagina, "el cursor nunca apunta a una página vacía"
+        vistos.extend(item["cod_producto"] for item in pagina)
+        cursor = respuesta.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+    assert vistos == codigos
+
+
+def test_campo_invalido_responde_400(client):
+    respuesta = client.get("/productos/", params={"fields": "cod_producto; DROP TABLE Productos"})
+    assert respuesta.status_code == 400
@@ -0,0 +1,51 @@
+# Executor de base de datos: la cola acotada rechaza con 503 en vez de acumular
+import asyncio
+import threading
+import time
+
+import pytest
+
+from database.executor import DBExecutor, ExecutorBusyError, db_executor
+
+
+def esperar(condicion, limite=10):
+    fin = time.monotonic() + limite
+    while not condicion():
+        assert time.monotonic() < fin, "la condición no se cumplió a tiempo"
+        time.sleep(0.01)
+
+
+def test_cola_llena_lanza_executor_busy():
+    async def escenario():
+        executor = DBExecutor(workers=1, max_queue=1, timeout=0.1)
+        evento = threading.Event()
+        ocupadas = [asyncio.create_task(executor.run(evento.wait, 5)) for _ in range(2)]
+        while executor.stats()["pending"] < 2:
+            await asyncio.sleep(0.01)
+        with pytest.raises(ExecutorBusyError):
+            await executor.run(lambda: None)
+        evento.set()
+        await asyncio.gather(*ocupadas)
+        stats = executor.stats()
+        executor.shutdown()
+        return stats
+
+    stats = asyncio.run(escenario())
+    assert (stats["completed"], stats["rejected"], stats["pending"]) == (2, 1, 0)
+
+
+def test_executor_saturado_responde_503(client, monkeypatch):
+    monkeypatch.setattr(db_executor, "timeout", 0.2)
+    capacidad = db_executor.workers + db_executor.max_queue
+    evento = threading.Event()
+    ocupadas = [client.portal.start_task_soon(db_executor.run, evento.wait, 10) for _ in range(capacidad)]
+    try:
+        esperar(lambda: db_executor.stats()["pending"] == capacidad)
+        respuesta = client.get("/clientes/")
+        assert respuesta.status_code == 503
+        assert respuesta.headers["Retry-After"] == "1"
+    finally:
+        evento.set()
+        for tarea in ocupadas:
+            tarea.result(timeout=10)
+    assert client.get("/clientes/").status_code == 200
@@ -0,0 +1,87 @@
+# Exportación en streaming: la memoria no crece con la cantidad de filas exportadas
+import asyncio
+import tracemalloc
+
+import pytest
+
+FILAS_EXPORTADAS = 1_000_000
+LIMITE_MEMORIA = 8 * 1024 * 1024       # bytes; la exportación completa pesa más de diez veces esto
+PRIMERA_CI = 90_000_000
+
+
+@pytest.fixture
+def clientes_masivos(conn):
+    """Carga FILAS_EXPORTADAS clientes y los elimina al terminar la prueba."""
+    conn.executemany(
+        "INSERT INTO Clientes (ci_cliente, nombre, tlf, depto_escuela) VALUES (?, 'Cliente exportado', '04140000000', 'Pruebas')",
+        ((str(PRIMERA_CI + i),) for i in range(FILAS_EXPORTADAS))
+    )
+    conn.commit()
+    yield FILAS_EXPORTADAS
+    conn.execute("DELETE FROM Clientes WHERE CAST(ci_cliente AS INTEGER) >= ?", (PRIMERA_CI,))
+    conn.commit()
+
+
+async def recorrer_respuesta(app, ruta: str, query: str = "") -> dict:
+    """
+    Llama a la app como lo hace TestClient, pero descarta cada bloque del cuerpo después de
+    contarlo: TestClient acumula la respuesta completa en memoria y eso es justo lo que se mide.
+    """
+    pedido_enviado = False
+    desconexion = asyncio.get_running_loop().create_future()
+    resultado = {"status": None, "bytes": 0, "lineas": 0, "bloques": 0}
+
+    async def receive():
+        nonlocal pedido_enviado
+        if not pedido_enviado:
+            pedido_enviado = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        return await desconexion
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            resultado["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            cuerpo = message.get("body", b"")
+            resultado["bytes"] += len(cuerpo)
+            resultado["lineas"] += cuerpo.count(b"\n")
+            resultado["bloques"] += 1
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": ruta, "raw_path": ruta.encode(), "root_path": "",
+        "query_string": query.encode(), "headers": [(b"host", b"testserver")],
+        "client": ("testclient", 50000), "server": ("testserver", 80),
+    }
+    try:
+        await app(scope, receive, send)
+    finally:
+        desconexion.cancel()
+    return resultado
+
+
+@pytest.mark.lento
+def test_exportar_un_millon_de_filas_con_memoria_acotada(client, conn, clientes_masivos):
+    total = conn.execute("SELECT COUNT(*) FROM Clientes").fetchone()[0]
+
+    tracemalloc.start()
+    try:
+        resultado = client.portal.call(recorrer_respuesta, client.app, "/export/clientes")
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert resultado["status"] == 200
+    assert resultado["lineas"] == total
+    assert resultado["bloques"] > 1
+    # El cuerpo completo no cabe en el límite: si se cargara la tabla entera el pico lo superaría
+    assert resultado["bytes"] > 2 * LIMITE_MEMORIA
+    assert pico < LIMITE_MEMORIA, f"pico de memoria {pico / 2**20:.1f} MiB"
+
+
+def test_exportar_csv_con_proyeccion(client):
+    respuesta = client.get("/export/productos", params={"formato": "csv", "fields": "cod_producto,precio_usd"})
+    assert respuesta.status_code == 200
+    lineas = respuesta.text.splitlines()
+    assert lineas[0] == "cod_producto,precio_usd"
+    assert "PROD001,35.5" in lineas
@@ -0,0 +1,176 @@
+# Idempotency-Key en los endpoints de registro de ventas: reintentos, concurrencia y vencimiento
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+
+import pytest
+
+from backend.services.transactions import idempotencia_transactions
+from backend.utilities.apscheduler import purgar_idempotencia
+
+CLIENTE = "11223344"
+
+
+def credito(*lineas, pago_inicial: bool = False) -> dict:
+    cuerpo = {
+        "venta": {"tipo": "credito", "ci_cliente": CLIENTE},
+        "detalles": [{"cod_producto": cod, "cantidad_producto": cantidad} for cod, cantidad in lineas],
+        "credito": {"ci_cliente": CLIENTE, "fecha_credito": "2025-03-01", "monto_pagado": 0, "estado": "Pendiente"},
+    }
+    if pago_inicial:
+        cuerpo["pago_inicial"] = {"monto": 1.0, "fecha_pago": "2025-03-01", "metodo_pago": "pago_movil"}
+    return cuerpo
+
+
+def unificada(cuerpo: dict) -> dict:
+    """Cuerpo de /ventas/registrar_completa a partir del de /registrar o /registrar_credito."""
+    return {
+        "venta": cuerpo["venta"],
+        "detalles": cuerpo["detalles"],
+        "pago": cuerpo.get("pago", cuerpo.get("pago_inicial")),
+        "credito": cuerpo.get("credito"),
+        "tipo_transaccion": cuerpo["venta"]["tipo"],
+    }
+
+
+def contar(conn, cod: str) -> dict:
+    """Ventas, pagos y créditos registrados con el producto de la prueba."""
+    ventas = "SELECT id_venta FROM Detalle_Venta WHERE cod_producto = ?"
+    return {
+        "ventas": conn.execute(f"SELECT COUNT(*) FROM Ventas WHERE id_venta IN ({ventas})", (cod,)).fetchone()[0],
+        "pagos": conn.execute(f"SELECT COUNT(*) FROM Pagos WHERE id_venta IN ({ventas})", (cod,)).fetchone()[0],
+        "creditos": conn.execute(f"SELECT COUNT(*) FROM Creditos WHERE id_venta IN ({ventas})", (cod,)).fetchone()[0],
+    }
+
+
+def cabeceras() -> dict:
+    return {"Idempotency-Key": str(uuid.uuid4())}
+
+
+@pytest.fixture
+def cuerpos(nuevo_producto, venta_contado):
+    """(ruta, cuerpo, registros esperados) de cada endpoint de registro con un producto propio."""
+    def crear(ruta: str):
+        cod = nuevo_producto(stock=50, precio_usd=2.0)
+        if ruta == "/ventas/registrar":
+            return cod, venta_contado((cod, 2)), {"ventas": 1, "pagos": 1, "creditos": 0}
+        if ruta == "/ventas/registrar_credito":
+            return cod, credito((cod, 2), pago_inicial=True), {"ventas": 1, "pagos": 1, "creditos": 1}
+        return cod, unificada(credito((cod, 2), pago_inicial=True)), {"ventas": 1, "pagos": 1, "creditos": 1}
+    return crear
+
+
+RUTAS = ["/ventas/registrar", "/ventas/registrar_credito", "/ventas/registrar_completa"]
+
+
+@pytest.mark.parametrize("ruta", RUTAS)
+def test_reintento_devuelve_la_misma_respuesta(client, conn, cuerpos, ruta):
+    cod, cuerpo, registros = cuerpos(ruta)
+    clave = cabeceras()
+    primera = client.post(ruta, json=cuerpo, headers=clave)
+    assert primera.status_code == 200, primera.text
+    segunda = client.post(ruta, json=cuerpo, headers=clave)
+    assert segunda.status_code == 200
+    assert segunda.json() == primera.json()
+    assert contar(conn, cod) == registros
+
+    # Sin clave (o con otra) es una venta nueva
+    assert client.post(ruta, json=cuerpo).status_code == 200
+    assert contar(conn, cod)["ventas"] == 2
+
+
+@pytest.mark.parametrize("ruta", RUTAS)
+def test_peticiones_concurrentes_con_la_misma_clave(client, conn, cuerpos, ruta):
+    cod, cuerpo, registros = cuerpos(ruta)
+    clave = cabeceras()
+    concurrentes = 8
+    barrera = Barrier(concurrentes)
+
+    def enviar(_):
+        barrera.wait()
+        return client.post(ruta, json=cuerpo, headers=clave)
+
+    with ThreadPoolExecutor(concurrentes) as executor:
+        respuestas = list(executor.map(enviar, range(concurrentes)))
+
+    assert [r.status_code for r in respuestas] == [200] * concurrentes
+    assert len({r.text for r in respuestas}) == 1
+    assert contar(conn, cod) == registros
+    assert conn.execute(
+        "SELECT cant_actual FROM Productos_noPreparados WHERE cod_producto_noPreparado = ?", (cod,)
+    ).fetchone()[0] == 48
+
+
+@pytest.mark.parametrize("ruta", RUTAS)
+def test_clave_reutilizada_con_otro_cuerpo(client, conn, cuerpos, ruta):
+    cod, cuerpo, registros = cuerpos(ruta)
+    clave = cabeceras()
+    assert client.post(ruta, json=cuerpo, headers=clave).status_code == 200
+
+    otro = {**cuerpo, "detalles": [{"cod_producto": cod, "cantidad_producto": 3}]}
+    respuesta = client.post(ruta, json=otro, headers=clave)
+    assert respuesta.status_code == 422
+    assert clave["Idempotency-Key"] in respuesta.text
+    assert contar(conn, cod) == registros
+
+
+def test_claves_independientes_por_endpoint(client, conn, nuevo_producto, venta_contado):
+    cod = nuevo_producto(stock=50)
+    clave = cabeceras()
+    cuerpo = venta_contado((cod, 1))
+    assert client.post("/ventas/registrar", json=cuerpo, headers=clave).status_code == 200
+    assert client.post("/ventas/registrar_completa", json=unificada(cuerpo), headers=clave).status_code == 200
+    assert contar(conn, cod)["ventas"] == 2
+
+
+def test_peticion_fallida_no_guarda_la_clave(client, conn, nuevo_producto, venta_contado):
+    cod = nuevo_producto(stock=1)
+    clave = cabeceras()
+    cuerpo = venta_contado((cod, 2))
+    assert client.post("/ventas/registrar", json=cuerpo, headers=clave).status_code != 200
+    assert conn.execute(
+        "SELECT COUNT(*) FROM Idempotencia WHERE clave = ?", (clave["Idempotency-Key"],)
+    ).fetchone()[0] == 0
+
+    # Tras reponer el stock, el reintento con la misma clave sí registra la venta
+    conn.execute("UPDATE Productos_noPreparados SET cant_actual = 5 WHERE cod_producto_noPreparado = ?", (cod,))
+    conn.commit()
+    assert client.post("/ventas/registrar", json=cuerpo, headers=clave).status_code == 200
+    assert contar(conn, cod)["ventas"] == 1
+
+
+def test_purgar_idempotencia_elimina_las_claves_vencidas(client, conn, nuevo_producto, venta_contado):
+    cod = nuevo_producto(stock=50)
+    cuerpo = venta_contado((cod, 1))
+    vencida, vigente = cabeceras(), cabeceras()
+    assert client.post("/ventas/registrar", json=cuerpo, headers=vencida).status_code == 200
+    assert client.post("/ventas/registrar", json=cuerpo, headers=vigente).status_code == 200
+
+    # La primera clave se guardó hace más que el TTL
+    conn.execute(
+        "UPDATE Idempotencia SET creada_en = ? WHERE clave = ?",
+        (time.time() - idempotencia_transactions.IDEMPOTENCY_TTL - 60, vencida["Idempotency-Key"])
+    )
+    conn.commit()
+
+    # Vencida pero aún sin purgar: ya no se reutiliza, el reintento registra otra venta
+    assert client.post("/ventas/registrar", json=cuerpo, headers=vencida).status_code == 200
+    assert contar(conn, cod)["ventas"] == 3
+    conn.execute(
+        "UPDATE Idempotencia SET creada_en = ? WHERE clave = ?",
+        (time.time() - idempotencia_transactions.IDEMPOTENCY_TTL - 60, vencida["Idempotency-Key"])
+    )
+    conn.commit()
+
+    client.portal.call(purgar_idempotencia)
+    claves = {fila[0] for fila in conn.execute("SELECT clave FROM Idempotencia")}
+    assert vencida["Idempotency-Key"] not in claves
+    assert vigente["Idempotency-Key"] in claves
+    assert conn.execute("SELECT COUNT(*) FROM Idempotencia WHERE creada_en < ?", (
+        time.time() - idempotencia_transactions.IDEMPOTENCY_TTL,
+    )).fetchone()[0] == 0
+
+    # La clave vigente sigue devolviendo la respuesta guardada
+    assert client.post("/ventas/registrar", json=cuerpo, headers=vigente).status_code == 200
+    assert contar(conn, cod)["ventas"] == 3
@@ -0,0 +1,61 @@
+# GET /inventario/alertas: sólo los productos por debajo del mínimo, de mayor a menor faltante
+
+
+def minimo(conn, cod: str, cant_min: int) -> None:
+    conn.execute("UPDATE Productos_noPreparados SET cant_min = ? WHERE cod_producto_noPreparado = ?", (cant_min, cod))
+    conn.commit()
+
+
+def alertas(client) -> list:
+    respuesta = client.get("/inventario/alertas")
+    assert respuesta.status_code == 200
+    return respuesta.json()
+
+
+def test_alertas_coinciden_con_la_tabla(client, conn, nuevo_producto):
+    productos = {}
+    for stock, cant_min in [(3, 10), (9, 10), (0, 4), (5, 5), (6, 5), (2, 9)]:
+        cod = nuevo_producto(stock=stock)
+        minimo(conn, cod, cant_min)
+        productos[cod] = (stock, cant_min)
+
+    filas = conn.execute(
+        """SELECT cod_producto_noPreparado, cant_min - cant_actual FROM Productos_noPreparados
+           WHERE cant_actual < cant_min"""
+    ).fetchall()
+    esperadas = sorted(filas, key=lambda fila: (-fila[1], fila[0]))
+
+    recibidas = alertas(client)
+    assert [(a["cod_producto"], a["faltante"]) for a in recibidas] == esperadas
+    for alerta in recibidas:
+        assert alerta["faltante"] == alerta["cant_min"] - alerta["cant_actual"] > 0
+
+    en_alerta = {a["cod_producto"]: a["faltante"] for a in recibidas}
+    for cod, (stock, cant_min) in productos.items():
+        if stock < cant_min:
+            assert en_alerta[cod] == cant_min - stock
+        else:
+            assert cod not in en_alerta     # en el mínimo o por encima no hay alerta
+
+
+def test_faltantes_iguales_se_ordenan_por_codigo(client, conn, nuevo_producto):
+    primero, segundo = nuevo_producto(stock=1), nuevo_producto(stock=1)
+    for cod in (segundo, primero):
+        minimo(conn, cod, 1000)
+    codigos = [a["cod_producto"] for a in alertas(client)]
+    assert codigos.index(primero) + 1 == codigos.index(segundo)
+
+
+def test_venta_y_compra_actualizan_las_alertas(client, conn, nuevo_producto, venta_contado):
+    cod = nuevo_producto(stock=6)
+    minimo(conn, cod, 5)
+    assert cod not in {a["cod_producto"] for a in alertas(client)}
+
+    assert client.post("/ventas/registrar", json=venta_contado((cod, 3))).status_code == 200
+    alerta = next(a for a in alertas(client) if a["cod_producto"] == cod)
+    assert (alerta["cant_actual"], alerta["cant_min"], alerta["faltante"]) == (3, 5, 2)
+
+    # Un ajuste de inventario (movimiento) que repone el stock la quita
+    conn.execute("UPDATE Productos_noPreparados SET cant_actual = 8 WHERE cod_producto_noPreparado = ?", (cod,))
+    conn.commit()
+    assert cod not in {a["cod_producto"] for a in alertas(client)}
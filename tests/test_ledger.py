@@ -0,0 +1,98 @@
+# Invariante de inventario: el stock de cada producto coincide con el saldo de sus movimientos
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from database.ledger_check import find_drift, rebuild_stock
+from database.migrations import run_migrations
+from tests.conftest import RAIZ
+
+ORDENES = {
+    "readme": ("create_db.py", "insert_db.py", "triggers_db.py", "views_db.py"),
+    "triggers_primero": ("create_db.py", "triggers_db.py", "insert_db.py", "views_db.py"),
+}
+
+
+def crear_base(ruta: str, scripts) -> None:
+    """Crea una base de datos nueva ejecutando los scripts de database/ en el orden indicado."""
+    entorno = dict(os.environ, SQLITE_DB=ruta)
+    for script in scripts:
+        subprocess.run(
+            [sys.executable, os.path.join(RAIZ, "database", script)], check=True, capture_output=True, env=entorno
+        )
+
+
+def stock(ruta: str) -> dict:
+    with sqlite3.connect(ruta) as conn:
+        return dict(conn.execute("SELECT cod_producto_noPreparado, cant_actual FROM Productos_noPreparados"))
+
+
+@pytest.mark.parametrize("orden", ORDENES)
+def test_base_nueva_sin_descuadres(tmp_path, orden):
+    ruta = str(tmp_path / "ledger.db")
+    crear_base(ruta, ORDENES[orden])
+    inicial = stock(ruta)
+    run_migrations(ruta)
+    # El saldo inicial que faltara se registra como movimiento, sin tocar el stock
+    assert find_drift(ruta) == []
+    assert stock(ruta) == inicial
+
+
+def test_reconstruir_corrige_el_descuadre(conn, db_path, nuevo_producto):
+    cod = nuevo_producto(stock=8)
+    conn.execute("UPDATE Productos_noPreparados SET cant_actual = 3 WHERE cod_producto_noPreparado = ?", (cod,))
+    conn.commit()
+    # El ajuste manual quedó registrado como movimiento: se descuadra a mano saltando el trigger
+    conn.execute("DELETE FROM Movimientos WHERE cod_producto = ? AND referencia = 'ajuste' AND tipo_movimiento = 'salida'", (cod,))
+    conn.commit()
+    assert [d["cod_producto"] for d in find_drift(db_path)] == [cod]
+
+    corregidos = rebuild_stock(db_path)
+    assert [(d["cod_producto"], d["cant_actual"], d["cant_movimientos"]) for d in corregidos] == [(cod, 3, 8)]
+    assert find_drift(db_path) == []
+    cant, movimientos = conn.execute(
+        """SELECT cant_actual, (SELECT COUNT(*) FROM Movimientos WHERE cod_producto = ?)
+           FROM Productos_noPreparados WHERE cod_producto_noPreparado = ?""",
+        (cod, cod)
+    ).fetchone()
+    # La reconstrucción no se registra como un ajuste nuevo
+    assert (cant, movimientos) == (8, 1)
+
+
+def test_cli_reconstruir_corrige_un_stock_forzado(tmp_path):
+    ruta = str(tmp_path / "cli.db")
+    crear_base(ruta, ORDENES["readme"])
+    run_migrations(ruta)
+    with sqlite3.connect(ruta) as conn:
+        cod, cant = conn.execute(
+            "SELECT cod_producto_noPreparado, cant_actual FROM Productos_noPreparados ORDER BY 1 LIMIT 1"
+        ).fetchone()
+        movimientos = conn.execute("SELECT COUNT(*) FROM Movimientos").fetchone()[0]
+        # Subir version_stock a la vez hace que el trigger lo tome como un movimiento: no queda 'ajuste'
+        conn.execute(
+            """UPDATE Productos_noPreparados SET cant_actual = cant_actual + 7, version_stock = version_stock + 1
+               WHERE cod_producto_noPreparado = ?""",
+            (cod,)
+        )
+    conn.close()
+    assert [d["cod_producto"] for d in find_drift(ruta)] == [cod]
+
+    entorno = dict(os.environ, SQLITE_DB=ruta)
+    script = os.path.join(RAIZ, "database", "ledger_check.py")
+    verificar = subprocess.run([sys.executable, script], capture_output=True, text=True, env=entorno)
+    assert verificar.returncode == 1
+    assert cod in verificar.stdout
+
+    reconstruir = subprocess.run([sys.executable, script, "--reconstruir"], capture_output=True, text=True, env=entorno)
+    assert reconstruir.returncode == 0, reconstruir.stderr
+    assert "1 productos reconstruidos" in reconstruir.stdout
+
+    assert find_drift(ruta) == []
+    assert stock(ruta)[cod] == cant
+    with sqlite3.connect(ruta) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM Movimientos").fetchone()[0] == movimientos
+    conn.close()
+    assert subprocess.run([sys.executable, script], capture_output=True, env=entorno).returncode == 0
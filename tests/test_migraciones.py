@@ -0,0 +1,78 @@
+# Migraciones: bases con el esquema actual y con el anterior a version_stock, registro e idempotencia
+import sqlite3
+
+import pytest
+
+from database import migrations
+from database.migrations import MIGRATIONS, has_column, run_migrations
+from tests.test_ledger import ORDENES, crear_base
+
+
+def test_esquema_actual_trae_version_stock(tmp_path):
+    ruta = str(tmp_path / "actual.db")
+    crear_base(ruta, ("create_db.py",))
+    with sqlite3.connect(ruta) as conn:
+        assert has_column(conn, "Productos_noPreparados", "version_stock")
+    # La 004 no intenta agregar la columna otra vez
+    assert 4 in run_migrations(ruta)
+
+
+def test_base_anterior_recibe_version_stock(tmp_path):
+    ruta = str(tmp_path / "anterior.db")
+    crear_base(ruta, ("create_db.py",))
+    with sqlite3.connect(ruta) as conn:
+        conn.execute("ALTER TABLE Productos_noPreparados DROP COLUMN version_stock")
+    crear_base(ruta, ("insert_db.py",))
+
+    assert 4 in run_migrations(ruta)
+    with sqlite3.connect(ruta) as conn:
+        assert has_column(conn, "Productos_noPreparados", "version_stock")
+        assert conn.execute("SELECT MIN(version_stock) FROM Productos_noPreparados").fetchone()[0] >= 0
+    # Una segunda ejecución no tiene nada pendiente
+    assert run_migrations(ruta) == []
+
+
+def esquema(ruta: str) -> list:
+    with sqlite3.connect(ruta) as conn:
+        filas = conn.execute("SELECT type, name, sql FROM sqlite_master ORDER BY type, name").fetchall()
+    conn.close()
+    return filas
+
+
+def registradas(ruta: str) -> list:
+    with sqlite3.connect(ruta) as conn:
+        filas = conn.execute("SELECT version, nombre, aplicada_en FROM schema_migrations ORDER BY version").fetchall()
+    conn.close()
+    return filas
+
+
+def test_cada_version_se_registra_una_vez(tmp_path):
+    ruta = str(tmp_path / "nueva.db")
+    crear_base(ruta, ORDENES["readme"])
+
+    versiones = [version for version, _, _ in MIGRATIONS]
+    assert run_migrations(ruta) == versiones
+    primeras = registradas(ruta)
+    assert [(v, n) for v, n, _ in primeras] == [(v, n) for v, n, _ in MIGRATIONS]
+    antes = esquema(ruta)
+
+    # Volver a ejecutarlas no aplica ni registra nada y deja el esquema igual
+    assert run_migrations(ruta) == []
+    assert run_migrations(ruta) == []
+    assert registradas(ruta) == primeras
+    assert esquema(ruta) == antes
+
+
+def test_migracion_fallida_no_se_registra(tmp_path, monkeypatch):
+    ruta = str(tmp_path / "fallida.db")
+    crear_base(ruta, ORDENES["readme"])
+    run_migrations(ruta)
+    monkeypatch.setattr(migrations, "MIGRATIONS", MIGRATIONS + [
+        (99, "fallida", "CREATE TABLE Parcial (x INTEGER); INSERT INTO No_Existe VALUES (1);"),
+    ])
+
+    with pytest.raises(sqlite3.OperationalError):
+        run_migrations(ruta)
+    # Se revirtió completa: ni la tabla ni el registro
+    assert 99 not in [v for v, _, _ in registradas(ruta)]
+    assert "Parcial" not in [nombre for _, nombre, _ in esquema(ruta)]
@@ -0,0 +1,145 @@
+# Pool de conexiones: préstamo reentrante, espera al agotarse, verificación de conexiones y métricas
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from database.pool import ConnectionPool, PoolTimeoutError, get_pool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), size=2, timeout=2, health_check_interval=30)
+    yield pool
+    pool.close()
+
+
+def test_prestamo_reentrante_en_el_mismo_hilo(pool):
+    with pool.connection() as externa:
+        with pool.connection() as interna:
+            assert interna is externa
+            assert pool.stats()["in_use"] == 1
+        externa.execute("CREATE TABLE t (x INTEGER)")
+        externa.execute("INSERT INTO t VALUES (1)")
+    # El bloque externo hizo el commit y la conexión volvió al pool una sola vez
+    stats = pool.stats()
+    assert (stats["checkouts"], stats["in_use"], stats["idle"], stats["open_connections"]) == (1, 0, 1, 1)
+    with pool.connection() as conn:
+        assert conn.execute("SELECT x FROM t").fetchall() == [(1,)]
+
+
+def test_error_en_bloque_anidado_deshace_todo(pool):
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+    with pytest.raises(RuntimeError):
+        with pool.connection() as externa:
+            externa.execute("INSERT INTO t VALUES (1)")
+            with pool.connection() as interna:
+                interna.execute("INSERT INTO t VALUES (2)")
+                raise RuntimeError("falla la operación anidada")
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+
+def test_pool_agotado_espera_y_mide_la_espera(pool):
+    ocupadas, liberar = threading.Barrier(pool.size + 1), threading.Event()
+
+    def ocupar():
+        with pool.connection():
+            ocupadas.wait()
+            liberar.wait(5)
+
+    hilos = [threading.Thread(target=ocupar) for _ in range(pool.size)]
+    for hilo in hilos:
+        hilo.start()
+    ocupadas.wait()
+    assert pool.stats()["in_use"] == pool.size == pool.stats()["open_connections"]
+
+    threading.Timer(0.2, liberar.set).start()
+    inicio = time.monotonic()
+    with pool.connection() as conn:
+        esperado = time.monotonic() - inicio
+        conn.execute("SELECT 1")
+    for hilo in hilos:
+        hilo.join()
+
+    stats = pool.stats()
+    assert esperado >= 0.15
+    # No se abrieron conexiones extra: se reutilizó una de las liberadas
+    assert stats["open_connections"] == pool.size
+    assert stats["checkouts"] == pool.size + 1
+    assert stats["wait_max_ms"] >= 150
+    assert 0 < stats["wait_avg_ms"] <= stats["wait_max_ms"]
+    assert stats["timeouts"] == 0
+
+
+def test_pool_agotado_lanza_timeout(pool):
+    pool.timeout = 0.1
+    ocupadas, liberar = threading.Barrier(pool.size + 1), threading.Event()
+
+    def ocupar():
+        with pool.connection():
+            ocupadas.wait()
+            liberar.wait(5)
+
+    hilos = [threading.Thread(target=ocupar) for _ in range(pool.size)]
+    for hilo in hilos:
+        hilo.start()
+    ocupadas.wait()
+    try:
+        with pytest.raises(PoolTimeoutError):
+            with pool.connection():
+                pass
+    finally:
+        liberar.set()
+        for hilo in hilos:
+            hilo.join()
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_conexion_rota_se_reemplaza(pool):
+    with pool.connection() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+    rota = conn
+    # Se cierra por fuera mientras está inactiva y se deja vencer el intervalo de verificación
+    rota.close()
+    pool.health_check_interval = 0
+
+    with pool.connection() as nueva:
+        assert nueva is not rota
+        nueva.execute("INSERT INTO t VALUES (1)")
+    stats = pool.stats()
+    assert stats["health_check_failures"] == 1
+    assert stats["open_connections"] == 1
+
+    # Una conexión sana que pasa la verificación se reutiliza
+    with pool.connection() as otra:
+        assert otra is nueva
+    assert pool.stats()["health_check_failures"] == 1
+
+
+def test_conexion_inactiva_reciente_no_se_verifica(pool):
+    with pool.connection() as conn:
+        pass
+    conn.close()
+    # Dentro del intervalo se entrega sin verificar: el fallo aparece al usarla
+    with pytest.raises(sqlite3.ProgrammingError):
+        with pool.connection() as misma:
+            assert misma is conn
+            misma.execute("SELECT 1")
+    assert pool.stats()["health_check_failures"] == 0
+
+
+def test_metricas_pool(client, db_path):
+    respuesta = client.get("/metricas/pool")
+    assert respuesta.status_code == 200
+    pools = respuesta.json()["pools"]
+    stats = next(p for p in pools if p["db_path"] == get_pool(db_path).db_path)
+    assert set(stats) == {
+        "db_path", "size", "open_connections", "in_use", "idle", "checkouts", "timeouts",
+        "health_check_failures", "wait_avg_ms", "wait_max_ms",
+    }
+    assert 0 < stats["open_connections"] <= stats["size"]
+    assert stats["checkouts"] > 0
+    assert stats["in_use"] + stats["idle"] <= stats["open_connections"]
@@ -0,0 +1,220 @@
+# Cliente de PyDolarVE: caché de /dolar, reintentos y circuito ante fallos de la API
+# (sin red: se simula la API o se usa un servidor local)
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from backend.services import pydolarve_service
+from backend.services.pydolarve_service import (
+    PYDOLARVE_FAILURE_THRESHOLD, PYDOLARVE_RETRIES, CircuitBreaker, CircuitOpenError, PyDolarVE, RespuestaInvalidaError
+)
+from backend.services.tasaCambio_cache import DOLAR_API, tasa_cache
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """API simulada: responde con estado["precio"] o falla si estado["caida"]."""
+    estado = {"caida": False, "precio": 50.0, "llamadas": 0}
+
+    async def request(self, client, endpoint, params, campos=()):
+        estado["llamadas"] += 1
+        await asyncio.sleep(0.01)
+        if estado["caida"]:
+            raise httpx.ConnectError("API caída")
+        return {"price": estado["precio"], "last_update": "01/03/2025, 12:00 AM"}
+
+    monkeypatch.setattr(PyDolarVE, "_request", request)
+    monkeypatch.setattr(PyDolarVE, "breaker", CircuitBreaker(failure_threshold=3, reset_timeout=60))
+    tasa_cache.invalidate(DOLAR_API)
+    yield estado
+    tasa_cache.invalidate(DOLAR_API)
+
+
+def test_respaldo_no_queda_en_cache(client, conn, api):
+    almacenada = conn.execute("SELECT valor_usd_bs FROM TasasCambio ORDER BY id_tasa DESC LIMIT 1").fetchone()[0]
+
+    api["caida"] = True
+    assert client.get("/dolar").json()["valor_usd_bs"] == almacenada
+
+    # La API se recupera: la siguiente petición la consulta en lugar de servir el respaldo
+    api["caida"] = False
+    assert client.get("/dolar").json()["valor_usd_bs"] == api["precio"]
+
+    # Ahora sí se sirve desde la caché
+    llamadas = api["llamadas"]
+    assert client.get("/dolar").json()["valor_usd_bs"] == api["precio"]
+    assert api["llamadas"] == llamadas
+
+
+def test_semiabierto_deja_pasar_una_sola_prueba(api):
+    breaker = PyDolarVE.breaker
+    breaker.failures = breaker.failure_threshold
+    breaker.opened_at = time.monotonic() - breaker.reset_timeout
+    assert breaker.state == "semiabierto"
+
+    async def rafaga():
+        return await asyncio.gather(*(PyDolarVE().get_data() for _ in range(10)), return_exceptions=True)
+
+    resultados = asyncio.run(rafaga())
+    assert api["llamadas"] == 1
+    assert sum(isinstance(r, CircuitOpenError) for r in resultados) == 9
+    assert breaker.state == "cerrado"
+    assert not breaker.probe_in_flight
+
+
+def test_prueba_fallida_vuelve_a_abrir_el_circuito(api):
+    api["caida"] = True
+    breaker = PyDolarVE.breaker
+    breaker.failures = breaker.failure_threshold
+    breaker.opened_at = time.monotonic() - breaker.reset_timeout
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(PyDolarVE().get_data())
+    assert breaker.state == "abierto"
+    assert not breaker.probe_in_flight
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(PyDolarVE().get_data())
+
+
+class StubPyDolarVE:
+    """
+    Servidor HTTP local que imita a PyDolarVE: responde en orden las respuestas programadas
+    (estado, cuerpo, demora en segundos) y luego una tasa válida.
+    """
+
+    def __init__(self):
+        self.respuestas = deque()
+        self.peticiones = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.peticiones += 1
+                estado, cuerpo, demora = stub.respuestas.popleft() if stub.respuestas else (200, VALIDA, 0)
+                time.sleep(demora)
+                datos = cuerpo.encode() if isinstance(cuerpo, str) else json.dumps(cuerpo).encode()
+                try:
+                    self.send_response(estado)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(datos)))
+                    self.end_headers()
+                    self.wfile.write(datos)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass    # el cliente ya abandonó la petición por timeout
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+
+    def programar(self, *respuestas) -> None:
+        for respuesta in respuestas:
+            self.respuestas.append(respuesta + (0,) if len(respuesta) == 2 else respuesta)
+
+    def cerrar(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+VALIDA = {"price": 60.25, "last_update": "01/03/2025, 12:00 AM"}
+TIMEOUT = 0.3
+
+
+@pytest.fixture
+def stub(client, monkeypatch):
+    """
+    Cliente compartido de PyDolarVE apuntando a un servidor local (sin red), sin espera entre
+    reintentos y con un circuito nuevo. Las peticiones corren en el event loop de la app.
+    """
+    servidor = StubPyDolarVE()
+    monkeypatch.setattr(PyDolarVE, "BASE_URL", servidor.url)
+    monkeypatch.setattr(pydolarve_service, "PYDOLARVE_TIMEOUT", TIMEOUT)
+    monkeypatch.setattr(pydolarve_service, "PYDOLARVE_BACKOFF", 0)
+    monkeypatch.setattr(PyDolarVE, "breaker", CircuitBreaker(failure_threshold=PYDOLARVE_FAILURE_THRESHOLD))
+    client.portal.call(PyDolarVE.shutdown)
+    client.portal.call(PyDolarVE.startup)
+    tasa_cache.invalidate(DOLAR_API)
+    yield servidor
+    client.portal.call(PyDolarVE.shutdown)
+    monkeypatch.undo()
+    client.portal.call(PyDolarVE.startup)
+    tasa_cache.invalidate(DOLAR_API)
+    servidor.cerrar()
+
+
+def obtener(client):
+    return client.portal.call(PyDolarVE().get_data)
+
+
+def test_5xx_se_reintenta_hasta_el_exito(client, stub):
+    stub.programar((503, {"error": "mantenimiento"}), (502, "Bad Gateway"))
+    assert obtener(client)["price"] == VALIDA["price"]
+    assert stub.peticiones == 3
+    assert PyDolarVE.breaker.stats() == {"estado": "cerrado", "fallos_consecutivos": 0, "prueba_en_curso": False}
+
+
+def test_5xx_agota_los_reintentos(client, stub):
+    stub.programar(*[(500, {"error": "caída"})] * PYDOLARVE_RETRIES)
+    with pytest.raises(httpx.HTTPStatusError):
+        obtener(client)
+    assert stub.peticiones == PYDOLARVE_RETRIES
+    assert PyDolarVE.breaker.failures == 1
+
+
+def test_4xx_no_se_reintenta(client, stub):
+    stub.programar((404, {"error": "no existe"}))
+    with pytest.raises(httpx.HTTPStatusError):
+        obtener(client)
+    assert stub.peticiones == 1
+
+
+def test_timeout_se_reintenta(client, stub):
+    stub.programar((200, VALIDA, TIMEOUT * 3))
+    inicio = time.monotonic()
+    assert obtener(client)["price"] == VALIDA["price"]
+    assert stub.peticiones == 2
+    assert time.monotonic() - inicio < TIMEOUT * 3
+
+
+def test_timeouts_agotan_los_reintentos(client, stub):
+    stub.programar(*[(200, VALIDA, TIMEOUT * 3)] * PYDOLARVE_RETRIES)
+    with pytest.raises(httpx.TimeoutException):
+        obtener(client)
+    assert stub.peticiones == PYDOLARVE_RETRIES
+
+
+def test_circuito_se_abre_tras_fallos_reales(client, stub):
+    stub.programar(*[(500, {"error": "caída"})] * (PYDOLARVE_RETRIES * PYDOLARVE_FAILURE_THRESHOLD))
+    for _ in range(PYDOLARVE_FAILURE_THRESHOLD):
+        with pytest.raises(httpx.HTTPStatusError):
+            obtener(client)
+    assert PyDolarVE.breaker.state == "abierto"
+    peticiones = stub.peticiones
+    with pytest.raises(CircuitOpenError):
+        obtener(client)
+    # Con el circuito abierto no se llega a la API
+    assert stub.peticiones == peticiones == PYDOLARVE_RETRIES * PYDOLARVE_FAILURE_THRESHOLD
+
+
+@pytest.mark.parametrize("cuerpo", ["<html>Bad Gateway</html>", {"last_update": "01/03/2025, 12:00 AM"}, ["no", "objeto"]])
+def test_respuesta_invalida_usa_la_tasa_almacenada(client, conn, stub, cuerpo):
+    almacenada = conn.execute("SELECT valor_usd_bs FROM TasasCambio ORDER BY id_tasa DESC LIMIT 1").fetchone()[0]
+    stub.programar(*[(200, cuerpo)] * PYDOLARVE_RETRIES)
+    respuesta = client.get("/dolar")
+    assert respuesta.status_code == 200
+    assert respuesta.json()["valor_usd_bs"] == almacenada
+    # Se reintentó y contó como un fallo de la API
+    assert stub.peticiones == PYDOLARVE_RETRIES
+    assert PyDolarVE.breaker.failures == 1
+    with pytest.raises(RespuestaInvalidaError):
+        stub.programar(*[(200, cuerpo)] * PYDOLARVE_RETRIES)
+        obtener(client)
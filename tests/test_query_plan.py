@@ -0,0 +1,73 @@
+# query_plan_report: las consultas de los servicios no recorren tablas completas tras las migraciones
+import os
+import subprocess
+import sys
+
+import pytest
+
+from database.migrations import run_migrations
+from database.query_plan_report import SERVICE_QUERIES, build_report, is_full_scan
+from tests.conftest import RAIZ
+from tests.test_ledger import ORDENES, crear_base
+
+
+@pytest.fixture(scope="module")
+def base_sin_indices(tmp_path_factory):
+    """Base creada con los scripts de database/, sin aplicar las migraciones."""
+    ruta = str(tmp_path_factory.mktemp("plan") / "sin_indices.db")
+    crear_base(ruta, ORDENES["readme"])
+    return ruta
+
+
+@pytest.fixture(scope="module")
+def base_migrada(tmp_path_factory):
+    ruta = str(tmp_path_factory.mktemp("plan") / "migrada.db")
+    crear_base(ruta, ORDENES["readme"])
+    run_migrations(ruta)
+    return ruta
+
+
+def reporte_cli(ruta: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, os.path.join(RAIZ, "database", "query_plan_report.py")],
+        capture_output=True, text=True, env=dict(os.environ, SQLITE_DB=ruta)
+    )
+
+
+@pytest.mark.parametrize("detalle, recorrido", [
+    ("SCAN Detalle_Venta", True),
+    ("SCAN v", True),
+    ("SCAN Detalle_Venta USING COVERING INDEX idx_detalle_venta_producto", False),
+    ("SCAN CONSTANT ROW", False),
+    ("SEARCH Pagos USING INDEX idx_pagos_id_venta (id_venta=?)", False),
+    ("SCAN subconsulta", False),
+])
+def test_is_full_scan(detalle, recorrido):
+    assert is_full_scan(detalle, {"subconsulta"}) is recorrido
+
+
+def test_base_migrada_sin_recorridos_completos(base_migrada):
+    reporte = build_report(base_migrada)
+    assert [item["descripcion"] for item in reporte] == [descripcion for descripcion, _, _ in SERVICE_QUERIES]
+    assert [item for item in reporte if item["error"]] == []
+    for item in reporte:
+        assert item["plan"], item["descripcion"]
+        assert item["full_scans"] == [], f"{item['descripcion']}: {item['plan']}"
+
+
+def test_sin_indices_marca_los_recorridos(base_sin_indices):
+    reporte = {item["descripcion"]: item for item in build_report(base_sin_indices)}
+    assert reporte["Detalle_Venta por producto"]["full_scans"] == ["SCAN Detalle_Venta"]
+    assert any("SCAN" in d for d in reporte["VentaDetalleService: pago de una venta"]["full_scans"])
+    # Resumen_Ventas_Diarias viene de una migración: sin ella la consulta falla y se informa
+    assert reporte["ReportesService: ventas diarias en un rango"]["error"]
+
+
+def test_cli_codigo_de_salida(base_migrada, base_sin_indices):
+    migrada = reporte_cli(base_migrada)
+    assert migrada.returncode == 0, migrada.stdout
+    assert f"0 de {len(SERVICE_QUERIES)} consultas recorren tablas completas." in migrada.stdout
+
+    sin_indices = reporte_cli(base_sin_indices)
+    assert sin_indices.returncode == 1
+    assert "<-- recorrido completo" in sin_indices.stdout
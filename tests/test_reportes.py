@@ -0,0 +1,175 @@
+# Resumen diario de ventas: /reportes/ventas/* coincide con Ventas, Detalle_Venta y Pagos
+from collections import defaultdict
+
+import pytest
+
+from database.resumen_check import find_drift, rebuild_resumen
+
+CLIENTE = "11223344"
+
+
+def contado(fecha_hora: str, metodo_pago: str, *lineas) -> dict:
+    return {
+        "venta": {"tipo": "de_contado", "fecha_hora": fecha_hora},
+        "detalles": [{"cod_producto": cod, "cantidad_producto": cantidad} for cod, cantidad in lineas],
+        "pago": {"fecha_pago": fecha_hora[:10], "metodo_pago": metodo_pago},
+    }
+
+
+def credito(fecha_hora: str, *lineas, pago_inicial: str = None) -> dict:
+    cuerpo = {
+        "venta": {"tipo": "credito", "ci_cliente": CLIENTE, "fecha_hora": fecha_hora},
+        "detalles": [{"cod_producto": cod, "cantidad_producto": cantidad} for cod, cantidad in lineas],
+        "credito": {
+            "ci_cliente": CLIENTE, "fecha_credito": fecha_hora[:10], "monto_pagado": 0, "estado": "Pendiente"
+        },
+    }
+    if pago_inicial:
+        cuerpo["pago_inicial"] = {"monto": 1.0, "fecha_pago": fecha_hora[:10], "metodo_pago": pago_inicial}
+    return cuerpo
+
+
+def registrar(client, cuerpo: dict) -> int:
+    ruta = "/ventas/registrar_credito" if cuerpo["venta"]["tipo"] == "credito" else "/ventas/registrar"
+    respuesta = client.post(ruta, json=cuerpo)
+    assert respuesta.status_code == 200, respuesta.text
+    return respuesta.json()["id_venta"]
+
+
+def esperado(conn, desde: str, hasta: str, largo: int = 10) -> dict:
+    """Totales calculados desde las tablas de ventas: (período, método, tipo, categoría) -> totales."""
+    totales = defaultdict(lambda: [0, 0, 0.0, 0.0])
+    ventas = conn.execute(
+        """SELECT id_venta, fecha_hora, tipo, monto_total_bs, monto_total_usd FROM Ventas
+           WHERE fecha_hora >= ? AND fecha_hora < ?""",
+        (desde, hasta)
+    ).fetchall()
+    for id_venta, fecha_hora, tipo, monto_bs, monto_usd in ventas:
+        pago = conn.execute(
+            "SELECT metodo_pago FROM Pagos WHERE id_venta = ? ORDER BY id_pago LIMIT 1", (id_venta,)
+        ).fetchone()
+        categorias = conn.execute(
+            """SELECT p.id_categoria, SUM(dv.cantidad_producto), SUM(dv.cantidad_producto * dv.precio_unitario)
+               FROM Detalle_Venta dv JOIN Productos p ON p.cod_producto = dv.cod_producto
+               WHERE dv.id_venta = ? GROUP BY p.id_categoria""",
+            (id_venta,)
+        ).fetchall()
+        subtotal_venta = sum(subtotal for _, _, subtotal in categorias)
+        for id_categoria, unidades, subtotal in categorias:
+            grupo = totales[(fecha_hora[:largo], pago[0] if pago else "sin_pago", tipo, id_categoria)]
+            grupo[0] += 1
+            grupo[1] += unidades
+            grupo[2] += monto_bs * subtotal / subtotal_venta
+            grupo[3] += monto_usd * subtotal / subtotal_venta
+    return {clave: (n, u, round(bs, 2), round(usd, 2)) for clave, (n, u, bs, usd) in totales.items()}
+
+
+def reporte(client, periodo: str, **params) -> dict:
+    respuesta = client.get(f"/reportes/ventas/{periodo}", params=params)
+    assert respuesta.status_code == 200, respuesta.text
+    return {
+        (f["periodo"], f["metodo_pago"], f["tipo_venta"], f["id_categoria"]):
+            (f["num_ventas"], f["unidades"], f["monto_bs"], f["monto_usd"])
+        for f in respuesta.json()
+    }
+
+
+@pytest.fixture
+def productos(nuevo_producto):
+    """Un producto de Refrescos (categoría 5) y uno de Snacks (categoría 4)."""
+    return nuevo_producto(stock=100, precio_usd=2.0, id_categoria=5), nuevo_producto(stock=100, precio_usd=1.0, id_categoria=4)
+
+
+def test_reportes_coinciden_con_las_ventas(client, conn, productos):
+    refresco, snack = productos
+    mixta = registrar(client, contado("2031-01-15T09:30:00", "efectivo_bs", (refresco, 2), (snack, 4)))
+    registrar(client, contado("2031-01-15T18:00:00", "pago_movil", (refresco, 1)))
+    registrar(client, credito("2031-01-31T23:59:00", (snack, 3)))
+    registrar(client, credito("2031-02-03T12:00:00", (refresco, 1), (snack, 1), pago_inicial="debito"))
+
+    diarias = reporte(client, "diarias", fecha_inicio="15/01/2031", fecha_fin="31/01/2031")
+    assert diarias == esperado(conn, "2031-01-15", "2031-02-01")
+    # El último día del rango incluye todas sus horas; el 3 de febrero queda fuera
+    assert ("2031-01-31", "sin_pago", "credito", 4) in diarias
+    assert all(clave[0] < "2031-02-01" for clave in diarias)
+
+    # Subtotales 2 × 2.0 y 4 × 1.0: cada categoría recibe la mitad de los montos de la venta
+    total_bs, total_usd = conn.execute(
+        "SELECT monto_total_bs, monto_total_usd FROM Ventas WHERE id_venta = ?", (mixta,)
+    ).fetchone()
+    assert diarias[("2031-01-15", "efectivo_bs", "de_contado", 5)] == (1, 2, round(total_bs / 2, 2), round(total_usd / 2, 2))
+    assert diarias[("2031-01-15", "efectivo_bs", "de_contado", 4)] == (1, 4, round(total_bs / 2, 2), round(total_usd / 2, 2))
+
+    mensuales = reporte(client, "mensuales", fecha_inicio="01/01/2031", fecha_fin="28/02/2031")
+    assert mensuales == esperado(conn, "2031-01-01", "2031-03-01", largo=7)
+    assert mensuales[("2031-02", "debito", "credito", 4)][0] == 1
+
+
+def test_filtros_del_reporte(client, conn, productos):
+    refresco, snack = productos
+    registrar(client, contado("2032-03-10T10:00:00", "efectivo_usd", (refresco, 1), (snack, 1)))
+    registrar(client, credito("2032-03-11T10:00:00", (refresco, 2)))
+    registrar(client, credito("2032-03-12T10:00:00", (snack, 5), pago_inicial="transferencia"))
+    rango = {"fecha_inicio": "01/03/2032", "fecha_fin": "31/03/2032"}
+    todos = esperado(conn, "2032-03-01", "2032-04-01", largo=7)
+
+    sin_pago = reporte(client, "mensuales", metodo_pago="sin_pago", **rango)
+    assert sin_pago == {clave: v for clave, v in todos.items() if clave[1] == "sin_pago"}
+    assert sin_pago == {("2032-03", "sin_pago", "credito", 5): sin_pago[("2032-03", "sin_pago", "credito", 5)]}
+
+    creditos = reporte(client, "mensuales", tipo_venta="credito", **rango)
+    assert creditos == {clave: v for clave, v in todos.items() if clave[2] == "credito"}
+    assert len(creditos) == 2
+
+    snacks = reporte(client, "diarias", id_categoria=4, **rango)
+    assert {clave[0] for clave in snacks} == {"2032-03-10", "2032-03-12"}
+    assert sum(v[1] for v in snacks.values()) == 6
+
+
+def test_cambios_por_crud_mantienen_el_resumen(client, conn, db_path, productos):
+    refresco, snack = productos
+    id_venta = registrar(client, contado("2033-05-20T10:00:00", "debito", (refresco, 2), (snack, 2)))
+
+    # Mover la venta a otro día
+    venta = client.get(f"/ventas/{id_venta}").json()
+    assert client.put(f"/ventas/{id_venta}", json={**venta, "fecha_hora": "2033-05-21T10:00:00"}).status_code == 200
+    assert find_drift(db_path) == []
+    diarias = reporte(client, "diarias", fecha_inicio="20/05/2033", fecha_fin="21/05/2033")
+    assert {clave[0] for clave in diarias} == {"2033-05-21"}
+
+    # Quitar una línea de la venta
+    id_detalle = conn.execute(
+        "SELECT id_detalle FROM Detalle_Venta WHERE id_venta = ? AND cod_producto = ?", (id_venta, snack)
+    ).fetchone()[0]
+    assert client.delete(f"/detalle_venta/{id_detalle}").status_code == 200
+    assert find_drift(db_path) == []
+
+    # Agregar otra línea con la carga masiva
+    linea = {"id_venta": id_venta, "cod_producto": snack, "cantidad_producto": 7, "precio_unitario": 1.0}
+    assert client.post("/detalle_venta/bulk", json=[linea]).status_code == 200
+    assert find_drift(db_path) == []
+
+    # Sin su pago, la venta pasa al grupo 'sin_pago'
+    id_pago = conn.execute("SELECT id_pago FROM Pagos WHERE id_venta = ?", (id_venta,)).fetchone()[0]
+    assert client.delete(f"/pagos/{id_pago}").status_code == 200
+    assert find_drift(db_path) == []
+    diarias = reporte(client, "diarias", fecha_inicio="21/05/2033", fecha_fin="21/05/2033")
+    assert diarias == esperado(conn, "2033-05-21", "2033-05-22")
+    assert {clave[1] for clave in diarias} == {"sin_pago"}
+
+
+def test_reconstruir_corrige_el_resumen(client, conn, db_path, productos):
+    refresco, _ = productos
+    registrar(client, contado("2034-07-01T10:00:00", "efectivo_bs", (refresco, 1)))
+    conn.execute("UPDATE Resumen_Ventas_Diarias SET num_ventas = num_ventas + 5 WHERE fecha = '2034-07-01'")
+    conn.execute(
+        """INSERT INTO Resumen_Ventas_Diarias (fecha, metodo_pago, tipo_venta, id_categoria, num_ventas, unidades, monto_bs, monto_usd)
+           VALUES ('2034-07-02', 'debito', 'de_contado', 5, 1, 1, 10, 1)"""
+    )
+    conn.commit()
+
+    descuadres = find_drift(db_path)
+    assert {(d["fecha"], d["metodo_pago"]) for d in descuadres} == {("2034-07-01", "efectivo_bs"), ("2034-07-02", "debito")}
+    assert len(rebuild_resumen(db_path)) == 2
+    assert find_drift(db_path) == []
+    assert reporte(client, "diarias", fecha_inicio="01/07/2034", fecha_fin="02/07/2034") == esperado(conn, "2034-07-01", "2034-07-03")
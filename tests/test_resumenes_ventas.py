@@ -0,0 +1,42 @@
+# Resúmenes de ventas: clientes y pagos se cargan en lote, no con una consulta por venta
+from database.pool import get_pool
+from backend.services.services import vistaVentas_services
+
+
+def resumenes_con_consultas(db_path, **filtros):
+    """Ejecuta obtener_resumenes_ventas y devuelve los resúmenes y las sentencias ejecutadas."""
+    sentencias = []
+    # El servicio reutiliza la conexión que este hilo ya tiene prestada, así se trazan sus consultas
+    with get_pool(db_path).connection() as conn:
+        conn.set_trace_callback(sentencias.append)
+        try:
+            resumenes, _ = vistaVentas_services.obtener_resumenes_ventas(**filtros)
+        finally:
+            conn.set_trace_callback(None)
+    return resumenes, [s for s in sentencias if s.lstrip().upper().startswith(("SELECT", "WITH"))]
+
+
+def test_consultas_no_crecen_con_las_ventas(client, db_path, nuevo_producto, venta_contado):
+    cod = nuevo_producto(stock=50)
+    ci_cliente = "87654321"
+
+    def vender():
+        cuerpo = venta_contado((cod, 1))
+        cuerpo["venta"]["ci_cliente"] = ci_cliente
+        assert client.post("/ventas/registrar", json=cuerpo).status_code == 200
+
+    vender()
+    resumenes, consultas_una = resumenes_con_consultas(db_path, ci_cliente=ci_cliente)
+    assert len(resumenes) == 1
+
+    for _ in range(9):
+        vender()
+    resumenes, consultas_diez = resumenes_con_consultas(db_path, ci_cliente=ci_cliente)
+    assert len(resumenes) == 10
+    # Ventas, clientes y pagos: una consulta cada una, sin importar cuántas ventas haya
+    assert len(consultas_diez) == len(consultas_una) == 3
+
+    for resumen in resumenes:
+        assert resumen.cliente.ci_cliente == ci_cliente
+        assert resumen.pago.id_venta == resumen.venta.id_venta
+        assert resumen.cantidad_productos == 1
@@ -0,0 +1,138 @@
+# Job diario de la tasa BCV: reintentos, recuperación al iniciar y métricas
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import backend.utilities.apscheduler as scheduler_config
+from backend.models.models import TasaCambio
+
+CARACAS = scheduler_config.venezuela_tz
+REINTENTO = f"{scheduler_config.JOB_ID}_reintento"
+RECUPERACION = f"{scheduler_config.JOB_ID}_recuperacion"
+
+
+def tasa(fecha: datetime) -> TasaCambio:
+    return TasaCambio(fecha=fecha, valor_usd_bs=40.0, origen="BCV")
+
+
+@pytest.fixture
+def sin_jobs_extra(client):
+    """Quita los jobs de reintento / recuperación que programe la prueba."""
+    yield
+    for job_id in (REINTENTO, RECUPERACION):
+        if scheduler_config.scheduler.get_job(job_id):
+            client.portal.call(scheduler_config.scheduler.remove_job, job_id)
+
+
+@pytest.mark.parametrize("hora, ultima, pendiente", [
+    ((16, 0), None, False),                         # aún no es la hora del job
+    ((16, 1), None, True),                          # nunca se guardó una tasa
+    ((18, 30), (0, 9), False),                      # ya hay tasa de hoy
+    ((18, 30), (-1, 16), True),                     # la última es de ayer
+])
+def test_tasa_pendiente(hora, ultima, pendiente):
+    ahora = CARACAS.localize(datetime(2025, 3, 10, *hora))
+    registro = None
+    if ultima:
+        dias, h = ultima
+        registro = tasa(datetime(2025, 3, 10, h) + timedelta(days=dias))
+    assert scheduler_config.tasa_pendiente(registro, ahora) is pendiente
+
+
+def test_recuperar_ejecucion_perdida(client, monkeypatch, sin_jobs_extra):
+    llamadas, consultas = [], []
+    ayer = tasa(datetime.now(CARACAS).replace(tzinfo=None) - timedelta(days=1))
+
+    async def guardar(intento: int = 0):
+        llamadas.append(intento)
+
+    async def ultima(id_field):
+        return ayer
+
+    def pendiente(registro, ahora):
+        consultas.append(registro)
+        return True     # la hora del job ya pasó, sin importar cuándo corra la prueba
+
+    monkeypatch.setattr(scheduler_config, "guardar_tasa_automatica", guardar)
+    monkeypatch.setattr(scheduler_config, "tasa_pendiente", pendiente)
+    monkeypatch.setattr(scheduler_config.tasasCambio_controller, "aget_last_record", ultima)
+    recuperaciones = scheduler_config.job_metrics["recuperaciones_programadas"]
+
+    assert client.portal.call(scheduler_config.recuperar_ejecucion_perdida) is True
+    assert consultas == [ayer]
+    assert scheduler_config.job_metrics["recuperaciones_programadas"] == recuperaciones + 1
+    # El job se ejecuta de inmediato en el event loop de la app
+    for _ in range(100):
+        if llamadas:
+            break
+        client.portal.call(asyncio.sleep, 0.02)
+    assert llamadas == [0]
+
+    monkeypatch.setattr(scheduler_config, "tasa_pendiente", lambda registro, ahora: False)
+    assert client.portal.call(scheduler_config.recuperar_ejecucion_perdida) is False
+    assert scheduler_config.job_metrics["recuperaciones_programadas"] == recuperaciones + 1
+
+
+def test_programar_reintento(client, monkeypatch, sin_jobs_extra):
+    monkeypatch.setattr(scheduler_config, "JOB_RETRY_DELAY", 3600)
+    programados = scheduler_config.job_metrics["reintentos_programados"]
+
+    client.portal.call(scheduler_config._programar_reintento, 2)
+    job = scheduler_config.scheduler.get_job(REINTENTO)
+    assert job.kwargs == {"intento": 2}
+    espera = (job.next_run_time - datetime.now(CARACAS)).total_seconds()
+    assert 3590 < espera <= 3600
+    assert scheduler_config.job_metrics["reintentos_programados"] == programados + 1
+
+    # Tras JOB_MAX_RETRIES no se programan más reintentos
+    client.portal.call(scheduler_config.scheduler.remove_job, REINTENTO)
+    client.portal.call(scheduler_config._programar_reintento, scheduler_config.JOB_MAX_RETRIES + 1)
+    assert scheduler_config.scheduler.get_job(REINTENTO) is None
+    assert scheduler_config.job_metrics["reintentos_programados"] == programados + 1
+
+
+def test_fallo_del_job_programa_un_reintento(client, monkeypatch, sin_jobs_extra):
+    async def api_caida(self, fallback=True):
+        raise RuntimeError("API caída")
+
+    monkeypatch.setattr(scheduler_config, "JOB_RETRY_DELAY", 3600)
+    monkeypatch.setattr(scheduler_config.PyDolarVE, "get_precio_dolar", api_caida)
+    antes = dict(scheduler_config.job_metrics)
+
+    client.portal.call(scheduler_config.guardar_tasa_automatica, 1)
+    metricas = scheduler_config.job_metrics
+    assert metricas["ejecuciones"] == antes["ejecuciones"] + 1
+    assert metricas["fallos"] == antes["fallos"] + 1
+    assert metricas["ultimo_error"] == "API caída"
+    assert scheduler_config.scheduler.get_job(REINTENTO).kwargs == {"intento": 2}
+
+
+def test_exito_del_job_guarda_la_tasa(client, monkeypatch):
+    guardadas = []
+
+    async def api(self, fallback=True):
+        return tasa(datetime.now())
+
+    async def crear(obj):
+        guardadas.append(obj)
+        return obj
+
+    monkeypatch.setattr(scheduler_config.PyDolarVE, "get_precio_dolar", api)
+    monkeypatch.setattr(scheduler_config.tasasCambio_controller, "acreate", crear)
+    exitos = scheduler_config.job_metrics["exitos"]
+
+    client.portal.call(scheduler_config.guardar_tasa_automatica)
+    assert [t.valor_usd_bs for t in guardadas] == [40.0]
+    assert scheduler_config.job_metrics["exitos"] == exitos + 1
+    assert scheduler_config.job_metrics["ultimo_error"] is None
+    assert scheduler_config.job_metrics["ultima_duracion_ms"] >= 0
+
+
+def test_metricas_scheduler(client):
+    cuerpo = client.get("/metricas/scheduler").json()
+    assert cuerpo["running"] is True
+    assert set(scheduler_config.job_metrics) <= set(cuerpo)
+    proxima = datetime.fromisoformat(cuerpo["proxima_ejecucion"])
+    assert (proxima.hour, proxima.minute) == (scheduler_config.JOB_HOUR, scheduler_config.JOB_MINUTE)
+    assert proxima > datetime.now(CARACAS)
@@ -0,0 +1,35 @@
+# Caché de sentencias de BaseService: el SQL se construye una vez y se reutiliza
+from backend.models.models import Cliente
+from backend.services.base_service import BaseService
+
+
+def test_statement_construye_una_sola_vez(db_path):
+    service = BaseService(Cliente, "Clientes", db_path)
+    construcciones = []
+
+    def build():
+        construcciones.append(1)
+        return "SELECT 1"
+
+    primera = service._statement(("prueba",), build)
+    segunda = service._statement(("prueba",), build)
+    assert len(construcciones) == 1
+    assert primera is segunda
+
+
+def test_lecturas_reutilizan_la_sentencia(db_path):
+    service = BaseService(Cliente, "Clientes", db_path)
+    antes = set(service._statements)
+
+    for ci in (12345678, 87654321, 11223344, 1):
+        service.get_by_id("ci_cliente", ci)
+    for after in (None, [12345678], [87654321]):
+        service.list_page(["ci_cliente"], limit=1, after=after)
+
+    nuevas = set(service._statements) - antes
+    claves = sorted(k[0] for k in nuevas)
+    # Una sentencia por forma de consulta: get_by_id, primera página y páginas siguientes
+    assert claves == ["get_by_id", "list_page", "list_page"]
+    sql = service._statements[("get_by_id", "ci_cliente")]
+    service.get_by_id("ci_cliente", 12345678)
+    assert service._statements[("get_by_id", "ci_cliente")] is sql
@@ -0,0 +1,41 @@
+# Lecturas CRUD serializadas con TypeAdapter: mismo JSON que la serialización por defecto de FastAPI
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from backend.controllers.controller import (
+    clientes_controller, productos_controller, tasasCambio_controller, ventas_controller
+)
+
+ENTIDADES = [
+    ("clientes", clientes_controller, "ci_cliente"),
+    ("productos", productos_controller, "cod_producto"),
+    ("tasas_cambio", tasasCambio_controller, "id_tasa"),
+    ("ventas", ventas_controller, "id_venta"),
+]
+
+
+@pytest.mark.parametrize("ruta, controller, id_field", ENTIDADES)
+def test_listado_igual_a_jsonable_encoder(client, ruta, controller, id_field):
+    respuesta = client.get(f"/{ruta}/")
+    assert respuesta.status_code == 200
+    assert respuesta.headers["content-type"] == "application/json"
+    registros, _ = controller.list_page([id_field], limit=None)
+    assert respuesta.json() == jsonable_encoder(registros)
+
+
+@pytest.mark.parametrize("ruta, controller, id_field", ENTIDADES)
+def test_registro_igual_a_jsonable_encoder(client, ruta, controller, id_field, nuevo_producto, venta_contado):
+    # Al menos una venta (con sus fechas y montos) para serializar
+    client.post("/ventas/registrar", json=venta_contado((nuevo_producto(), 1)))
+    registro = controller.get_all()[0]
+    id_value = getattr(registro, id_field)
+    respuesta = client.get(f"/{ruta}/{id_value}")
+    assert respuesta.status_code == 200
+    assert respuesta.json() == jsonable_encoder(controller.get_by_id(id_field, id_value))
+
+
+def test_proyeccion_igual_a_los_campos_del_modelo(client):
+    respuesta = client.get("/clientes/", params={"fields": "nombre"})
+    registros, _ = clientes_controller.list_page(["ci_cliente"], limit=None)
+    esperado = [{"ci_cliente": c.ci_cliente, "nombre": c.nombre} for c in registros]
+    assert respuesta.json() == jsonable_encoder(esperado)
@@ -0,0 +1,50 @@
+# Estrés de sobreventa: varios hilos compiten por las últimas unidades de un producto
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+HILOS = 20
+DISPONIBLE = 7
+
+
+def test_no_se_vende_mas_de_lo_disponible(client, db_path, nuevo_producto, venta_contado):
+    cod = nuevo_producto(stock=DISPONIBLE)
+    barrera = threading.Barrier(HILOS)
+    terminado = threading.Event()
+    minimo = [DISPONIBLE]
+
+    def vigilar():
+        lector = sqlite3.connect(db_path, timeout=10)
+        try:
+            while not terminado.is_set():
+                cant = lector.execute(
+                    "SELECT cant_actual FROM Productos_noPreparados WHERE cod_producto_noPreparado = ?", (cod,)
+                ).fetchone()[0]
+                minimo[0] = min(minimo[0], cant)
+        finally:
+            lector.close()
+
+    def vender(_):
+        barrera.wait()
+        return client.post("/ventas/registrar", json=venta_contado((cod, 1)))
+
+    vigia = threading.Thread(target=vigilar)
+    vigia.start()
+    try:
+        with ThreadPoolExecutor(max_workers=HILOS) as pool:
+            respuestas = list(pool.map(vender, range(HILOS)))
+    finally:
+        terminado.set()
+        vigia.join()
+
+    exitos = [r for r in respuestas if r.status_code == 200]
+    rechazos = [r for r in respuestas if r.status_code != 200]
+    assert len(exitos) == DISPONIBLE
+    assert all(r.status_code == 409 and r.json()["detail"]["error"] == "Stock insuficiente" for r in rechazos)
+    assert minimo[0] >= 0
+
+    with sqlite3.connect(db_path) as conn:
+        cant = conn.execute(
+            "SELECT cant_actual FROM Productos_noPreparados WHERE cod_producto_noPreparado = ?", (cod,)
+        ).fetchone()[0]
+    assert cant == 0
@@ -0,0 +1,92 @@
+# Ventas e inventario: validación de stock y detalles en sentencias por lote
+from backend.models.models import DetalleVenta
+from backend.services.transactions.inventario_transactions import verificar_stock
+from backend.services.transactions.venta_transactions import insertar_detalles
+from database.pool import get_pool
+
+
+class CursorEspia:
+    """Cursor que cuenta las llamadas a execute y executemany."""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.execute_llamadas = 0
+        self.executemany_llamadas = 0
+
+    def execute(self, *args):
+        self.execute_llamadas += 1
+        return self.cursor.execute(*args)
+
+    def executemany(self, *args):
+        self.executemany_llamadas += 1
+        return self.cursor.executemany(*args)
+
+    def __getattr__(self, nombre):
+        return getattr(self.cursor, nombre)
+
+
+def detalles(*lineas):
+    return [DetalleVenta(cod_producto=cod, cantidad_producto=cantidad, precio_unitario=1.0) for cod, cantidad in lineas]
+
+
+def test_verificar_stock_usa_una_consulta(db_path, nuevo_producto):
+    codigos = [nuevo_producto(stock=10) for _ in range(5)]
+    with get_pool(db_path).connection() as conn:
+        espia = CursorEspia(conn.cursor())
+        # Un producto repetido en dos líneas suma sus cantidades
+        resultado = verificar_stock(espia, detalles(*[(cod, 2) for cod in codigos], (codigos[0], 3)))
+    assert espia.execute_llamadas == 1
+    assert resultado[codigos[0]] == {"cant_actual": 10, "nueva_cantidad": 5}
+    assert all(resultado[cod]["nueva_cantidad"] == 8 for cod in codigos[1:])
+
+
+def test_insertar_detalles_usa_un_executemany(db_path, nuevo_producto):
+    codigos = [nuevo_producto() for _ in range(20)]
+    with get_pool(db_path).connection() as conn:
+        try:
+            id_venta = conn.execute(
+                "INSERT INTO Ventas (monto_total_bs, monto_total_usd, tipo) VALUES (1, 1, 'de_contado')"
+            ).lastrowid
+            espia = CursorEspia(conn.cursor())
+            insertar_detalles(espia, id_venta, detalles(*[(cod, 1) for cod in codigos]))
+            insertados = conn.execute(
+                "SELECT cod_producto FROM Detalle_Venta WHERE id_venta = ? ORDER BY id_detalle", (id_venta,)
+            ).fetchall()
+        finally:
+            conn.rollback()
+    assert (espia.execute_llamadas, espia.executemany_llamadas) == (0, 1)
+    assert [fila[0] for fila in insertados] == codigos
+
+
+def test_venta_con_varias_lineas(client, conn, nuevo_producto, venta_contado):
+    a, b = nuevo_producto(stock=10, precio_usd=2.0), nuevo_producto(stock=5, precio_usd=1.5)
+    respuesta = client.post("/ventas/registrar", json=venta_contado((a, 3), (b, 2), (a, 1)))
+    assert respuesta.status_code == 200
+    id_venta = respuesta.json()["id_venta"]
+
+    lineas = conn.execute(
+        "SELECT cod_producto, cantidad_producto, precio_unitario FROM Detalle_Venta WHERE id_venta = ? ORDER BY id_detalle",
+        (id_venta,)
+    ).fetchall()
+    assert lineas == [(a, 3, 2.0), (b, 2, 1.5), (a, 1, 2.0)]
+    stock = dict(conn.execute(
+        "SELECT cod_producto_noPreparado, cant_actual FROM Productos_noPreparados WHERE cod_producto_noPreparado IN (?, ?)",
+        (a, b)
+    ))
+    assert stock == {a: 6, b: 3}
+    salidas = dict(conn.execute(
+        "SELECT cod_producto, SUM(cant_movida) FROM Movimientos WHERE comentario = ? GROUP BY cod_producto",
+        (f"Venta #{id_venta}",)
+    ))
+    assert salidas == {a: 4, b: 2}
+
+
+def test_venta_sin_stock_no_escribe_nada(client, conn, nuevo_producto, venta_contado):
+    a, b = nuevo_producto(stock=10), nuevo_producto(stock=1)
+    ventas_antes = conn.execute("SELECT COUNT(*) FROM Ventas").fetchone()[0]
+    respuesta = client.post("/ventas/registrar", json=venta_contado((a, 2), (b, 2)))
+    assert respuesta.status_code == 409
+    assert conn.execute("SELECT COUNT(*) FROM Ventas").fetchone()[0] == ventas_antes
+    assert conn.execute(
+        "SELECT cant_actual FROM Productos_noPreparados WHERE cod_producto_noPreparado = ?", (a,)
+    ).fetchone()[0] == 10
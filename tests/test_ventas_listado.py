@@ -0,0 +1,123 @@
+# GET /ventas/listar/: orden por fecha, rango de fechas inclusivo y paginación por cursor
+import sqlite3
+
+import pytest
+
+from backend.services.services import precios_service
+
+COD = "LIST0001"
+
+
+def registrar(client, fecha_hora: str, cod: str) -> int:
+    cuerpo = {
+        "venta": {"tipo": "de_contado", "fecha_hora": fecha_hora},
+        "detalles": [{"cod_producto": cod, "cantidad_producto": 1}],
+        "pago": {"fecha_pago": fecha_hora[:10], "metodo_pago": "efectivo_bs"},
+    }
+    respuesta = client.post("/ventas/registrar", json=cuerpo)
+    assert respuesta.status_code == 200, respuesta.text
+    return respuesta.json()["id_venta"]
+
+
+def recorrer(client, limit: int, **params) -> list:
+    """Sigue X-Next-Cursor hasta la última página; devuelve los id_venta en el orden recibido."""
+    ids, cursor, paginas = [], None, 0
+    while True:
+        consulta = {**params, "limit": limit}
+        if cursor:
+            consulta["cursor"] = cursor
+        respuesta = client.get("/ventas/listar/", params=consulta)
+        assert respuesta.status_code == 200, respuesta.text
+        pagina = respuesta.json()
+        assert len(pagina) <= limit
+        ids.extend(r["venta"]["id_venta"] for r in pagina)
+        paginas += 1
+        cursor = respuesta.headers.get("x-next-cursor")
+        if not cursor:
+            return ids
+        assert paginas < 50, "el cursor no avanza"
+
+
+@pytest.fixture(scope="module")
+def ventas(client, db_path):
+    """
+    Ventas alrededor del cambio de mes 08/2035 → 09/2035 (registradas una vez para todo el
+    módulo; ninguna otra prueba usa esas fechas): fecha_hora -> id_venta.
+    """
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "INSERT INTO Productos (cod_producto, nombre, precio_usd, id_categoria) VALUES (?, 'Listado', 1.0, 5)", (COD,)
+        )
+        conn.execute(
+            """INSERT INTO Productos_noPreparados (
+                cod_producto_noPreparado, cant_min, cant_actual, costo_compra, unidad_medida, Rif
+            ) VALUES (?, 1, 50, 0.5, 'unidad', 'J-12345678-9')""",
+            (COD,)
+        )
+    conn.close()
+    precios_service.invalidar()
+    fechas = [
+        "2035-08-29T23:59:59",      # antes del rango
+        "2035-08-30T00:00:00",
+        "2035-08-31T09:00:00",
+        "2035-08-31T23:59:30",
+        "2035-09-01T00:00:00",
+        "2035-09-01T12:00:00",
+        "2035-09-01T23:59:59",      # último segundo del día final
+        "2035-09-02T00:00:00",      # después del rango
+    ]
+    registradas = {fecha: registrar(client, fecha, COD) for fecha in fechas}
+    # Dos ventas a la misma hora: desempata id_venta
+    registradas["2035-08-31T09:00:00#2"] = registrar(client, "2035-08-31T09:00:00", COD)
+    return registradas
+
+
+def test_orden_y_rango_inclusivo(client, ventas):
+    esperados = [
+        ventas["2035-09-01T23:59:59"],
+        ventas["2035-09-01T12:00:00"],
+        ventas["2035-09-01T00:00:00"],
+        ventas["2035-08-31T23:59:30"],
+        ventas["2035-08-31T09:00:00#2"],
+        ventas["2035-08-31T09:00:00"],
+        ventas["2035-08-30T00:00:00"],
+    ]
+    respuesta = client.get("/ventas/listar/", params={"fecha_inicio": "30/08/2035", "fecha_fin": "01/09/2035"})
+    assert respuesta.status_code == 200
+    assert [r["venta"]["id_venta"] for r in respuesta.json()] == esperados
+    assert "x-next-cursor" not in respuesta.headers
+    assert respuesta.json()[0]["fecha_formateada"] == "01/09/2035"
+    assert respuesta.json()[0]["hora_formateada"] == "23:59"
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 7])
+def test_cursor_devuelve_cada_venta_una_vez(client, ventas, limit):
+    rango = {"fecha_inicio": "29/08/2035", "fecha_fin": "02/09/2035"}
+    completa = client.get("/ventas/listar/", params=rango).json()
+    ids = recorrer(client, limit, **rango)
+    assert ids == [r["venta"]["id_venta"] for r in completa]
+    assert sorted(ids) == sorted(ventas.values())
+
+
+def test_un_solo_dia(client, ventas):
+    respuesta = client.get("/ventas/listar/", params={"fecha_inicio": "01/09/2035", "fecha_fin": "01/09/2035"})
+    assert [r["fecha_formateada"] for r in respuesta.json()] == ["01/09/2035"] * 3
+
+
+def test_formato_de_fecha_invalido(client):
+    respuesta = client.get("/ventas/listar/", params={"fecha_inicio": "2035-08-30"})
+    assert respuesta.status_code == 400
+    assert respuesta.json()["detail"] == "Formato de fecha inválido. Use DD/MM/YYYY"
+
+
+@pytest.mark.parametrize("params", [
+    {"fecha_inicio": "2035-08-30"},
+    {"fecha_fin": "31/02/2035"},
+    {"fecha_inicio": "30/08/35", "fecha_fin": "01/09/2035"},
+])
+def test_fecha_invalida_responde_400(client, params):
+    assert client.get("/ventas/listar/", params=params).status_code == 400
+
+
+def test_cursor_invalido_responde_400(client):
+    assert client.get("/ventas/listar/", params={"cursor": "no-es-un-cursor"}).status_code == 400
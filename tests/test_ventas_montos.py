@@ -0,0 +1,55 @@
+# Montos de la venta: los calcula el servidor, después de buscar la clave de idempotencia
+import uuid
+
+from backend.services.services import precios_service
+
+
+def total_venta(conn, id_venta: int) -> float:
+    return conn.execute("SELECT monto_total_bs FROM Ventas WHERE id_venta = ?", (id_venta,)).fetchone()[0]
+
+
+def monto_pago(conn, id_venta: int) -> float:
+    return conn.execute("SELECT monto FROM Pagos WHERE id_venta = ?", (id_venta,)).fetchone()[0]
+
+
+def test_pago_sin_monto_registra_el_total(client, conn, nuevo_producto, venta_contado):
+    respuesta = client.post("/ventas/registrar", json=venta_contado((nuevo_producto(precio_usd=2.0), 3)))
+    assert respuesta.status_code == 200
+    id_venta = respuesta.json()["id_venta"]
+    assert monto_pago(conn, id_venta) == total_venta(conn, id_venta)
+
+
+def test_pago_tolera_un_centimo(client, conn, nuevo_producto, venta_contado):
+    cod = nuevo_producto(stock=10, precio_usd=1.37)
+    referencia = client.post("/ventas/registrar", json=venta_contado((cod, 1))).json()["id_venta"]
+    total = total_venta(conn, referencia)
+
+    cuerpo = venta_contado((cod, 1))
+    cuerpo["pago"]["monto"] = round(total + 0.01, 2)
+    respuesta = client.post("/ventas/registrar", json=cuerpo)
+    assert respuesta.status_code == 200
+    # Se registra el total del servidor, no el monto redondeado de la caja
+    assert monto_pago(conn, respuesta.json()["id_venta"]) == total
+
+    cuerpo["pago"]["monto"] = round(total + 0.05, 2)
+    assert client.post("/ventas/registrar", json=cuerpo).status_code == 422
+
+
+def test_reintento_tras_cambio_de_precio(client, conn, nuevo_producto, venta_contado):
+    cod = nuevo_producto(stock=10, precio_usd=2.0)
+    cabeceras = {"Idempotency-Key": str(uuid.uuid4())}
+    cuerpo = venta_contado((cod, 2))
+    primera = client.post("/ventas/registrar", json=cuerpo, headers=cabeceras)
+    assert primera.status_code == 200
+
+    conn.execute("UPDATE Productos SET precio_usd = 3.0 WHERE cod_producto = ?", (cod,))
+    conn.commit()
+    precios_service.invalidar()
+
+    segunda = client.post("/ventas/registrar", json=cuerpo, headers=cabeceras)
+    assert segunda.status_code == 200
+    assert segunda.json() == primera.json()
+    assert conn.execute("SELECT COUNT(*) FROM Detalle_Venta WHERE cod_producto = ?", (cod,)).fetchone()[0] == 1
+    assert conn.execute(
+        "SELECT cant_actual FROM Productos_noPreparados WHERE cod_producto_noPreparado = ?", (cod,)
+    ).fetchone()[0] == 8
@@ -0,0 +1,194 @@
+# Escritor único: lotes con un solo COMMIT, SAVEPOINT por operación, timeouts y métricas
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from database.pool import ConnectionPool
+from database.writer import DBWriter, WriterTimeoutError, get_writer
+
+
+@pytest.fixture
+def escritor(tmp_path):
+    """Escritor sobre una base propia; la ventana larga hace que las escrituras concurrentes formen un lote."""
+    ruta = str(tmp_path / "escritor.db")
+    with sqlite3.connect(ruta) as conn:
+        conn.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE Padre (id INTEGER PRIMARY KEY);
+            CREATE TABLE Hijo (
+                id INTEGER PRIMARY KEY,
+                id_padre INTEGER REFERENCES Padre(id) DEFERRABLE INITIALLY DEFERRED
+            );
+            CREATE TABLE Registro (valor INTEGER NOT NULL UNIQUE);
+        """)
+    pool = ConnectionPool(ruta, size=2)
+    pool.configure(lambda conn: conn.executescript("PRAGMA foreign_keys = ON; PRAGMA busy_timeout = 50;"))
+    writer = DBWriter(pool, max_batch=20, batch_window=0.5, timeout=5)
+    yield writer
+    writer.close()
+    pool.close()
+
+
+def insertar(writer: DBWriter, valor: int) -> int:
+    with writer.pool.connection() as conn:
+        conn.execute("INSERT INTO Registro (valor) VALUES (?)", (valor,))
+    return valor
+
+
+def insertar_y_fallar(writer: DBWriter, valor: int) -> None:
+    insertar(writer, valor)
+    raise ValueError(f"falla la operación {valor}")
+
+
+def valores(writer: DBWriter) -> list:
+    with writer.pool.connection() as conn:
+        return [fila[0] for fila in conn.execute("SELECT valor FROM Registro ORDER BY valor")]
+
+
+def enviar_juntas(writer: DBWriter, trabajos: list) -> list:
+    """Envía las operaciones a la vez desde varios hilos; devuelve el resultado o la excepción de cada una."""
+    barrera = threading.Barrier(len(trabajos))
+
+    def enviar(trabajo):
+        fn, *args = trabajo
+        barrera.wait()
+        try:
+            return writer.submit(fn, writer, *args)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(len(trabajos)) as executor:
+        return list(executor.map(enviar, trabajos))
+
+
+def test_escrituras_concurrentes_en_un_lote(escritor):
+    resultados = enviar_juntas(escritor, [(insertar, valor) for valor in range(10)])
+    assert sorted(resultados) == list(range(10))
+    assert valores(escritor) == list(range(10))
+    stats = escritor.stats()
+    assert (stats["batches"], stats["completed"], stats["max_batch_size"]) == (1, 10, 10)
+
+
+def test_operacion_fallida_vuelve_a_su_savepoint(escritor):
+    trabajos = [(insertar, 1), (insertar_y_fallar, 2), (insertar, 3), (insertar, 1)]
+    resultados = enviar_juntas(escritor, trabajos)
+
+    errores = [r for r in resultados if isinstance(r, Exception)]
+    assert sorted(type(e).__name__ for e in errores) == ["IntegrityError", "ValueError"]
+    # Sólo se deshace lo de las operaciones fallidas; el resto del lote se confirma
+    assert valores(escritor) == [1, 3]
+    stats = escritor.stats()
+    assert (stats["batches"], stats["completed"], stats["failed"], stats["failed_commits"]) == (1, 2, 2, 0)
+
+
+def test_begin_fallido_falla_todo_el_lote(escritor):
+    bloqueo = sqlite3.connect(escritor.pool.db_path)
+    bloqueo.execute("BEGIN IMMEDIATE")
+    try:
+        resultados = enviar_juntas(escritor, [(insertar, valor) for valor in range(3)])
+    finally:
+        bloqueo.rollback()
+        bloqueo.close()
+
+    assert all(isinstance(r, sqlite3.OperationalError) for r in resultados)
+    assert valores(escritor) == []
+    stats = escritor.stats()
+    assert (stats["batches"], stats["failed"], stats["failed_commits"]) == (1, 3, 1)
+
+    # El escritor sigue funcionando tras el lote fallido
+    assert escritor.submit(insertar, escritor, 7) == 7
+    assert valores(escritor) == [7]
+
+
+def test_commit_fallido_falla_todo_el_lote(escritor):
+    def hijo_sin_padre(writer: DBWriter, _) -> None:
+        # La clave foránea diferida sólo se verifica en el COMMIT
+        with writer.pool.connection() as conn:
+            conn.execute("INSERT INTO Hijo (id_padre) VALUES (999)")
+
+    resultados = enviar_juntas(escritor, [(insertar, 1), (hijo_sin_padre, None), (insertar, 2)])
+
+    assert all(isinstance(r, sqlite3.IntegrityError) for r in resultados)
+    assert valores(escritor) == []
+    with escritor.pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM Hijo").fetchone()[0] == 0
+    stats = escritor.stats()
+    assert (stats["completed"], stats["failed"], stats["failed_commits"]) == (0, 3, 1)
+
+
+def bloquear(writer: DBWriter) -> tuple:
+    """Ocupa el hilo del escritor hasta que se libere el evento devuelto."""
+    en_curso, liberar = threading.Event(), threading.Event()
+
+    def ocupar():
+        en_curso.set()
+        liberar.wait(10)
+
+    hilo = threading.Thread(target=writer.submit, args=(ocupar,))
+    hilo.start()
+    assert en_curso.wait(5)
+    return liberar, hilo
+
+
+def test_profundidad_de_cola_y_latencias(escritor):
+    escritor.batch_window = 0
+    liberar, hilo = bloquear(escritor)
+    with ThreadPoolExecutor(3) as executor:
+        pendientes = [executor.submit(escritor.submit, insertar, escritor, valor) for valor in range(3)]
+        try:
+            while escritor.stats()["queue_depth"] < 3:
+                threading.Event().wait(0.01)
+            assert escritor.stats()["queue_depth"] == 3
+        finally:
+            liberar.set()
+        assert sorted(p.result(5) for p in pendientes) == [0, 1, 2]
+    hilo.join(5)
+
+    stats = escritor.stats()
+    assert stats["queue_depth"] == 0
+    assert stats["completed"] == 4
+    assert stats["batches"] >= 2
+    assert 0 < stats["commit_p50_ms"] <= stats["commit_p95_ms"] <= stats["commit_p99_ms"]
+
+
+def test_timeout_del_escritor(escritor):
+    liberar, hilo = bloquear(escritor)
+    escritor.timeout = 0.1
+    try:
+        with pytest.raises(WriterTimeoutError):
+            escritor.submit(insertar, escritor, 1)
+    finally:
+        liberar.set()
+        hilo.join(5)
+    # La operación vencida se canceló sin ejecutarse
+    assert valores(escritor) == []
+    assert escritor.stats()["timeouts"] == 1
+
+
+def test_timeout_del_escritor_responde_503(client, db_path, monkeypatch):
+    writer = get_writer(db_path)
+    liberar, hilo = bloquear(writer)
+    monkeypatch.setattr(writer, "timeout", 0.1)
+    try:
+        respuesta = client.post(
+            "/clientes/", json={"ci_cliente": "55555555", "nombre": "Cliente Encolado"}
+        )
+    finally:
+        liberar.set()
+        hilo.join(5)
+    assert respuesta.status_code == 503
+    assert respuesta.headers["Retry-After"] == "1"
+    assert client.get("/clientes/55555555").status_code == 404
+
+
+def test_metricas_writer(client, db_path):
+    respuesta = client.get("/metricas/writer")
+    assert respuesta.status_code == 200
+    stats = next(w for w in respuesta.json()["writers"] if w["db_path"] == get_writer(db_path).pool.db_path)
+    assert set(stats) == {
+        "db_path", "queue_depth", "batches", "completed", "failed", "failed_commits", "timeouts",
+        "avg_batch_size", "max_batch_size", "commit_p50_ms", "commit_p95_ms", "commit_p99_ms",
+    }
+    assert stats["batches"] > 0 and stats["completed"] > 0